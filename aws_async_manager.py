@@ -0,0 +1,270 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import aiohttp
+except ImportError:  # 선택 의존성: 없으면 스레드 기반 AWSS3Manager 사용
+    aiohttp = None
+
+from aws_manager import AWSS3Manager, UploadRejected, guess_content_type, is_rejected_status
+from upload_journal import UPLOAD_JOURNAL_PATH
+from upload_scheduler import READ_CHUNK_SIZE, EXPRESS_MIN_PRIORITY, priority_for_path
+from latency_tracer import STAGE_PRESIGN, STAGE_PUT
+
+DEFAULT_ASYNC_CONCURRENCY = 16   # 동시에 진행할 업로드 수 (코루틴)
+MAX_ASYNC_CONCURRENCY = 64
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class AsyncS3Manager(AWSS3Manager):
+    """asyncio 기반 S3 업로드 매니저
+
+    전용 이벤트 루프 스레드 하나에서 여러 업로드 코루틴을 돌리고, Presign 요청과 PUT 을
+    몇 개 안 되는 keep-alive 연결(연결 수 = upload_workers 설정)로 다중화한다.
+    축소본처럼 작은 파일이 많을 때 스레드를 연결마다 두는 것보다 가볍다.
+    멀티파트 대상인 큰 파일은 기존 스레드 기반 경로(upload_file_multipart)로 넘긴다.
+
+    queue_upload / get_queue_size 등 API 는 AWSS3Manager 와 동일.
+    """
+
+    def __init__(self, log_callback=None, journal_path=UPLOAD_JOURNAL_PATH, settings=None, tracer=None):
+        self.loop = None
+        self._wake = None
+        self._http = None
+        self._presign_alock = None
+        # 저널(SQLite) 호출 전용 스레드: 해시 계산/파일 읽기가 기본 executor 를 채워도 큐 처리가 밀리지 않음
+        self._journal_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="s3-journal")
+        self._multipart_executor = None
+        super().__init__(log_callback, journal_path, settings, tracer)
+
+    def _get_concurrency(self):
+        try:
+            n = int(self.settings.get("async_concurrency", DEFAULT_ASYNC_CONCURRENCY))
+        except (TypeError, ValueError):
+            n = DEFAULT_ASYNC_CONCURRENCY
+        return max(1, min(n, MAX_ASYNC_CONCURRENCY))
+
+    # ---------- 이벤트 루프 스레드 ----------
+    def start_upload_worker(self):
+        """이벤트 루프 스레드 시작"""
+        if self.is_worker_running():
+            return
+        if aiohttp is None:
+            self.log("aiohttp 가 설치되지 않아 비동기 업로드 엔진을 시작할 수 없음 (pip install aiohttp)")
+            return
+        self.stop_flag.clear()
+        ready = threading.Event()
+        t = threading.Thread(target=self._run_loop, args=(ready,), name="s3-async-loop", daemon=True)
+        self.upload_threads = [t]
+        t.start()
+        ready.wait(timeout=5)
+        self.log(f"S3 비동기 업로드 엔진 시작됨 (동시 업로드 {self._get_concurrency()}, 연결 {self.num_workers})")
+
+    def stop_upload_worker(self):
+        self._notify_loop()
+        super().stop_upload_worker()
+
+    def _run_loop(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        self._wake = asyncio.Event()
+        ready.set()
+        try:
+            loop.run_until_complete(self._main())
+        except Exception as e:
+            self.log(f"비동기 업로드 엔진 오류: {e}")
+        finally:
+            self.loop = None
+            loop.close()
+
+    def _notify_loop(self):
+        """다른 스레드에서 루프의 대기 중인 워커 깨우기"""
+        loop, wake = self.loop, self._wake
+        if loop is not None and wake is not None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # 루프가 이미 종료됨
+
+    async def _main(self):
+        connector = aiohttp.TCPConnector(limit=self.num_workers, keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=60)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+            self._http = http
+            self._presign_alock = asyncio.Lock()
+            concurrency = self._get_concurrency()
+            # 멀티파트는 파일 하나가 오래 걸리므로 연결 수만큼의 전용 스레드에서 (기본 executor 를 잡고 있지 않게)
+            with ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="s3-multipart") as executor:
+                self._multipart_executor = executor
+                await asyncio.gather(*(self._async_worker(i, concurrency) for i in range(concurrency)))
+            self._multipart_executor = None
+        self._http = None
+
+    async def _blocking(self, fn, *args):
+        """SQLite 저널 호출은 저널 전용 스레드에서 (busy 대기/엔진 스레드의 쓰기 동안 다른 업로드가 멈추지 않게)"""
+        return await asyncio.get_running_loop().run_in_executor(self._journal_executor, fn, *args)
+
+    async def _async_worker(self, index, concurrency):
+        # 첫 코루틴은 JPEG 이상 우선순위 전용 (스레드 워커와 동일한 규칙)
+        min_priority = EXPRESS_MIN_PRIORITY if index == 0 and concurrency > 1 else None
+        while not self.stop_flag.is_set():
+            try:
+                if not (self.upload_enabled and self.lambda_url):
+                    await asyncio.sleep(1)
+                    continue
+                self._wake.clear()
+                job = await self._blocking(self.journal.claim_next, min_priority)
+                if job is None:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=1)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._process_job_async(*job)
+            except Exception as e:
+                self.log(f"업로드 워커 오류: {e}")
+                await asyncio.sleep(1)
+
+    # ---------- 큐 ----------
+    def queue_upload(self, image_path, priority=None):
+        super().queue_upload(image_path, priority)
+        self._notify_loop()
+
+    def _finish_job(self, upload_id, filename, attempts, ok, error=None, rejected=False):
+        super()._finish_job(upload_id, filename, attempts, ok, error, rejected)
+        if ok and attempts > 0:
+            self._notify_loop()
+
+    async def _process_job_async(self, upload_id, image_path, attempts, priority):
+        filename = os.path.basename(image_path)
+        if not os.path.exists(image_path):
+            await self._blocking(self.journal.mark_failed, upload_id, "file not found")
+            self.log(f"✗ 업로드 취소 (파일 없음): {filename}")
+            return
+
+        error, rejected = None, False
+        try:
+            ok = await self.upload_file_async(image_path, priority)
+        except UploadRejected as e:
+            ok, error, rejected = False, str(e), True
+        except Exception as e:
+            ok, error = False, str(e)
+        await self._blocking(self._finish_job, upload_id, filename, attempts, ok, error, rejected)
+
+    # ---------- 업로드 ----------
+    async def upload_file_async(self, image_path, priority=None):
+        """upload_file 의 비동기 버전 (해시 계산은 기본 executor, 저널 기록은 저널 전용 스레드에서)"""
+        loop = asyncio.get_running_loop()
+        result, plan = await loop.run_in_executor(None, self._prepare_upload, image_path)
+        if plan is None:
+            return result
+
+        if priority is None:
+            priority = priority_for_path(image_path)
+        if self._use_multipart(plan):
+            with self._span(STAGE_PUT, plan["path"]):
+                ok = await loop.run_in_executor(
+                    self._multipart_executor, self.upload_file_multipart, plan["path"], plan["size"], plan["key"], priority
+                )
+        else:
+            ok = await self._upload_single_async(plan, priority)
+        if ok:
+            await self._blocking(self._record_upload, plan)
+        return ok
+
+    async def get_presigned_url_async(self, filename, variant=None):
+        url = self.url_cache.get((variant, filename))
+        if url:
+            return url
+        async with self._presign_alock:
+            url = self.url_cache.get((variant, filename))
+            if url:
+                return url
+            batch = await self._blocking(self._presign_batch, filename, variant)
+            await self._fetch_presigned_urls_async(batch, variant)
+        return self.url_cache.get((variant, filename))
+
+    async def _fetch_presigned_urls_async(self, filenames, variant=None):
+        if not filenames:
+            return {}
+        try:
+            async with self._http.post(
+                self.lambda_url,
+                json=self._presign_payload(filenames, variant),
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 200:
+                    data = await response.json(content_type=None)
+                    return self._store_presigned_urls(data, filenames, variant)
+                self.log(f"Presigned URL 요청 실패 ({response.status})")
+        except asyncio.TimeoutError:
+            self.log("Presigned URL 요청 타임아웃")
+        except Exception as e:
+            self.log(f"Presigned URL 요청 오류: {e}")
+        return {}
+
+    async def _consume_bandwidth(self, amount, priority):
+        """토큰 버킷 대기를 루프 안에서 (스레드를 막지 않고 필요한 시간만큼 asyncio.sleep)"""
+        delay = self.bandwidth.try_consume(amount, priority)
+        if not delay:
+            return
+        with self.bandwidth.waiting(priority):
+            while delay:
+                await asyncio.sleep(delay)
+                delay = self.bandwidth.try_consume(amount, priority)
+
+    async def _throttled_body(self, data, priority):
+        """토큰 버킷을 거쳐 청크 단위로 내보내는 요청 본문"""
+        view = memoryview(data)
+        for i in range(0, len(data), READ_CHUNK_SIZE):
+            chunk = view[i:i + READ_CHUNK_SIZE]
+            if self.bandwidth.rate:
+                await self._consume_bandwidth(len(chunk), priority)
+            self.throughput.add(len(chunk))
+            yield bytes(chunk)
+
+    async def _upload_single_async(self, plan, priority):
+        key, variant = plan["key"], plan["variant"]
+        with self._span(STAGE_PRESIGN, plan["path"]):
+            url = await self.get_presigned_url_async(key, variant)
+        if not url:
+            self.log(f"업로드 실패: Presigned URL 획득 실패 - {key}")
+            return False
+
+        loop = asyncio.get_running_loop()
+        status = None
+        try:
+            # 멀티파트 기준(MULTIPART_THRESHOLD) 미만인 파일만 오므로 통째로 읽어도 메모리가 제한됨
+            data = await loop.run_in_executor(None, read_file, plan["path"])
+            headers = {
+                "Content-Type": guess_content_type(key),
+                "Content-MD5": plan["content_md5"],
+                # 길이를 명시해야 chunked 전송이 되지 않음 (S3 presigned PUT 은 chunked 미지원)
+                "Content-Length": str(len(data)),
+            }
+            with self._span(STAGE_PUT, plan["path"]):
+                async with self._http.put(url, data=self._throttled_body(data, priority), headers=headers) as resp:
+                    ok = resp.status == 200 or resp.status == 201
+                    status, text = resp.status, (None if ok else await resp.text())
+            if ok:
+                self.log(f"✓ S3 업로드 성공: {key}")
+                return True
+            self.log(f"✗ S3 업로드 실패 ({status}): {key}")
+            self.log(f"  응답: {text}")
+        except asyncio.TimeoutError:
+            self.log(f"✗ S3 업로드 타임아웃: {key}")
+        except Exception as e:
+            self.log(f"✗ S3 업로드 오류: {key} - {e}")
+        finally:
+            # URL은 1회용으로 취급
+            self.url_cache.pop((variant, key))
+        if is_rejected_status(status):
+            raise UploadRejected(f"HTTP {status}")
+        return False
@@ -1,14 +1,54 @@
 import os
-import queue
+import contextlib
+import io
+import base64
+import hashlib
+import mimetypes
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import tkinter as tk
 from tkinter import ttk, messagebox
+from upload_journal import UploadJournal, UPLOAD_JOURNAL_PATH, STATE_FAILED
+from upload_scheduler import (TokenBucket, ThroughputMeter, ThrottledReader, priority_for_path,
+                              EXPRESS_MIN_PRIORITY, PRIORITY_RAW, PRIORITY_SELECTED)
+from derivative_generator import split_derivative_path, derivative_path, DERIVATIVE_SPECS
+from latency_tracer import STAGE_PRESIGN, STAGE_PUT, STAGE_TO_UPLOAD
 
 # AWS 설정 파일 경로
 AWS_CONFIG_PATH = os.path.join(os.path.expanduser("./"), ".settings/.aws_camera_settings", "config.json")
 
+# 기본 업로드 워커 수 (동시 업로드 연결 수)
+DEFAULT_UPLOAD_WORKERS = 4
+MAX_UPLOAD_WORKERS = 16
+
+UPLOAD_ENGINES = ("thread", "async")
+
+# Presigned URL 배치 발급 / 캐시
+PRESIGN_EXPIRES_IN = 3600      # Lambda ExpiresIn 과 동일 (응답에 없을 때 사용)
+PRESIGN_REFRESH_MARGIN = 300   # 만료 5분 전부터는 새로 발급
+PRESIGN_BATCH_SIZE = 50        # Lambda 1회 호출로 발급받을 최대 URL 수
+
+# 멀티파트 업로드 (RAW 등 큰 파일)
+MULTIPART_THRESHOLD = 16 * 1024 * 1024  # 이 크기 이상이면 멀티파트로 업로드
+MULTIPART_PART_SIZE = 8 * 1024 * 1024   # S3 최소 파트 크기는 5MB
+MULTIPART_PART_WORKERS = 4              # 파일 하나당 동시에 올릴 파트 수
+MULTIPART_PART_RETRIES = 3              # 파트별 재시도 횟수
+
+# 4xx 중 다시 보내면 성공할 수 있는 응답 (만료된 URL, 요청 타임아웃, 요청 과다) -> 연결 오류처럼 계속 재시도
+RETRYABLE_CLIENT_STATUSES = (403, 408, 429)
+
+
+class UploadRejected(Exception):
+    """S3 가 업로드 요청 자체를 거부함 (4xx, 다시 보내도 같은 결과일 가능성이 큼)"""
+
+
+def is_rejected_status(status):
+    return status is not None and 400 <= status < 500 and status not in RETRYABLE_CLIENT_STATUSES
+
 
 def load_aws_settings():
     """AWS 설정 로드"""
@@ -20,7 +60,12 @@ def load_aws_settings():
             pass
     return {
         "lambda_url": "",
-        "upload_enabled": True
+        "upload_enabled": True,
+        "upload_raw": False,
+        "upload_derivatives": False,
+        "upload_rate_limit_mbps": 0,
+        "upload_engine": "thread",
+        "upload_workers": DEFAULT_UPLOAD_WORKERS
     }
 
 
@@ -38,11 +83,12 @@ class AWSSettingsWindow(tk.Toplevel):
     def __init__(self, parent):
         super().__init__(parent)
         self.title("AWS S3 설정")
-        self.geometry("600x300")
+        self.geometry("600x460")
         self.resizable(False, False)
 
         # 현재 설정 로드
         self.settings = load_aws_settings()
+        self.saved = False  # 저장 버튼으로 닫혔는지 (취소/창 닫기면 False)
 
         self._create_widgets()
 
@@ -72,11 +118,53 @@ class AWSSettingsWindow(tk.Toplevel):
             text="촬영 시 S3 자동 업로드 활성화",
             variable=self.upload_enabled_var
         )
-        upload_cb.grid(row=4, column=0, sticky="w", pady=(0, 20))
+        upload_cb.grid(row=4, column=0, sticky="w", pady=(0, 5))
+
+        # RAW 업로드 체크박스 (큰 파일은 멀티파트로 업로드)
+        self.upload_raw_var = tk.BooleanVar(value=self.settings.get("upload_raw", False))
+        ttk.Checkbutton(
+            main_frame,
+            text="RAW 파일도 업로드 (멀티파트)",
+            variable=self.upload_raw_var
+        ).grid(row=5, column=0, sticky="w", pady=(0, 5))
+
+        # 웹용 축소본 업로드 체크박스 (원본보다 먼저 업로드)
+        self.upload_derivatives_var = tk.BooleanVar(value=self.settings.get("upload_derivatives", False))
+        ttk.Checkbutton(
+            main_frame,
+            text="웹용 축소본(2048px / 256px) 먼저 업로드",
+            variable=self.upload_derivatives_var
+        ).grid(row=6, column=0, sticky="w", pady=(0, 10))
+
+        # 동시 업로드 워커 수
+        workers_frame = ttk.Frame(main_frame)
+        workers_frame.grid(row=7, column=0, sticky="w", pady=(0, 10))
+        ttk.Label(workers_frame, text="동시 업로드 수:").pack(side="left")
+        self.upload_workers_var = tk.IntVar(
+            value=self.settings.get("upload_workers", DEFAULT_UPLOAD_WORKERS)
+        )
+        ttk.Spinbox(workers_frame, from_=1, to=MAX_UPLOAD_WORKERS,
+                    textvariable=self.upload_workers_var, width=5).pack(side="left", padx=(5, 0))
+
+        # 업로드 대역폭 제한 (테더링/클라이언트 확인 트래픽과 같은 회선을 쓰므로)
+        ttk.Label(workers_frame, text="속도 제한(MB/s, 0=무제한):").pack(side="left", padx=(20, 0))
+        self.rate_limit_var = tk.DoubleVar(value=self.settings.get("upload_rate_limit_mbps", 0))
+        ttk.Spinbox(workers_frame, from_=0, to=1000, increment=0.5,
+                    textvariable=self.rate_limit_var, width=6).pack(side="left", padx=(5, 0))
+
+        # 업로드 엔진 (thread: 연결마다 스레드, async: asyncio + aiohttp)
+        engine_frame = ttk.Frame(main_frame)
+        engine_frame.grid(row=8, column=0, sticky="w", pady=(0, 20))
+        ttk.Label(engine_frame, text="업로드 엔진:").pack(side="left")
+        self.upload_engine_var = tk.StringVar(value=self.settings.get("upload_engine", "thread"))
+        ttk.Combobox(engine_frame, textvariable=self.upload_engine_var, values=UPLOAD_ENGINES,
+                     state="readonly", width=8).pack(side="left", padx=(5, 0))
+        ttk.Label(engine_frame, text="(async 는 aiohttp 필요, 재시작 후 적용)",
+                  foreground="gray").pack(side="left", padx=(5, 0))
 
         # 버튼 프레임
         btn_frame = ttk.Frame(main_frame)
-        btn_frame.grid(row=5, column=0, sticky="ew")
+        btn_frame.grid(row=9, column=0, sticky="ew")
 
         ttk.Button(btn_frame, text="저장", command=self._save_settings, width=15).pack(
             side="left", padx=(0, 10)
@@ -96,12 +184,27 @@ class AWSSettingsWindow(tk.Toplevel):
             messagebox.showwarning("입력 오류", "Lambda URL을 입력해주세요.")
             return
 
-        settings = {
+        try:
+            upload_workers = int(self.upload_workers_var.get())
+            rate_limit = float(self.rate_limit_var.get())
+        except (tk.TclError, ValueError):
+            messagebox.showwarning("입력 오류", "동시 업로드 수와 속도 제한은 숫자로 입력해주세요.")
+            return
+
+        # 창에서 다루지 않는 설정 값은 그대로 유지
+        settings = dict(self.settings)
+        settings.update({
             "lambda_url": lambda_url,
-            "upload_enabled": self.upload_enabled_var.get()
-        }
+            "upload_enabled": self.upload_enabled_var.get(),
+            "upload_raw": self.upload_raw_var.get(),
+            "upload_derivatives": self.upload_derivatives_var.get(),
+            "upload_rate_limit_mbps": max(0.0, rate_limit),
+            "upload_engine": self.upload_engine_var.get(),
+            "upload_workers": max(1, min(upload_workers, MAX_UPLOAD_WORKERS))
+        })
 
         save_aws_settings(settings)
+        self.saved = True
         messagebox.showinfo("저장 완료", "AWS 설정이 저장되었습니다.")
         self.destroy()
 
@@ -141,22 +244,130 @@ class AWSSettingsWindow(tk.Toplevel):
             messagebox.showerror("연결 실패", f"Lambda 연결 오류:\n\n{str(e)}")
 
 
+def guess_content_type(filename):
+    """파일 확장자로 Content-Type 추정 (lambda_gen_pre_url 과 같은 규칙)"""
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def file_md5(path, chunk_size=1024 * 1024):
+    """파일 MD5 (청크 단위로 읽어 메모리 사용 최소화)"""
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5.update(chunk)
+    return md5
+
+
+def content_md5_header(md5):
+    """S3 Content-MD5 헤더 값 (base64 인코딩된 digest)"""
+    return base64.b64encode(md5.digest()).decode("ascii")
+
+
+def base_object_key(image_path):
+    """S3 객체 키: <세션 폴더명>/<파일명> (다른 폴더의 같은 파일명이 덮어쓰지 않도록)
+
+    축소본은 원본의 세션 폴더명을 쓰고, 실제 prefix 는 Lambda 가 variant 에 따라 붙인다.
+    """
+    _, session_dir = split_derivative_path(image_path)
+    session = os.path.basename(session_dir)
+    filename = os.path.basename(image_path)
+    return f"{session}/{filename}" if session else filename
+
+
+def read_part(path, offset, length):
+    """파일의 일부 구간만 읽기 (파트 하나 크기만큼만 메모리 사용)"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def create_http_session(pool_size):
+    """Keep-alive 연결을 재사용하는 requests.Session 생성"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class PresignedURLCache:
+    """파일명별 Presigned URL 캐시 (만료 전에 무효화)"""
+
+    def __init__(self, refresh_margin=PRESIGN_REFRESH_MARGIN):
+        self.refresh_margin = refresh_margin
+        self._urls = {}  # filename -> (url, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, filename):
+        """유효한 URL 반환, 없거나 곧 만료되면 None"""
+        with self._lock:
+            entry = self._urls.get(filename)
+            if entry is None:
+                return None
+            url, expires_at = entry
+            if time.time() >= expires_at - self.refresh_margin:
+                del self._urls[filename]
+                return None
+            return url
+
+    def put_many(self, urls, expires_in):
+        expires_at = time.time() + expires_in
+        with self._lock:
+            for filename, url in urls.items():
+                self._urls[filename] = (url, expires_at)
+
+    def pop(self, filename):
+        with self._lock:
+            self._urls.pop(filename, None)
+
+    def missing(self, filenames):
+        """캐시에 유효한 URL이 없는 파일명만 반환 (순서 유지)"""
+        return [f for f in filenames if self.get(f) is None]
+
+    def clear(self):
+        with self._lock:
+            self._urls.clear()
+
+
 class AWSS3Manager:
     """S3 업로드 매니저 (Presigned URL 방식)"""
 
-    def __init__(self, log_callback=None):
+    def __init__(self, log_callback=None, journal_path=UPLOAD_JOURNAL_PATH, settings=None, tracer=None):
         """
         log_callback: 로그 출력 콜백 함수
+        journal_path: 업로드 저널(SQLite) 경로
+        settings: 설정 dict (생략 시 설정 파일에서 로드, 벤치마크 등에서 직접 지정)
+        tracer: latency_tracer.LatencyTracer (presign/PUT 구간 기록, 생략 시 기록 안 함)
         """
         self.log_callback = log_callback
-        self.settings = load_aws_settings()
+        self.tracer = tracer
+        self.settings = settings if settings is not None else load_aws_settings()
         self.lambda_url = self.settings.get("lambda_url", "")
         self.upload_enabled = self.settings.get("upload_enabled", True)
+        self.num_workers = self._get_worker_count()
+
+        # 워커들이 공유하는 HTTP 세션 (연결 풀, 멀티파트 파트 업로드까지 포함)
+        self.session = create_http_session(self.num_workers * MULTIPART_PART_WORKERS)
+
+        # 대역폭 제한 및 전송 속도 측정
+        self.bandwidth = TokenBucket(self._get_rate_limit())
+        self.throughput = ThroughputMeter()
 
-        # 업로드 큐 및 워커 스레드
-        self.upload_queue = queue.Queue()
-        self.upload_thread = None
+        # Presigned URL 캐시 (큐에 쌓인 파일들은 Lambda 1회 호출로 함께 발급)
+        self.url_cache = PresignedURLCache()
+        self._presign_lock = threading.Lock()
+
+        # 업로드 저널 (디스크에 유지되는 큐) 및 워커 스레드 풀
+        self.journal = UploadJournal(journal_path)
+        recovered = self.journal.recover()
+        self._work_event = threading.Event()
+        self.upload_threads = []
         self.stop_flag = threading.Event()
+        self._init_lock = threading.Lock()  # initialize_client 가 겹쳐 워커 풀을 두 번 재구성하지 않게
+
+        pending = self.journal.count()
+        if pending:
+            self.log(f"이전 실행에서 남은 업로드 {pending}개 재개 (중단된 업로드 {recovered}개 포함)")
 
         if self.lambda_url:
             self.start_upload_worker()
@@ -171,47 +382,196 @@ class AWSS3Manager:
         else:
             print(f"[S3] {msg}")
 
+    def _span(self, stage, trace_id=None):
+        """tracer 가 있으면 구간 기록"""
+        if self.tracer is None:
+            return contextlib.nullcontext()
+        return self.tracer.span(stage, trace_id)
+
+    def _get_worker_count(self):
+        """설정에서 워커 수 읽기 (1 ~ MAX_UPLOAD_WORKERS)"""
+        try:
+            n = int(self.settings.get("upload_workers", DEFAULT_UPLOAD_WORKERS))
+        except (TypeError, ValueError):
+            n = DEFAULT_UPLOAD_WORKERS
+        return max(1, min(n, MAX_UPLOAD_WORKERS))
+
+    def _get_rate_limit(self):
+        """설정의 업로드 속도 제한 (MB/s) 을 초당 바이트로, 0 이면 무제한"""
+        try:
+            mbps = float(self.settings.get("upload_rate_limit_mbps", 0) or 0)
+        except (TypeError, ValueError):
+            mbps = 0
+        return int(max(0.0, mbps) * 1024 * 1024)
+
+    def _apply_worker_count(self):
+        """워커 수가 바뀌었으면 워커 풀과 세션을 새 크기로 재구성"""
+        num_workers = self._get_worker_count()
+        if num_workers == self.num_workers:
+            return
+        if self.is_worker_running():
+            self.stop_upload_worker()
+        self.num_workers = num_workers
+        self.session.close()
+        self.session = create_http_session(self.num_workers * MULTIPART_PART_WORKERS)
+
+    def is_worker_running(self):
+        """살아있는 업로드 워커가 있는지 확인"""
+        return any(t.is_alive() for t in self.upload_threads)
+
     def reload_settings(self):
         """설정 다시 로드"""
         self.settings = load_aws_settings()
+        if self.settings.get("lambda_url", "") != self.lambda_url:
+            self.url_cache.clear()
         self.lambda_url = self.settings.get("lambda_url", "")
         self.upload_enabled = self.settings.get("upload_enabled", True)
+        self.bandwidth.set_rate(self._get_rate_limit())
+        self._apply_worker_count()
 
         # 워커 스레드 재시작
-        if self.lambda_url and not (self.upload_thread and self.upload_thread.is_alive()):
+        if self.lambda_url and not self.is_worker_running():
             self.start_upload_worker()
 
         self.log(f"설정 다시 로드됨 (업로드: {'활성화' if self.upload_enabled else '비활성화'})")
 
-    def get_presigned_url(self, filename):
-        """Lambda로부터 Presigned URL 획득"""
+    def get_presigned_url(self, filename, variant=None):
+        """Presigned URL 획득 (캐시 우선, 없으면 대기 중인 파일과 함께 배치 발급)
+
+        filename: S3 객체 키
+        variant: 축소본 종류 ("web", "thumb"), 원본이면 None
+        """
         if not self.lambda_url:
             self.log("Lambda URL이 설정되지 않음")
             return None
 
+        url = self.url_cache.get((variant, filename))
+        if url:
+            return url
+
+        with self._presign_lock:
+            # 기다리는 동안 다른 워커가 이미 받아왔을 수 있음
+            url = self.url_cache.get((variant, filename))
+            if url:
+                return url
+            self.fetch_presigned_urls(self._presign_batch(filename, variant), variant)
+        return self.url_cache.get((variant, filename))
+
+    def _presign_batch(self, filename, variant):
+        """filename 과 함께 발급받을 키 목록 (같은 variant 로 대기 중이고 캐시에 없는 파일들)"""
+        pending = []
+        for p in self.journal.pending_paths(limit=PRESIGN_BATCH_SIZE * 2):
+            key = base_object_key(p)
+            if key != filename and split_derivative_path(p)[0] == variant:
+                pending.append(key)
+        missing = self.url_cache.missing([(variant, n) for n in [filename] + pending])
+        return [n for _, n in missing[:PRESIGN_BATCH_SIZE]]
+
+    def _presign_payload(self, filenames, variant):
+        # filename 도 같이 보내서 배치 미지원 Lambda 에서도 첫 파일은 발급되도록 함
+        payload = {"filenames": filenames, "filename": filenames[0]}
+        if variant:
+            payload["variant"] = variant
+        return payload
+
+    def _store_presigned_urls(self, data, filenames, variant):
+        """Lambda 응답의 URL들을 캐시에 저장하고 {filename: url} 반환"""
+        urls = data.get("presigned_urls")
+        if urls is None and data.get("presigned_url"):
+            urls = {filenames[0]: data["presigned_url"]}
+        urls = urls or {}
+        self.url_cache.put_many(
+            {(variant, name): url for name, url in urls.items()},
+            data.get("expires_in", PRESIGN_EXPIRES_IN)
+        )
+        return urls
+
+    def fetch_presigned_urls(self, filenames, variant=None):
+        """Lambda로부터 여러 파일의 Presigned URL을 한 번에 받아 캐시에 저장"""
+        if not filenames:
+            return {}
         try:
-            payload = {"filename": filename}
             headers = {"Content-Type": "application/json"}
-            response = requests.post(
+            response = self.session.post(
                 self.lambda_url,
-                json=payload,
+                json=self._presign_payload(filenames, variant),
                 headers=headers,
                 timeout=10
             )
 
             if response.status_code == 200:
-                data = response.json()
-                return data.get("presigned_url")
+                return self._store_presigned_urls(response.json(), filenames, variant)
             else:
                 self.log(f"Presigned URL 요청 실패 ({response.status_code})")
         except requests.exceptions.Timeout:
             self.log(f"Presigned URL 요청 타임아웃")
         except Exception as e:
             self.log(f"Presigned URL 요청 오류: {e}")
-        return None
+        return {}
+
+    def resolve_object_key(self, image_path, md5_hex):
+        """업로드할 객체 키 결정 (같은 키에 다른 내용이 이미 올라가 있으면 해시를 붙여 충돌 회피)"""
+        key = base_object_key(image_path)
+        uploaded = self.journal.uploaded_md5(key)
+        if uploaded is None or uploaded == md5_hex:
+            return key
+        stem, ext = os.path.splitext(key)
+        return f"{stem}_{md5_hex[:8]}{ext}"
+
+    def _prepare_upload(self, image_path):
+        """업로드 전 확인 및 해시 계산
+
+        Returns:
+            (True, None): 이미 업로드됨 (건너뜀)
+            (False, None): 파일 오류
+            (None, plan): 업로드 필요, plan = {path, size, mtime, md5_hex, content_md5, key, variant}
+        """
+        image_path = os.path.abspath(image_path)
+        filename = os.path.basename(image_path)
+
+        try:
+            st = os.stat(image_path)
+        except OSError as e:
+            self.log(f"✗ S3 업로드 오류: {filename} - {e}")
+            return False, None
+        size, mtime = st.st_size, st.st_mtime
 
-    def upload_file(self, image_path):
-        """S3에 파일 업로드 (실제 업로드 수행)"""
+        # 1. 같은 경로/크기/수정시각으로 이미 올린 파일이면 해시 계산 없이 건너뜀
+        if self.journal.find_uploaded_by_path(image_path, size, mtime):
+            self.log(f"이미 업로드됨, 건너뜀: {filename}")
+            return True, None
+
+        # 2. 내용 해시로 중복 확인 및 객체 키 결정
+        try:
+            md5 = file_md5(image_path)
+        except OSError as e:
+            self.log(f"✗ S3 업로드 오류: {filename} - {e}")
+            return False, None
+        md5_hex = md5.hexdigest()
+        key = self.resolve_object_key(image_path, md5_hex)
+        if self.journal.uploaded_md5(key) == md5_hex:
+            self.journal.record_uploaded(key, md5_hex, size, mtime, image_path)
+            self.log(f"같은 내용이 이미 업로드됨, 건너뜀: {filename}")
+            return True, None
+
+        return None, {
+            "path": image_path,
+            "size": size,
+            "mtime": mtime,
+            "md5_hex": md5_hex,
+            "content_md5": content_md5_header(md5),
+            "key": key,
+            "variant": split_derivative_path(image_path)[0],
+        }
+
+    def _use_multipart(self, plan):
+        return plan["size"] >= MULTIPART_THRESHOLD and plan["variant"] is None
+
+    def upload_file(self, image_path, priority=None):
+        """S3에 파일 업로드 (실제 업로드 수행, 이미 올라간 파일은 건너뜀)
+
+        priority: 대역폭 경쟁 시 사용할 우선순위 (생략 시 확장자로 결정)
+        """
         if not self.upload_enabled:
             self.log("업로드 비활성화됨")
             return False
@@ -220,84 +580,298 @@ class AWSS3Manager:
             self.log("Lambda URL이 설정되지 않아 업로드 불가")
             return False
 
-        filename = os.path.basename(image_path)
+        result, plan = self._prepare_upload(image_path)
+        if plan is None:
+            return result
 
+        if priority is None:
+            priority = priority_for_path(image_path)
+        if self._use_multipart(plan):
+            with self._span(STAGE_PUT, plan["path"]):
+                ok = self.upload_file_multipart(plan["path"], plan["size"], plan["key"], priority)
+        else:
+            ok = self._upload_single(plan["path"], plan["size"], plan["key"], plan["content_md5"],
+                                     plan["variant"], priority)
+        if ok:
+            self._record_upload(plan)
+        return ok
+
+    def _record_upload(self, plan):
+        self.journal.record_uploaded(plan["key"], plan["md5_hex"], plan["size"], plan["mtime"], plan["path"])
+        if self.tracer is not None:
+            self.tracer.finish(plan["path"], STAGE_TO_UPLOAD)
+
+    def _upload_single(self, image_path, size, key, content_md5, variant=None, priority=PRIORITY_RAW):
+        """Presigned URL 한 번의 PUT 으로 업로드"""
         # 1. Presigned URL 획득
-        url = self.get_presigned_url(filename)
+        with self._span(STAGE_PRESIGN, image_path):
+            url = self.get_presigned_url(key, variant)
         if not url:
-            self.log(f"업로드 실패: Presigned URL 획득 실패 - {filename}")
+            self.log(f"업로드 실패: Presigned URL 획득 실패 - {key}")
             return False
 
-        # 2. S3에 업로드
+        # 2. S3에 업로드 (파일 객체를 넘겨 전체를 메모리에 올리지 않고 스트리밍, S3가 MD5 검증)
+        status = None
         try:
-            with open(image_path, "rb") as f:
-                data = f.read()  # 파일 읽기
-
-            headers = {"Content-Type": "image/jpeg"}
-            resp = requests.put(url, data=data, headers=headers, timeout=60)
+            headers = {
+                "Content-Type": guess_content_type(key),
+                "Content-MD5": content_md5
+            }
+            with open(image_path, "rb") as f, self._span(STAGE_PUT, image_path):
+                body = ThrottledReader(f, size, self.bandwidth, self.throughput, priority)
+                resp = self.session.put(url, data=body, headers=headers, timeout=60)
 
             if resp.status_code == 200 or resp.status_code == 201:
-                self.log(f"✓ S3 업로드 성공: {filename}")
+                self.log(f"✓ S3 업로드 성공: {key}")
                 return True
             else:
-                self.log(f"✗ S3 업로드 실패 ({resp.status_code}): {filename}")
+                status = resp.status_code
+                self.log(f"✗ S3 업로드 실패 ({status}): {key}")
                 self.log(f"  응답: {resp.text}")
-                return False
         except requests.exceptions.Timeout:
-            self.log(f"✗ S3 업로드 타임아웃: {filename}")
+            self.log(f"✗ S3 업로드 타임아웃: {key}")
         except Exception as e:
-            self.log(f"✗ S3 업로드 오류: {filename} - {e}")
+            self.log(f"✗ S3 업로드 오류: {key} - {e}")
+        finally:
+            # URL은 1회용으로 취급
+            self.url_cache.pop((variant, key))
+        if is_rejected_status(status):
+            raise UploadRejected(f"HTTP {status}")
         return False
 
-    def queue_upload(self, image_path):
-        """업로드 큐에 추가 (비동기)"""
+    def _multipart_request(self, payload):
+        """Lambda 멀티파트 요청 (create/part_urls/complete/abort), 실패 시 None"""
+        try:
+            response = self.session.post(
+                self.lambda_url,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=30
+            )
+            if response.status_code == 200:
+                return response.json()
+            self.log(f"멀티파트 요청 실패 ({payload.get('action')}, {response.status_code}): {response.text}")
+        except requests.exceptions.Timeout:
+            self.log(f"멀티파트 요청 타임아웃 ({payload.get('action')})")
+        except Exception as e:
+            self.log(f"멀티파트 요청 오류 ({payload.get('action')}): {e}")
+        return None
+
+    def upload_file_multipart(self, image_path, size=None, key=None, priority=PRIORITY_RAW):
+        """큰 파일을 파트 단위로 나눠 병렬 업로드 (파트별 재시도, 파트별 Content-MD5)"""
+        filename = key or base_object_key(image_path)
+        if size is None:
+            size = os.path.getsize(image_path)
+        num_parts = max(1, -(-size // MULTIPART_PART_SIZE))
+
+        # 1. 멀티파트 업로드 생성 + 파트별 URL 발급
+        created = self._multipart_request({
+            "action": "create_multipart",
+            "filename": filename,
+            "parts": num_parts
+        })
+        if not created or not created.get("upload_id"):
+            self.log(f"업로드 실패: 멀티파트 생성 실패 - {filename}")
+            return False
+        upload_id = created["upload_id"]
+        # 서버가 키를 날짜로 파티셔닝하면 create 때 정한 키를 이후 요청에 그대로 돌려줘야 함
+        mp_ref = {"filename": filename, "upload_id": upload_id}
+        if created.get("object_key"):
+            mp_ref["object_key"] = created["object_key"]
+        part_urls = dict(created.get("part_urls", {}))
+        urls_lock = threading.Lock()
+
+        def refresh_part_url(part_number):
+            data = self._multipart_request(dict(mp_ref, action="part_urls", part_numbers=[part_number]))
+            if data:
+                with urls_lock:
+                    part_urls.update(data.get("part_urls", {}))
+
+        def upload_part(part_number):
+            offset = (part_number - 1) * MULTIPART_PART_SIZE
+            length = min(MULTIPART_PART_SIZE, size - offset)
+            for attempt in range(1, MULTIPART_PART_RETRIES + 1):
+                if self.stop_flag.is_set():
+                    return None
+                with urls_lock:
+                    url = part_urls.get(str(part_number))
+                if url:
+                    try:
+                        data = read_part(image_path, offset, length)
+                        headers = {"Content-MD5": base64.b64encode(hashlib.md5(data).digest()).decode("ascii")}
+                        body = ThrottledReader(io.BytesIO(data), len(data), self.bandwidth, self.throughput, priority)
+                        resp = self.session.put(url, data=body, headers=headers, timeout=120)
+                        if resp.status_code == 200:
+                            return {"part_number": part_number, "etag": resp.headers.get("ETag")}
+                        self.log(f"  파트 {part_number}/{num_parts} 실패 ({resp.status_code}), 재시도 {attempt}/{MULTIPART_PART_RETRIES}")
+                        if resp.status_code == 403:
+                            # URL 만료 가능성 -> 재발급
+                            refresh_part_url(part_number)
+                    except Exception as e:
+                        self.log(f"  파트 {part_number}/{num_parts} 오류: {e}, 재시도 {attempt}/{MULTIPART_PART_RETRIES}")
+                else:
+                    refresh_part_url(part_number)
+                time.sleep(min(2 ** (attempt - 1), 8))
+            return None
+
+        # 2. 파트 병렬 업로드
+        self.log(f"멀티파트 업로드 시작: {filename} ({size / (1024 * 1024):.1f}MB, {num_parts}파트)")
+        with ThreadPoolExecutor(max_workers=MULTIPART_PART_WORKERS) as executor:
+            parts = list(executor.map(upload_part, range(1, num_parts + 1)))
+
+        if not all(p and p["etag"] for p in parts):
+            self._multipart_request(dict(mp_ref, action="abort_multipart"))
+            self.log(f"✗ S3 멀티파트 업로드 실패: {filename}")
+            return False
+
+        # 3. 완료 요청
+        done = self._multipart_request(dict(mp_ref, action="complete_multipart", parts=parts))
+        if not done:
+            self._multipart_request(dict(mp_ref, action="abort_multipart"))
+            self.log(f"✗ S3 멀티파트 완료 실패: {filename}")
+            return False
+
+        self.log(f"✓ S3 업로드 성공: {filename} (멀티파트)")
+        return True
+
+    def queue_upload(self, image_path, priority=None):
+        """업로드 큐에 추가 (비동기, 저널에 기록되어 재시작 후에도 유지)
+
+        priority: 클수록 먼저 업로드 (upload_scheduler.PRIORITY_*), 생략 시 JPEG > RAW
+        """
+        if priority is None:
+            priority = priority_for_path(image_path)
         if self.upload_enabled and self.lambda_url:
-            self.upload_queue.put(image_path)
+            self.journal.add(os.path.abspath(image_path), priority)
+            self._work_event.set()
             self.log(f"업로드 큐에 추가됨: {os.path.basename(image_path)}")
 
+    def promote(self, image_path):
+        """A컷 지정: 원본과 축소본을 가장 높은 우선순위로 (큐에 없으면 새로 추가)"""
+        paths = [image_path] + [derivative_path(image_path, v) for v in DERIVATIVE_SPECS]
+        for path in paths:
+            if os.path.exists(path):
+                self.queue_upload(path, PRIORITY_SELECTED)
+
     def manual_upload(self, image_path):
         """즉시 업로드 (동기)"""
         if self.upload_enabled and self.lambda_url:
-            return self.upload_file(image_path)
+            try:
+                return self.upload_file(image_path)
+            except UploadRejected:
+                return False
         return False
 
     def start_upload_worker(self):
-        """업로드 워커 스레드 시작"""
-        if self.upload_thread and self.upload_thread.is_alive():
+        """업로드 워커 스레드 풀 시작"""
+        if self.is_worker_running():
             return
         self.stop_flag.clear()
-        self.upload_thread = threading.Thread(target=self._upload_worker, daemon=True)
-        self.upload_thread.start()
-        self.log("S3 업로드 워커 시작됨")
+        self.upload_threads = []
+        for i in range(self.num_workers):
+            # 워커가 2개 이상이면 첫 워커는 JPEG 이상 우선순위 전용 (RAW 백필에 막히지 않도록)
+            min_priority = EXPRESS_MIN_PRIORITY if i == 0 and self.num_workers > 1 else None
+            t = threading.Thread(target=self._upload_worker, args=(min_priority,),
+                                 name=f"s3-upload-{i}", daemon=True)
+            t.start()
+            self.upload_threads.append(t)
+        self.log(f"S3 업로드 워커 {self.num_workers}개 시작됨")
 
     def stop_upload_worker(self):
-        """업로드 워커 스레드 종료"""
+        """업로드 워커 스레드 풀 종료"""
         self.log("S3 업로드 워커 종료 중...")
         self.stop_flag.set()
-        if self.upload_thread:
-            self.upload_thread.join(timeout=5)
+        for t in self.upload_threads:
+            t.join(timeout=5)
+        self.upload_threads = []
         self.log("S3 업로드 워커 종료됨")
 
-    def _upload_worker(self):
-        """백그라운드 업로드 워커"""
+    def _upload_worker(self, min_priority=None):
+        """백그라운드 업로드 워커 (저널에서 우선순위 높은 것, 오래된 순으로 가져와 업로드)"""
         while not self.stop_flag.is_set():
             try:
-                image_path = self.upload_queue.get(timeout=1)
-                self.upload_file(image_path)
-                self.upload_queue.task_done()
-            except queue.Empty:
-                continue
+                if not (self.upload_enabled and self.lambda_url):
+                    self.stop_flag.wait(1)
+                    continue
+                self._work_event.clear()
+                job = self.journal.claim_next(min_priority)
+                if job is None:
+                    self._work_event.wait(timeout=1)
+                    continue
+                self._process_job(*job)
             except Exception as e:
                 self.log(f"업로드 워커 오류: {e}")
+                self.stop_flag.wait(1)
+
+    def _process_job(self, upload_id, image_path, attempts, priority):
+        """저널 항목 하나 업로드 후 결과 기록"""
+        filename = os.path.basename(image_path)
+        if not os.path.exists(image_path):
+            self.journal.mark_failed(upload_id, "file not found")
+            self.log(f"✗ 업로드 취소 (파일 없음): {filename}")
+            return
+
+        error, rejected = None, False
+        try:
+            ok = self.upload_file(image_path, priority)
+        except UploadRejected as e:
+            ok, error, rejected = False, str(e), True
+        except Exception as e:
+            ok, error = False, str(e)
+        self._finish_job(upload_id, filename, attempts, ok, error, rejected)
+
+    def _finish_job(self, upload_id, filename, attempts, ok, error=None, rejected=False):
+        """업로드 결과를 저널에 기록 (성공/재시도 예약/실패)
+
+        rejected: S3 가 요청을 거부(4xx)한 경우만 True, 연결/전송 오류는 실패로 끝내지 않고 계속 재시도
+        """
+        if ok:
+            self.journal.mark_done(upload_id)
+            if attempts > 0:
+                # 재시도 끝에 성공 -> 연결이 복구된 것으로 보고 백오프 중인 항목 즉시 재개
+                self.journal.retry_now()
+                self._work_event.set()
+        elif self.stop_flag.is_set():
+            # 워커를 멈추는 중(워커 수 변경/종료) 중단된 업로드는 바로 대기 상태로 (시도 횟수는 늘리지 않음)
+            self.journal.requeue(upload_id)
+        else:
+            state = self.journal.mark_retry(upload_id, error or "upload failed", rejected)
+            if state == STATE_FAILED:
+                self.log(f"✗ 업로드 포기 (요청 거부, 재시도 횟수 초과): {filename}")
+            else:
+                self.log(f"업로드 재시도 예약: {filename} ({attempts + 1}회 실패)")
 
     def get_queue_size(self):
-        """대기 중인 업로드 수 반환"""
-        return self.upload_queue.qsize()
+        """대기 중인 업로드 수 반환 (업로드 중 포함)"""
+        return self.journal.count()
+
+    def get_upload_stats(self):
+        """업로드 현황: 대기 수, 실패 수, 현재 속도(바이트/초), 남은 바이트, 예상 남은 시간(초)"""
+        pending = self.journal.count()
+        remaining = self.journal.pending_bytes() if pending else 0
+        rate = self.throughput.rate()
+        return {
+            "pending": pending,
+            "failed": self.journal.count(STATE_FAILED),
+            "bytes_per_sec": rate,
+            "remaining_bytes": remaining,
+            "eta_sec": remaining / rate if rate > 0 and remaining else None,
+        }
+
+    def get_failed_count(self):
+        """실패로 남은 업로드 수 (파일이 없어졌거나 S3 가 요청을 거부한 경우)"""
+        return self.journal.count(STATE_FAILED)
 
     def initialize_client(self):
         """
         AWS 설정 로드 후 Presigned URL 기반 S3 업로드 매니저 초기화
+
+        워커 수가 바뀌면 기존 워커를 join 하므로 GUI 에서는 Tk 스레드 밖에서 호출
         """
+        with self._init_lock:
+            return self._initialize_client()
+
+    def _initialize_client(self):
         # 1. 설정 로드
         self.settings = load_aws_settings()
         if not self.settings:
@@ -312,10 +886,29 @@ class AWSS3Manager:
             self.log("Lambda URL이 설정되지 않아 S3 Manager 초기화 실패")
             return False
 
-        # 3. 업로드 큐 및 워커 스레드 초기화
-        self.upload_queue = queue.Queue()
-        self.stop_flag = threading.Event()
+        # 3. 워커 풀 재구성 (대기 중인 큐는 유지, 설정이 바뀌었으니 실패 항목도 다시 시도)
+        self.bandwidth.set_rate(self._get_rate_limit())
+        self._apply_worker_count()
+        retried = self.journal.retry_failed()
+        if retried:
+            self.log(f"실패했던 업로드 {retried}개 재시도")
+        self.journal.retry_now()
         self.start_upload_worker()
 
         self.log(f"S3 Manager 초기화 완료 (업로드: {'활성화' if self.upload_enabled else '비활성화'})")
-        return True
\ No newline at end of file
+        return True
+
+
+def create_s3_manager(log_callback=None, tracer=None, journal_path=UPLOAD_JOURNAL_PATH):
+    """설정의 upload_engine 에 맞는 S3 매니저 생성 (async 는 aiohttp 가 없으면 thread 로 대체)"""
+    settings = load_aws_settings()
+    if settings.get("upload_engine") == "async":
+        from aws_async_manager import AsyncS3Manager, aiohttp
+        if aiohttp is not None:
+            return AsyncS3Manager(log_callback=log_callback, journal_path=journal_path, tracer=tracer)
+        msg = "aiohttp 가 설치되지 않아 thread 업로드 엔진으로 대체"
+        if log_callback:
+            log_callback(msg)
+        else:
+            print(f"[S3] {msg}")
+    return AWSS3Manager(log_callback=log_callback, journal_path=journal_path, tracer=tracer)
@@ -1,11 +1,25 @@
+import argparse
 import requests
 import json
 
 api_url = "https://<yourapiurl>/prod/generate-url"
+
+parser = argparse.ArgumentParser(description="Presigned URL 발급 후 PUT 업로드 테스트")
+parser.add_argument("--url", default=api_url, help="Lambda(API) URL")
+parser.add_argument("--local", action="store_true", help="local_s3_server 대역 서버를 띄워 오프라인으로 테스트")
+parser.add_argument("--file", default="../test.jpg")
+args = parser.parse_args()
+
+server = None
+if args.local:
+    from local_s3_server import LocalS3Server
+    server = LocalS3Server().start()
+    args.url = server.lambda_url
+
 payload = {"filename": "test1.jpg"}
 
-file_path = "../test.jpg"
-response = requests.post(api_url, json=payload)
+file_path = args.file
+response = requests.post(args.url, json=payload)
 print(response.status_code)
 print(response.json())  # presigned_url 확인
 presigned_url= response.json()['presigned_url']
@@ -22,3 +36,7 @@ if response.status_code == 200:
     print("업로드 성공!")
 else:
     print("업로드 실패:", response.status_code, response.text)
+
+if server:
+    print(server.stats())
+    server.stop()
@@ -0,0 +1,205 @@
+"""GUI 미리보기/썸네일 벤치마크 (카메라 불필요, 화면 필요 → 서버/CI 에서는 Xvfb)
+
+    python bench_gui.py                       # 측정 후 기준값(.settings/bench/gui_baseline.json)과 비교
+    python bench_gui.py --save-baseline       # 이번 결과를 기준값으로 저장
+    xvfb-run -a python bench_gui.py           # 화면 없는 환경
+
+측정 항목 (모두 중앙값 ms, Tk 그리기까지 포함하도록 update_idletasks 까지 잰다)
+    canvas.set_image.cold / warm   : 디코딩 포함 / 디코딩 캐시 적중
+    canvas.update_preview.*        : 회전 0/90, 품질 1.0/0.5, 확대 1/2 조합
+    gallery.add_thumbnail          : 원본 크기 JPEG 에서 썸네일 하나 추가
+    gui.refresh_thumbnails.<N>     : 사진 N(100/1000/5000)장 폴더에서 CameraGUI.refresh_thumbnails
+
+기준값보다 --tolerance(기본 25%) 넘게 느려진 항목이 있으면 종료 코드 1 (촬영 전에 확인).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+import PIL
+
+from bench_render import make_fixtures, FIXTURE_SIZES
+from image_records import DecodedImageCache
+from render_engine import PreviewRenderer
+from mutzin_tether import FastResizableImageCanvas, ThumbnailGallery, CameraGUI
+
+BASELINE_PATH = os.path.join(os.path.expanduser("./"), ".settings", "bench", "gui_baseline.json")
+CANVAS_SIZE = (1100, 800)
+FOLDER_COUNTS = (100, 1000, 5000)
+PREVIEW_CASES = [(rot, qual, zoom) for rot in (0, 90) for qual in (1.0, 0.5) for zoom in (1.0, 2.0)]
+DEFAULT_TOLERANCE = 0.25
+
+
+def timed(fn, repeat, setup=None):
+    """setup() 후 fn() 을 repeat 번 재고 중앙값 ms"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def make_folder(folder, source, count, base_filename="img"):
+    """source 를 count 장 복제한 촬영 폴더 (하드링크, 안 되면 복사)"""
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        path = os.path.join(folder, f"{base_filename}_{i:05d}.jpg")
+        try:
+            os.link(source, path)
+        except OSError:
+            shutil.copyfile(source, path)
+    return folder
+
+
+def bench_canvas(root, image_path, repeat):
+    results = {}
+    state = {"rot": 0, "qual": 1.0, "zoom": 1.0}
+    win = tk.Toplevel(root)
+    canvas = FastResizableImageCanvas(
+        win, get_rotation_callback=lambda: state["rot"], get_quality_callback=lambda: state["qual"],
+        get_zoom_callback=lambda: state["zoom"], image_cache=DecodedImageCache(), renderer=PreviewRenderer(),
+        width=CANVAS_SIZE[0], height=CANVAS_SIZE[1],
+    )
+    canvas.pack(fill="both", expand=True)
+    win.update()
+
+    def set_image():
+        canvas.set_image(image_path)
+        win.update_idletasks()
+
+    results["canvas.set_image.cold"] = timed(set_image, repeat, setup=canvas.image_cache.clear)
+    results["canvas.set_image.warm"] = timed(set_image, repeat)
+
+    for rot, qual, zoom in PREVIEW_CASES:
+        state.update(rot=rot, qual=qual, zoom=zoom)
+
+        def update():
+            canvas._update_preview(force=True)
+            win.update_idletasks()
+
+        results[f"canvas.update_preview.rot{rot}_q{qual}_z{zoom}"] = timed(update, repeat)
+    win.destroy()
+    return results
+
+
+def bench_gallery(root, image_path, repeat, count=20):
+    win = tk.Toplevel(root)
+    gallery = ThumbnailGallery(win, lambda p: None, thumb_size=64)
+    gallery.pack(fill="both", expand=True)
+    win.update()
+
+    def add_many():
+        for _ in range(count):
+            gallery.add_thumbnail(image_path)
+        win.update_idletasks()
+
+    ms = timed(add_many, repeat, setup=gallery.clear) / count
+    win.destroy()
+    return {"gallery.add_thumbnail": ms}
+
+
+def bench_refresh(root, folders, repeat):
+    """실제 CameraGUI 로 폴더 사진 수별 refresh_thumbnails (카메라 연결은 실패해도 무관)"""
+    results = {}
+    app = CameraGUI(root)
+    root.update()
+    try:
+        for count, folder in folders.items():
+            app.save_dir_var.set(folder)  # 변경 시 한 번 갱신됨 (워밍업)
+            app.base_filename_var.set("img")
+            root.update_idletasks()
+
+            def refresh():
+                app.refresh_thumbnails()
+                root.update_idletasks()
+
+            results[f"gui.refresh_thumbnails.{count}"] = timed(refresh, repeat)
+    finally:
+        app.on_close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """[(항목, 기준 ms, 이번 ms, 비율, 느려짐 여부)]"""
+    rows = []
+    for name, ms in results.items():
+        base = baseline.get(name)
+        ratio = ms / base if base else None
+        rows.append((name, base, ms, ratio, ratio is not None and ratio > 1 + tolerance))
+    return rows
+
+
+def environment():
+    return {"host": platform.node(), "platform": platform.platform(), "python": platform.python_version(),
+            "pillow": PIL.__version__, "tk": str(tk.TkVersion)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI 미리보기/썸네일 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--preview", choices=sorted(FIXTURE_SIZES), default="24MP", help="미리보기 사진 크기")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(FOLDER_COUNTS), help="폴더 사진 수")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="기준값 JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="허용 느려짐 비율 (0.25 = 25%%)")
+    parser.add_argument("--json", metavar="PATH", help="이번 결과를 JSON 으로 저장")
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Tk 를 열 수 없습니다 ({e}). 화면이 없으면: xvfb-run -a python bench_gui.py", file=sys.stderr)
+        return 2
+    root.geometry("1680x950")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_gui_") as tmp:
+        image_path = make_fixtures(tmp, sizes=[args.preview])[args.preview]
+        folders = {n: make_folder(os.path.join(tmp, f"shoot_{n}"), image_path, n) for n in args.counts}
+        results.update(bench_canvas(root, image_path, args.repeat))
+        results.update(bench_gallery(root, image_path, args.repeat))
+        results.update(bench_refresh(root, folders, args.repeat))
+
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "preview": args.preview, "repeat": args.repeat,
+              "environment": environment(), "results": results}
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    regressions = 0
+    print(f"{'항목':<40} {'기준(ms)':>10} {'이번(ms)':>10} {'비율':>7}")
+    for name, base, ms, ratio, slower in compare(results, baseline, args.tolerance):
+        regressions += slower
+        print(f"{name:<40} {'-' if base is None else f'{base:.1f}':>10} {ms:>10.1f} "
+              f"{'-' if ratio is None else f'{ratio:.2f}x':>7}{'  느려짐' if slower else ''}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"기준값 저장: {args.baseline}")
+    elif not baseline:
+        print(f"기준값 없음 ({args.baseline}), --save-baseline 으로 저장")
+    if regressions:
+        print(f"{regressions}개 항목이 기준보다 {args.tolerance:.0%} 넘게 느려짐")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
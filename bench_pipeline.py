@@ -0,0 +1,155 @@
+"""테더링 파이프라인 벤치마크 (시뮬레이션 카메라 사용, 카메라 바디 불필요)
+
+    python bench_pipeline.py --burst-size 10 --burst-fps 10 --burst-interval 3 --duration 20
+    python bench_pipeline.py --cameras 2 --usb-mbps 35 --format jpeg --error-rate 0.01 --json result.json
+
+camera_backend.SimulatedBackend 로 연사 패턴대로 파일 생성 이벤트를 내보내고, TetherEngine 이
+이벤트 수신 -> 다운로드 -> 저장 -> 알림까지 처리하는 속도를 잰다 (업로드는 끔).
+밀린 양(backlog)은 카메라 카드에 기록된 파일 수 - 엔진이 저장한 파일 수 로, 일정 간격으로 샘플링한다.
+-53/-110 오류를 주입하면 전송 중이던 파일은 잃어버리므로 lost 로 따로 센다.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from camera_backend import BACKEND_SIM, SimFixtures, create_backend
+from latency_tracer import STAGE_DETECT, STAGE_FILE_GET, STAGE_SAVE, STAGE_NOTIFY
+from tether_engine import TetherEngine
+
+SAMPLE_INTERVAL = 0.1
+DRAIN_IDLE_SEC = 3.0  # 촬영 종료 후 이 시간 동안 저장이 늘지 않으면 끝난 것으로 봄
+
+
+def run_benchmark(args):
+    fixtures = SimFixtures(args.fixtures, jpeg_kb=args.jpeg_kb, raw_mb=args.raw_mb, save_format=args.format)
+    files_per_shot = len(fixtures.shot(0))
+    total_shots = args.shots or None
+    backend = create_backend(
+        BACKEND_SIM, cameras=args.cameras, fixtures=fixtures,
+        burst_size=args.burst_size, burst_fps=args.burst_fps, burst_interval=args.burst_interval,
+        shots=total_shots, usb_mbps=args.usb_mbps, error_rate=args.error_rate, seed=args.seed,
+    )
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    log = print if args.verbose else None
+    engine = TetherEngine(save_dir=work_dir, save_format=args.format, log_callback=log, backend=backend,
+                          journal_path=os.path.join(work_dir, "upload_journal.db"))
+    engine.s3_manager.upload_enabled = False
+
+    saved_at = []
+    recoveries = []
+    saved_lock = threading.Lock()
+
+    def on_event(event, data):
+        if event == "saved":
+            with saved_lock:
+                saved_at.append(time.perf_counter())
+        elif event == "recovered":
+            recoveries.append(data["recovery_sec"])
+
+    engine.add_listener(on_event)
+    try:
+        if not engine.connect_camera(retries=1):
+            raise SystemExit("시뮬레이션 카메라 연결 실패")
+        cameras = list(backend.cameras.values())
+        start = time.perf_counter()
+        backlog_samples = []
+        deadline = start + args.duration
+        while time.perf_counter() < deadline:
+            time.sleep(SAMPLE_INTERVAL)
+            produced = sum(c.produced() for c in cameras)
+            with saved_lock:
+                done = len(saved_at)
+            backlog_samples.append(produced - done)
+            if total_shots and done >= total_shots * files_per_shot * args.cameras:
+                break
+        for camera in cameras:
+            camera.stop_shooting()
+        produced_end = time.perf_counter()
+
+        # 촬영이 멈춘 뒤 밀린 파일을 다 받는 데 걸린 시간
+        produced = sum(c.produced() for c in cameras)
+        drain_deadline = produced_end + args.drain_timeout
+        last_done, last_progress = -1, produced_end
+        while time.perf_counter() < drain_deadline:
+            with saved_lock:
+                done = len(saved_at)
+            now = time.perf_counter()
+            if done != last_done:
+                last_done, last_progress = done, now
+            if done >= produced:
+                break
+            if now - last_progress > DRAIN_IDLE_SEC and not any(c.pending_events() for c in cameras):
+                break  # 남은 것은 오류로 잃어버린 파일
+            time.sleep(SAMPLE_INTERVAL)
+        with saved_lock:
+            saved = list(saved_at)
+        drain_sec = (saved[-1] - produced_end) if saved and saved[-1] > produced_end else 0.0
+        elapsed = (saved[-1] - start) if saved else 0.0
+        summary = engine.latency_tracer.summary()
+
+        def stage_ms(stage, key):
+            value = summary.get(stage, {}).get(key)
+            return round(value, 1) if value is not None else None
+
+        return {
+            "cameras": args.cameras,
+            "format": args.format,
+            "burst": f"{args.burst_size}@{args.burst_fps}fps/{args.burst_interval}s",
+            "usb_mbps": args.usb_mbps,
+            "files_shot": produced,
+            "events": sum(c.events_emitted for c in cameras),
+            "saved": len(saved),
+            "lost": produced - len(saved),
+            "files_per_sec": round(len(saved) / elapsed, 2) if elapsed else None,
+            "mb_per_sec": round(sum(c.bytes_sent for c in cameras) / elapsed / (1024 * 1024), 2) if elapsed else None,
+            "backlog_max": max(backlog_samples) if backlog_samples else 0,
+            "backlog_avg": round(sum(backlog_samples) / len(backlog_samples), 2) if backlog_samples else 0,
+            "drain_sec": round(drain_sec, 2),
+            "errors_injected": sum(c.errors_injected for c in cameras),
+            "reconnects": len(recoveries),
+            "recovery_max_ms": round(max(recoveries) * 1000, 1) if recoveries else None,
+            "detect_p50_ms": stage_ms(STAGE_DETECT, "p50_ms"),
+            "detect_p99_ms": stage_ms(STAGE_DETECT, "p99_ms"),
+            "file_get_p50_ms": stage_ms(STAGE_FILE_GET, "p50_ms"),
+            "save_p50_ms": stage_ms(STAGE_SAVE, "p50_ms"),
+            "notify_p99_ms": stage_ms(STAGE_NOTIFY, "p99_ms"),
+        }
+    finally:
+        engine.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시뮬레이션 카메라 대상 테더링 파이프라인 벤치마크")
+    parser.add_argument("--cameras", type=int, default=1)
+    parser.add_argument("--format", choices=("both", "raw", "jpeg"), default="both")
+    parser.add_argument("--fixtures", default=None, help="카메라가 내보낼 파일 폴더 (없으면 가짜 파일 생성)")
+    parser.add_argument("--jpeg-kb", type=int, default=3000, help="가짜 JPEG 크기")
+    parser.add_argument("--raw-mb", type=float, default=24, help="가짜 RAW 크기")
+    parser.add_argument("--burst-size", type=int, default=5, help="연사 한 번의 장 수")
+    parser.add_argument("--burst-fps", type=float, default=10.0, help="연사 속도")
+    parser.add_argument("--burst-interval", type=float, default=2.0, help="연사 시작 간격(초)")
+    parser.add_argument("--shots", type=int, default=0, help="카메라당 촬영 수 (0 이면 --duration 동안 계속)")
+    parser.add_argument("--duration", type=float, default=15.0, help="촬영을 계속하는 시간(초)")
+    parser.add_argument("--drain-timeout", type=float, default=120.0, help="촬영 종료 후 밀린 파일을 기다리는 최대 시간")
+    parser.add_argument("--usb-mbps", type=float, default=40.0, help="카메라당 USB 전송 속도 (0 이면 제한 없음)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="카메라 호출당 -53/-110 오류 확률")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", metavar="PATH", help="결과를 JSON 으로 저장")
+    parser.add_argument("--verbose", action="store_true", help="엔진 로그 출력")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    for k, v in result.items():
+        print(f"{k:>16}: {v}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""미리보기 렌더링 마이크로 벤치마크 (카메라/화면 불필요)
+
+    python bench_render.py --repeat 5
+    python bench_render.py --fixtures ./raw_jpegs     # 실제 카메라 JPEG 로 측정
+
+24/42/61MP JPEG 을 임시 폴더에 만들어(ICC 프로파일 포함) 예전 경로(legacy_render)와
+render_engine.PreviewRenderer 를 회전 0/90도, 확대 1/2배로 비교한다.
+만든 사진의 프로파일은 sRGB 라서 평소엔 색 변환을 건너뛰므로, 변환 비용은 "icc" 열에서 강제로 잰다.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from PIL import Image, ImageChops, ImageStat
+
+from render_engine import PreviewRenderer, legacy_render, ImageCms
+
+FIXTURE_SIZES = {
+    "24MP": (6000, 4000),
+    "42MP": (7952, 5304),
+    "61MP": (9504, 6336),
+}
+BOX = (1100, 800)  # 1680x950 창에서 메인 캔버스 크기 정도
+CASES = [(0, 1.0), (90, 1.0), (0, 2.0)]  # (회전, 확대)
+
+
+def make_fixtures(folder, sizes=None):
+    """크기별 JPEG (그라디언트 + 노이즈, sRGB ICC 포함), sizes 로 FIXTURE_SIZES 중 일부만"""
+    icc = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes() if ImageCms else None
+    paths = {}
+    for name in sizes or FIXTURE_SIZES:
+        size = FIXTURE_SIZES[name]
+        small = Image.merge("RGB", [
+            Image.linear_gradient("L").resize((600, 400)),
+            Image.radial_gradient("L").resize((600, 400)),
+            Image.effect_noise((600, 400), 40),
+        ])
+        img = small.resize(size, resample=Image.BILINEAR)
+        path = os.path.join(folder, f"fixture_{name}.jpg")
+        img.save(path, quality=90, **({"icc_profile": icc} if icc else {}))
+        paths[name] = path
+    return paths
+
+
+def timed(fn, repeat):
+    """fn() 을 repeat 번 실행, (중앙값 ms, 마지막 결과)"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def mean_abs_diff(a, b):
+    """두 미리보기의 평균 픽셀 차이 (0~255, 크기가 다르면 None)"""
+    if a.size != b.size:
+        return None
+    return sum(ImageStat.Stat(ImageChops.difference(a.convert("RGB"), b.convert("RGB"))).mean) / 3
+
+
+def run(paths, repeat):
+    renderer = PreviewRenderer()
+    icc_renderer = PreviewRenderer(skip_srgb=False)
+    results = []
+    for name, path in paths.items():
+        decode_ms, src = timed(lambda: _decode(path), 1)
+        for rotation, zoom in CASES:
+            legacy_ms, legacy_img = timed(lambda: legacy_render(src, BOX, rotation, 1.0, zoom), repeat)
+            new_ms, new_img = timed(lambda: renderer.render(src, BOX, rotation, zoom), repeat)
+            icc_ms = None
+            if icc_renderer.color_manage and src.info.get("icc_profile"):
+                icc_ms, _ = timed(lambda: icc_renderer.render(src, BOX, rotation, zoom), repeat)
+            results.append({
+                "fixture": name, "pixels": src.width * src.height, "rotation": rotation, "zoom": zoom,
+                "decode_ms": decode_ms, "legacy_ms": legacy_ms, "new_ms": new_ms, "icc_ms": icc_ms,
+                "speedup": legacy_ms / new_ms if new_ms else None,
+                "mean_abs_diff": mean_abs_diff(legacy_img, new_img),
+            })
+    return results
+
+
+def _decode(path):
+    img = Image.open(path)
+    img.load()
+    return img
+
+
+def main():
+    parser = argparse.ArgumentParser(description="미리보기 렌더링 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fixtures", metavar="DIR", help="이 폴더의 JPEG 로 측정 (없으면 24/42/61MP 생성)")
+    parser.add_argument("--json", metavar="PATH", help="결과를 JSON 으로 저장")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_render_") as tmp:
+        if args.fixtures:
+            files = sorted(glob.glob(os.path.join(args.fixtures, "*.jp*g")) + glob.glob(os.path.join(args.fixtures, "*.JP*G")))
+            paths = {os.path.basename(p): p for p in files}
+        else:
+            paths = make_fixtures(tmp)
+        results = run(paths, args.repeat)
+
+    print(f"{'fixture':>16} {'rot':>4} {'zoom':>5} {'decode':>8} {'legacy':>8} {'new':>8} {'icc':>8} {'speedup':>8} {'diff':>6}")
+    for r in results:
+        icc = "-" if r["icc_ms"] is None else f"{r['icc_ms']:.1f}"
+        diff = "-" if r["mean_abs_diff"] is None else f"{r['mean_abs_diff']:.2f}"
+        print(f"{r['fixture']:>16} {r['rotation']:>4} {r['zoom']:>5} {r['decode_ms']:>8.1f} {r['legacy_ms']:>8.1f} "
+              f"{r['new_ms']:>8.1f} {icc:>8} {r['speedup']:>7.1f}x {diff:>6}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""업로드 처리량 벤치마크 (local_s3_server 대역 서버 사용, AWS 불필요)
+
+    python bench_upload.py --files 200 --size-kb 512 --workers 4
+    python bench_upload.py --engine async --latency-ms 40 --bandwidth-mbps 20 --json result.json
+
+임시 폴더에 임의 내용 파일을 만들어 AWSS3Manager(또는 AsyncS3Manager)로 큐에 넣고,
+큐 추가 시각부터 서버가 객체를 받은 시각까지를 지연시간으로 잰다.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from aws_manager import AWSS3Manager, DEFAULT_UPLOAD_WORKERS, base_object_key
+from local_s3_server import LocalS3Server
+
+
+def make_files(root, count, size):
+    """세션 폴더 아래 임의 내용 JPEG 이름 파일 생성 (내용이 모두 달라 중복 건너뛰기가 일어나지 않음)"""
+    session_dir = os.path.join(root, "bench_session")
+    os.makedirs(session_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(session_dir, f"IMG_{i:05d}.jpg")
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(pct / 100.0 * (len(values) - 1)))))
+    return values[k]
+
+
+def run_benchmark(args):
+    server = LocalS3Server(
+        latency_ms=args.latency_ms, presign_latency_ms=args.presign_latency_ms,
+        bandwidth_mbps=args.bandwidth_mbps, error_rate=args.error_rate, seed=args.seed
+    ).start()
+    work_dir = tempfile.mkdtemp(prefix="bench_upload_")
+    try:
+        paths = make_files(work_dir, args.files, args.size_kb * 1024)
+        keys = {base_object_key(p): p for p in paths}
+        settings = {
+            "lambda_url": server.lambda_url,
+            "upload_enabled": True,
+            "upload_workers": args.workers,
+            "upload_rate_limit_mbps": args.rate_limit_mbps,
+            "upload_engine": args.engine,
+            "async_concurrency": args.concurrency,
+        }
+        if args.engine == "async":
+            from aws_async_manager import AsyncS3Manager, aiohttp
+            if aiohttp is None:
+                raise SystemExit("aiohttp 가 설치되지 않아 async 엔진을 벤치마크할 수 없음")
+            manager_cls = AsyncS3Manager
+        else:
+            manager_cls = AWSS3Manager
+        log = print if args.verbose else (lambda msg: None)
+        manager = manager_cls(
+            log_callback=log, journal_path=os.path.join(work_dir, "journal.db"), settings=settings
+        )
+
+        enqueued = {}
+        start = time.time()
+        for key, path in keys.items():
+            enqueued[key] = time.time()
+            manager.queue_upload(path)
+
+        deadline = start + args.timeout
+        while time.time() < deadline:
+            if manager.get_queue_size() == 0:
+                break
+            time.sleep(0.05)
+        elapsed = time.time() - start
+        manager.stop_upload_worker()
+
+        latencies = [
+            server.objects[key]["completed_at"] - t for key, t in enqueued.items() if key in server.objects
+        ]
+        done = len(latencies)
+        total_bytes = sum(os.path.getsize(keys[k]) for k in enqueued if k in server.objects)
+        stats = server.stats()
+        return {
+            "engine": args.engine,
+            "workers": args.workers,
+            "files": args.files,
+            "size_kb": args.size_kb,
+            "uploaded": done,
+            "failed": manager.get_failed_count(),
+            "elapsed_sec": round(elapsed, 3),
+            "files_per_sec": round(done / elapsed, 2) if elapsed else None,
+            "mb_per_sec": round(total_bytes / elapsed / (1024 * 1024), 2) if elapsed else None,
+            "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+            "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+            "lambda_calls": stats["lambda_calls"],
+            "injected_errors": stats["injected_errors"],
+        }
+    finally:
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 대역 서버 대상 S3 업로드 벤치마크")
+    parser.add_argument("--engine", choices=("thread", "async"), default="thread")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=DEFAULT_UPLOAD_WORKERS)
+    parser.add_argument("--concurrency", type=int, default=16, help="async 엔진 동시 업로드 수")
+    parser.add_argument("--rate-limit-mbps", type=float, default=0, help="클라이언트 업로드 속도 제한")
+    parser.add_argument("--latency-ms", type=float, default=0, help="서버 PUT 지연")
+    parser.add_argument("--presign-latency-ms", type=float, default=0, help="서버 Lambda 지연")
+    parser.add_argument("--bandwidth-mbps", type=float, default=0, help="서버 수신 대역폭 제한")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="서버 503 응답 비율")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--json", metavar="PATH", help="결과를 JSON 으로 저장")
+    parser.add_argument("--verbose", action="store_true", help="매니저 로그 출력")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    for k, v in result.items():
+        print(f"{k:>16}: {v}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
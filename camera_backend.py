@@ -0,0 +1,425 @@
+"""카메라 백엔드: 실제 카메라(gphoto2) 또는 시뮬레이션 카메라
+
+tether_engine 은 카메라를 백엔드 객체를 통해서만 다룬다. 백엔드는 gphoto2 모듈과 같은 이름의
+상수/타입(GP_EVENT_FILE_ADDED, GP_EVENT_TIMEOUT, GP_FILE_TYPE_NORMAL, GP_CAPTURE_IMAGE,
+GPhoto2Error, CameraFile)과 아래 두 메서드를 제공한다:
+
+    autodetect()        -> [(모델명, 포트), ...]
+    open(model, port)   -> 카메라 객체 (init 전, gp.Camera 와 같은 메서드)
+
+SimulatedBackend 는 카메라 바디 없이 파이프라인 성능을 재기 위한 것으로, 정해진 연사 패턴으로
+GP_EVENT_FILE_ADDED 를 내보내고 USB 대역폭만큼 시간을 들여 파일을 넘겨주며 -53/-110 오류를 섞을 수 있다.
+"""
+import io
+import os
+import random
+import threading
+import time
+import types
+from collections import deque
+
+try:
+    import gphoto2 as gp
+except ImportError:  # 시뮬레이션 백엔드만 쓸 때는 없어도 됨
+    gp = None
+
+BACKEND_GPHOTO2 = "gphoto2"
+BACKEND_SIM = "sim"
+
+SIM_FOLDER = "/store_00010001/DCIM/100MSDCF"
+SIM_CARD_EPOCH = 1700000000  # 미리 찍혀 있던 사진의 촬영 시각 기준
+SIM_ERROR_CODES = (-53, -110)  # GP_ERROR_IO_USB_CLAIM, GP_ERROR_CAMERA_BUSY (실제 바디에서 자주 나는 오류)
+
+
+class GPhoto2Backend:
+    """libgphoto2 (python-gphoto2) 로 실제 카메라 사용"""
+
+    name = BACKEND_GPHOTO2
+
+    def __init__(self):
+        if gp is None:
+            raise RuntimeError("gphoto2 가 설치되어 있지 않습니다 (pip install gphoto2)")
+        self.GP_EVENT_FILE_ADDED = gp.GP_EVENT_FILE_ADDED
+        self.GP_EVENT_TIMEOUT = gp.GP_EVENT_TIMEOUT
+        self.GP_EVENT_CAPTURE_COMPLETE = gp.GP_EVENT_CAPTURE_COMPLETE
+        self.GP_FILE_TYPE_NORMAL = gp.GP_FILE_TYPE_NORMAL
+        self.GP_CAPTURE_IMAGE = gp.GP_CAPTURE_IMAGE
+        self.GPhoto2Error = gp.GPhoto2Error
+        self.CameraFile = gp.CameraFile
+
+    def autodetect(self):
+        camera_list = gp.Camera.autodetect(gp.Context())
+        return [(camera_list[i][0], camera_list[i][1]) for i in range(len(camera_list))]
+
+    def open(self, model, port):
+        """해당 포트의 카메라 (여러 대가 연결되어 있을 때 gp.Camera() 기본 동작은 첫 카메라만 잡음)"""
+        camera = gp.Camera()
+        port_info_list = gp.PortInfoList()
+        port_info_list.load()
+        camera.set_port_info(port_info_list[port_info_list.lookup_path(port)])
+        abilities_list = gp.CameraAbilitiesList()
+        abilities_list.load()
+        camera.set_abilities(abilities_list[abilities_list.lookup_model(model)])
+        return camera
+
+
+# --------- 시뮬레이션 ----------
+class SimGPhoto2Error(Exception):
+    def __init__(self, code):
+        super().__init__(f"[{code}] simulated gphoto2 error")
+        self.code = code
+
+
+class SimCameraFile:
+    def __init__(self):
+        self.data = b""
+
+    def set_data(self, data):
+        self.data = data
+
+    def get_data_and_size(self):
+        return memoryview(self.data)
+
+    def save(self, target):
+        with open(target, "wb") as f:
+            f.write(self.data)
+
+
+class SimCameraFilePath:
+    def __init__(self, folder, name):
+        self.folder = folder
+        self.name = name
+
+
+class SimCameraFileInfo:
+    """gp.CameraFileInfo 대역 (info.file.size, info.file.mtime 만)"""
+
+    def __init__(self, size, mtime):
+        self.file = types.SimpleNamespace(size=size, mtime=mtime)
+
+
+class SimConfigWidget:
+    def __init__(self, name, value, choices):
+        self.name = name
+        self.value = value
+        self.choices = list(choices)
+
+    def get_value(self):
+        return self.value
+
+    def get_choices(self):
+        return iter(self.choices)
+
+    def set_value(self, value):
+        if value not in self.choices:
+            raise SimGPhoto2Error(-2)
+        self.value = value
+
+
+class SimConfig:
+    def __init__(self, widgets):
+        self.widgets = {w.name: w for w in widgets}
+
+    def get_child_by_name(self, name):
+        if name not in self.widgets:
+            raise SimGPhoto2Error(-2)  # GP_ERROR_BAD_PARAMETERS
+        return self.widgets[name]
+
+
+def _default_config():
+    return [
+        SimConfigWidget("iso", "100", ["100", "200", "400", "800", "1600", "3200"]),
+        SimConfigWidget("shutterspeed", "1/125", ["1/60", "1/125", "1/250", "1/500", "1/1000"]),
+        SimConfigWidget("f-number", "f/5.6", ["f/2.8", "f/4", "f/5.6", "f/8", "f/11"]),
+        SimConfigWidget("whitebalance", "Daylight", ["Automatic", "Daylight", "Tungsten", "Choose Color Temperature"]),
+        SimConfigWidget("colortemperature", "5500", [str(k) for k in range(2500, 9900, 100)]),
+    ]
+
+
+def _synthetic_jpeg(size, kb, seed):
+    """대략 kb 크기의 JPEG (노이즈 이미지라 압축이 덜 됨)"""
+    from PIL import Image
+    rnd = random.Random(seed)
+    width, height = size
+    img = Image.frombytes("RGB", (64, 64), bytes(rnd.getrandbits(8) for _ in range(64 * 64 * 3)))
+    img = img.resize((width, height), resample=Image.NEAREST)
+    quality = 95
+    while True:
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=quality)
+        data = buf.getvalue()
+        if len(data) <= kb * 1024 or quality <= 30:
+            break
+        quality -= 10
+    if len(data) < kb * 1024:
+        # JPEG 끝(EOI) 뒤 여분은 디코더가 무시하므로 크기를 맞추는 데 씀
+        data += bytes(kb * 1024 - len(data))
+    return data
+
+
+class SimFixtures:
+    """시뮬레이션 카메라가 내보낼 파일들 (확장자별 바이트열 목록)
+
+    fixture_dir 을 주면 그 폴더의 파일을 이름(확장자 제외)별로 묶어 한 번 촬영분으로 쓰고,
+    없으면 jpeg_kb / raw_mb 크기의 가짜 파일을 만든다.
+    """
+
+    def __init__(self, fixture_dir=None, jpeg_kb=3000, raw_mb=24, jpeg_size=(1616, 1080), preview_size=(1024, 680),
+                 save_format="both"):
+        self.shots = []  # [{".jpg": bytes, ".arw": bytes}, ...]
+        if fixture_dir:
+            groups = {}
+            for name in sorted(os.listdir(fixture_dir)):
+                stem, ext = os.path.splitext(name)
+                path = os.path.join(fixture_dir, name)
+                if os.path.isfile(path) and ext:
+                    with open(path, "rb") as f:
+                        groups.setdefault(stem, {})[ext.lower()] = f.read()
+            self.shots = list(groups.values())
+            if not self.shots:
+                raise ValueError(f"fixture 폴더에 파일이 없습니다: {fixture_dir}")
+        else:
+            shot = {}
+            if save_format in ("both", "jpeg"):
+                shot[".jpg"] = _synthetic_jpeg(jpeg_size, jpeg_kb, seed=1)
+            if save_format in ("both", "raw"):
+                shot[".arw"] = os.urandom(int(raw_mb * 1024 * 1024))
+            self.shots = [shot]
+        self.preview = _synthetic_jpeg(preview_size, 80, seed=2)
+
+    def shot(self, index):
+        return self.shots[index % len(self.shots)]
+
+
+class SimulatedCamera:
+    """gp.Camera 대역 (tether_engine/live_view 가 쓰는 메서드만)
+
+    연사 패턴: burst_interval 초마다 burst_size 장을 burst_fps 로 촬영. 촬영 한 장마다 파일(JPEG/RAW)
+    수만큼 GP_EVENT_FILE_ADDED 가 순서대로 나온다. shots 를 주면 그 수만큼만 촬영.
+    capture() (PC 촬영) 는 첫 파일 경로만 돌려주고 나머지 파일은 이벤트로 내보낸다.
+    file_get 은 usb_mbps 대역폭으로 전송하는 만큼 시간이 걸린다 (여러 대면 카메라마다 따로).
+    error_rate 확률로 -53/-110 오류를 내고, 그 뒤로는 exit()+init() 전까지 계속 같은 오류를 낸다.
+    """
+
+    GP_EVENT_TIMEOUT = 0
+    GP_EVENT_FILE_ADDED = 2
+    GP_EVENT_CAPTURE_COMPLETE = 4
+
+    def __init__(self, fixtures, burst_size=5, burst_fps=10.0, burst_interval=2.0, shots=None, usb_mbps=40.0,
+                 error_rate=0.0, seed=None, start_delay=0.0, card_shots=0):
+        self.fixtures = fixtures
+        self.burst_size = max(1, int(burst_size))
+        self.burst_fps = burst_fps
+        self.burst_interval = burst_interval
+        self.shots_limit = shots
+        self.usb_bytes_per_sec = usb_mbps * 1024 * 1024 if usb_mbps else None
+        self.error_rate = error_rate
+        self.start_delay = start_delay
+        self.rnd = random.Random(seed)
+        self.config = SimConfig(_default_config())
+        self.files = {}  # 이름 -> 바이트열 (카메라 카드)
+        self.file_times = {}  # 이름 -> 기록 시각 (초, 정수)
+        self.initialized = False
+        self.broken = None  # 주입된 오류 코드 (재초기화 전까지 유지)
+        self._lock = threading.Lock()
+        self._events = deque()  # (예정 시각, 파일 이름)
+        self._next_shot_at = None
+        self._shot_index = 0
+        self._in_burst = 0
+        # 벤치마크용 카운터
+        self.events_emitted = 0
+        self.bytes_sent = 0
+        self.errors_injected = 0
+        # 연결 전부터 카드에 있던 사진 (카드 가져오기 테스트용)
+        for _ in range(card_shots):
+            for name in self._new_shot():
+                # 실행할 때마다 같은 카드로 보이도록 촬영 시각을 고정
+                self.file_times[name] = SIM_CARD_EPOCH + self._shot_index * 60
+
+    # ---------- 연결 ----------
+    def init(self):
+        self.initialized = True
+        self.broken = None
+        # 실제 바디처럼 끊기기 전에 전달하지 못한 이벤트는 사라짐 (파일은 카드에 남음)
+        with self._lock:
+            self._events.clear()
+        if self._next_shot_at is None:
+            self._next_shot_at = time.monotonic() + self.start_delay
+
+    def exit(self):
+        self.initialized = False
+
+    def _check(self):
+        if not self.initialized:
+            raise SimGPhoto2Error(-52)  # GP_ERROR_IO_USB_FIND
+        if self.broken is not None:
+            raise SimGPhoto2Error(self.broken)
+        if self.error_rate and self.rnd.random() < self.error_rate:
+            self.broken = self.rnd.choice(SIM_ERROR_CODES)
+            self.errors_injected += 1
+            raise SimGPhoto2Error(self.broken)
+
+    # ---------- 촬영 ----------
+    def _new_shot(self):
+        """촬영 한 장을 카드에 기록하고 파일 이름 목록 반환"""
+        self._shot_index += 1
+        names = []
+        for ext, data in self.fixtures.shot(self._shot_index - 1).items():
+            name = f"DSC{self._shot_index:05d}{ext.upper()}"
+            self.files[name] = data
+            self.file_times[name] = int(time.time())
+            names.append(name)
+        return names
+
+    def produced(self):
+        """지금까지 카드에 기록된 파일 수 (이벤트를 아직 안 꺼냈어도 촬영 시각이 지난 것 포함)"""
+        with self._lock:
+            self._schedule(time.monotonic())
+            return len(self.files)
+
+    def pending_events(self):
+        with self._lock:
+            return len(self._events)
+
+    def stop_shooting(self):
+        """이후 예정된 촬영 중단 (이미 찍은 파일의 이벤트는 그대로 나감)"""
+        with self._lock:
+            self._schedule(time.monotonic())
+            self.shots_limit = self._shot_index
+            self._next_shot_at = None
+
+    def _schedule(self, now):
+        """지금까지 도래한 촬영의 이벤트를 큐에 넣음"""
+        while self._next_shot_at is not None and self._next_shot_at <= now:
+            if self.shots_limit is not None and self._shot_index >= self.shots_limit:
+                self._next_shot_at = None
+                break
+            at = self._next_shot_at
+            for name in self._new_shot():
+                self._events.append((at, name))
+            self._in_burst += 1
+            if self._in_burst >= self.burst_size:
+                self._in_burst = 0
+                self._next_shot_at = at + max(self.burst_interval - (self.burst_size - 1) / self.burst_fps, 0.0)
+            else:
+                self._next_shot_at = at + 1.0 / self.burst_fps
+
+    def wait_for_event(self, timeout_ms):
+        self._check()
+        deadline = time.monotonic() + timeout_ms / 1000.0
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                self._schedule(now)
+                if self._events:
+                    _, name = self._events.popleft()
+                    self.events_emitted += 1
+                    return self.GP_EVENT_FILE_ADDED, SimCameraFilePath(SIM_FOLDER, name)
+                next_at = self._next_shot_at
+            if now >= deadline:
+                return self.GP_EVENT_TIMEOUT, None
+            wake = deadline if next_at is None else min(deadline, next_at)
+            time.sleep(max(0.0, wake - now))
+
+    def capture(self, capture_type=None):
+        self._check()
+        time.sleep(0.05)  # 셔터/기록 시간
+        with self._lock:
+            names = self._new_shot()
+            # 실제 바디처럼 첫 파일만 돌려주고 나머지(RAW+JPEG 의 짝)는 GP_EVENT_FILE_ADDED 로 알림
+            now = time.monotonic()
+            self._events.extend((now, name) for name in names[1:])
+        return SimCameraFilePath(SIM_FOLDER, names[0])
+
+    def capture_preview(self):
+        self._check()
+        camera_file = SimCameraFile()
+        self._transfer(len(self.fixtures.preview))
+        camera_file.set_data(self.fixtures.preview)
+        return camera_file
+
+    # ---------- 파일 ----------
+    def _transfer(self, size):
+        if self.usb_bytes_per_sec:
+            time.sleep(size / self.usb_bytes_per_sec)
+        self.bytes_sent += size
+
+    def file_get(self, folder, name, file_type, camera_file):
+        self._check()
+        data = self.files.get(name)
+        if data is None:
+            raise SimGPhoto2Error(-108)  # GP_ERROR_FILE_NOT_FOUND
+        self._transfer(len(data))
+        camera_file.set_data(data)
+        return camera_file
+
+    def folder_list_files(self, folder):
+        """gp.CameraList 처럼 (이름, 값) 쌍 목록"""
+        self._check()
+        if folder != SIM_FOLDER:
+            return []
+        return [(name, None) for name in sorted(self.files)]
+
+    def folder_list_folders(self, folder):
+        self._check()
+        parent = folder.rstrip("/") + "/"
+        if not SIM_FOLDER.startswith(parent):
+            return []
+        return [(SIM_FOLDER[len(parent):].split("/")[0], None)]
+
+    def file_get_info(self, folder, name):
+        self._check()
+        if folder != SIM_FOLDER or name not in self.files:
+            raise SimGPhoto2Error(-108)
+        return SimCameraFileInfo(len(self.files[name]), self.file_times[name])
+
+    # ---------- 설정 ----------
+    def get_config(self):
+        self._check()
+        return self.config
+
+    def set_config(self, config):
+        self._check()
+        self.config = config
+
+
+class SimulatedBackend:
+    """카메라 없이 파이프라인을 돌리기 위한 백엔드 (카메라 n 대, 설정은 SimulatedCamera 참고)"""
+
+    name = BACKEND_SIM
+    GP_EVENT_TIMEOUT = SimulatedCamera.GP_EVENT_TIMEOUT
+    GP_EVENT_FILE_ADDED = SimulatedCamera.GP_EVENT_FILE_ADDED
+    GP_EVENT_CAPTURE_COMPLETE = SimulatedCamera.GP_EVENT_CAPTURE_COMPLETE
+    GP_FILE_TYPE_NORMAL = 1
+    GP_CAPTURE_IMAGE = 0
+    GPhoto2Error = SimGPhoto2Error
+    CameraFile = SimCameraFile
+
+    def __init__(self, cameras=1, fixtures=None, **camera_options):
+        self.fixtures = fixtures or SimFixtures()
+        self.camera_options = camera_options
+        self.ports = [f"sim:{i + 1:03d}" for i in range(cameras)]
+        self.cameras = {}  # 포트 -> SimulatedCamera (재연결해도 카드 내용과 카운터 유지)
+
+    def autodetect(self):
+        return [("Simulated Camera", port) for port in self.ports]
+
+    def open(self, model, port):
+        if port not in self.ports:
+            raise SimGPhoto2Error(-52)  # GP_ERROR_IO_USB_FIND
+        camera = self.cameras.get(port)
+        if camera is None:
+            options = dict(self.camera_options)
+            if options.get("seed") is not None:
+                options["seed"] = options["seed"] + self.ports.index(port)
+            camera = self.cameras[port] = SimulatedCamera(self.fixtures, **options)
+        return camera
+
+
+def create_backend(name=BACKEND_GPHOTO2, **options):
+    """이름으로 백엔드 생성 ("gphoto2" 또는 "sim", options 는 SimulatedBackend 인자)"""
+    if name == BACKEND_SIM:
+        return SimulatedBackend(**options)
+    if name == BACKEND_GPHOTO2:
+        return GPhoto2Backend()
+    raise ValueError(f"알 수 없는 카메라 백엔드: {name}")
@@ -0,0 +1,316 @@
+"""카드 가져오기: 카메라 카드에 이미 있는 사진을 한꺼번에 내려받기 (새 촬영 이벤트와 별개)
+
+    python card_ingest.py --dest ./card_import
+    python card_ingest.py --backend sim --sim-card-shots 200 --dest /tmp/card_import
+
+카메라 파일 시스템을 한 번 훑어서(folder_list_folders/folder_list_files/file_get_info), 받을 폴더에
+같은 이름/크기/수정시각의 파일이 이미 있으면 건너뛰고 나머지만 받는다.
+
+    전송 스레드 (file_get 을 쉬지 않고 연달아) -> 대기열(최대 INGEST_QUEUE_SIZE) -> 쓰기 스레드 n 개 (저장, 축소본/업로드 요청)
+
+USB 전송은 카메라 한 대당 한 번에 하나뿐이므로 전송 스레드는 디스크 쓰기/축소본 생성을 기다리지 않고
+곧바로 다음 파일을 요청한다. 카메라 락은 파일 하나 받는 동안만 잡으므로 그 사이 새로 찍은 사진도 받는다.
+파일은 .part 로 쓴 뒤 이름을 바꾸므로 중간에 끊기거나 다시 실행해도 받은 파일은 두고 나머지부터 이어 받는다.
+연결이 끊기면(-53/-110) 엔진의 재연결을 기다렸다가 같은 파일부터 계속한다.
+"""
+import argparse
+import json
+import os
+import posixpath
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+
+from tether_engine import TetherEngine, RECOVERABLE_ERRORS, exts_for_format
+
+INGEST_QUEUE_SIZE = 4  # 전송은 끝났지만 아직 디스크에 안 쓴 파일 수 (RAW 가 크면 메모리를 그만큼 씀)
+DEFAULT_INGEST_WRITERS = 2
+INGEST_RECOVERY_WAIT_SEC = 60.0  # 연결이 끊겼을 때 재연결을 기다리는 최대 시간
+PART_SUFFIX = ".part"
+MTIME_TOLERANCE_SEC = 2  # FAT 카드의 수정시각 단위
+
+
+def local_path_for(dest, folder, name):
+    """카메라 파일이 저장될 경로 (카메라 폴더 이름별로 나눠서 폴더가 달라도 이름이 겹치지 않게)"""
+    return os.path.join(dest, posixpath.basename(folder.rstrip("/")) or "root", name)
+
+
+def is_ingested(path, size, mtime):
+    """같은 크기/수정시각의 파일이 이미 있는지"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    if size is not None and st.st_size != size:
+        return False
+    return not mtime or abs(st.st_mtime - mtime) <= MTIME_TOLERANCE_SEC
+
+
+class CardIngest:
+    """카메라 한 대의 카드 가져오기 (TetherEngine.start_ingest 로 만든다)
+
+    on_progress(status) 는 파일 하나가 저장될 때마다 쓰기 스레드에서 호출된다.
+    """
+
+    def __init__(self, engine, dest, camera_id=None, save_format=None, writers=DEFAULT_INGEST_WRITERS,
+                 on_progress=None):
+        self.engine = engine
+        self.dest = dest
+        self.camera_id = camera_id
+        self.exts = exts_for_format(save_format or engine.save_format)
+        self.writers = max(1, int(writers))
+        self.on_progress = on_progress
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.state = "idle"  # scanning -> downloading -> done / stopped / failed
+        self.error = None
+        self.files_total = 0
+        self.files_skipped = 0
+        self.files_done = 0
+        self.files_failed = 0
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.reconnects = 0
+        self.started_at = None
+        self.download_started_at = None
+        self.finished_at = None
+        self._queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=50)  # (시각, 누적 전송 바이트)
+        self._transferred = 0
+
+    def log(self, msg, **fields):
+        self.engine.log(msg, component="ingest", camera_id=self.camera_id, **fields)
+
+    # ---------- 제어 ----------
+    def start(self):
+        self.stop_event.clear()
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, name="card-ingest", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=5)
+
+    def wait(self, timeout=None):
+        if self.thread:
+            self.thread.join(timeout)
+        return not self.is_running()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    # ---------- 카메라 호출 (끊기면 재연결 후 다시) ----------
+    def _call(self, session, func):
+        """func(camera) 를 카메라 락을 잡고 실행. -53/-110 이면 재연결을 기다렸다가 다시 시도"""
+        gp = self.engine.backend
+        while True:
+            if not self._wait_connected(session):
+                raise RuntimeError("카메라 재연결 실패")
+            try:
+                with session.lock:
+                    return func(session.camera)
+            except gp.GPhoto2Error as e:
+                if e.code not in RECOVERABLE_ERRORS:
+                    raise
+                self.reconnects += 1
+                self.log(f"카드 가져오기 중 연결 끊김, 재연결 후 이어서 받음: {e}")
+                self.engine.start_recovery(session, e)
+
+    def _wait_connected(self, session):
+        deadline = time.perf_counter() + INGEST_RECOVERY_WAIT_SEC
+        while session.state != "connected" or session.camera is None:
+            if self.stop_event.is_set() or session.closing.is_set() or time.perf_counter() > deadline:
+                return False
+            self.stop_event.wait(0.1)
+        return not self.stop_event.is_set()
+
+    # ---------- 훑기 ----------
+    def _scan(self, session):
+        """카메라의 모든 파일 중 받을 것 [(folder, name, size, mtime)] (폴더/이름 순)"""
+        todo = []
+        folders = ["/"]
+        while folders and not self.stop_event.is_set():
+            folder = folders.pop(0)
+            names = self._call(session, lambda camera: [n for n, _ in camera.folder_list_files(folder)])
+            subs = self._call(session, lambda camera: [n for n, _ in camera.folder_list_folders(folder)])
+            folders.extend(posixpath.join(folder, sub) for sub in sorted(subs))
+            for name in sorted(names):
+                if os.path.splitext(name)[1].lower() not in self.exts or self.stop_event.is_set():
+                    continue
+                info = self._call(session, lambda camera: camera.file_get_info(folder, name))
+                size, mtime = info.file.size, info.file.mtime
+                if is_ingested(local_path_for(self.dest, folder, name), size, mtime):
+                    self.files_skipped += 1
+                    continue
+                todo.append((folder, name, size, mtime))
+                self.bytes_total += size or 0
+        return todo
+
+    # ---------- 전송/쓰기 ----------
+    def _run(self):
+        session = self.engine.session(self.camera_id)
+        if session is None:
+            self.state, self.error = "failed", "카메라가 연결되어 있지 않습니다!"
+            self.log(f"카드 가져오기 실패: {self.error}")
+            return
+        self.camera_id = session.camera_id
+        writers = []
+        try:
+            self.state = "scanning"
+            todo = self._scan(session)
+            self.files_total = len(todo)
+            self.log(f"카드 가져오기: 받을 파일 {len(todo)}개 ({self.bytes_total / (1024 * 1024):.1f}MB), "
+                     f"이미 있음 {self.files_skipped}개", files=len(todo), skipped=self.files_skipped)
+            self.state = "downloading"
+            self.download_started_at = time.perf_counter()
+            for i in range(self.writers):
+                thread = threading.Thread(target=self._write_worker, name=f"card-ingest-write-{i}", daemon=True)
+                thread.start()
+                writers.append(thread)
+            gp = self.engine.backend
+            for folder, name, size, mtime in todo:
+                if self.stop_event.is_set():
+                    break
+                camera_file = gp.CameraFile()
+                try:
+                    self._call(session, lambda camera: camera.file_get(folder, name, gp.GP_FILE_TYPE_NORMAL, camera_file))
+                except gp.GPhoto2Error as e:
+                    with self._lock:
+                        self.files_failed += 1
+                    self.log(f"카드 가져오기 파일 오류: {folder}/{name}: {e}")
+                    continue
+                self._transferred += size or 0
+                self._recent.append((time.perf_counter(), self._transferred))
+                self._queue.put((folder, name, mtime, camera_file))
+            self.state = "stopped" if self.stop_event.is_set() else "done"
+        except Exception as e:
+            if self.stop_event.is_set():
+                self.state = "stopped"
+            else:
+                self.state, self.error = "failed", str(e)
+                self.log(f"카드 가져오기 실패: {e}")
+        finally:
+            for _ in writers:
+                self._queue.put(None)
+            for thread in writers:
+                thread.join()
+            self.finished_at = time.perf_counter()
+        status = self.status()
+        self.log(f"카드 가져오기 {self.state}: {self.files_done}/{self.files_total}개, "
+                 f"{status['mb_per_sec']}MB/s, 실패 {self.files_failed}개", state=self.state,
+                 files_done=self.files_done, files_failed=self.files_failed, mb_per_sec=status["mb_per_sec"])
+
+    def _write_worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            folder, name, mtime, camera_file = item
+            target = local_path_for(self.dest, folder, name)
+            part = target + PART_SUFFIX
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                camera_file.save(part)
+                if mtime:
+                    os.utime(part, (mtime, mtime))
+                os.replace(part, target)
+            except OSError as e:
+                with self._lock:
+                    self.files_failed += 1
+                self.log(f"카드 가져오기 저장 실패: {target}: {e}")
+                continue
+            size = os.path.getsize(target)
+            with self._lock:
+                self.files_done += 1
+                self.bytes_done += size
+            self.engine.notify_ingested(target, self.camera_id)
+            if self.on_progress:
+                self.on_progress(self.status())
+
+    # ---------- 상태 ----------
+    def status(self):
+        now = self.finished_at or time.perf_counter()
+        elapsed = (now - self.download_started_at) if self.download_started_at else 0.0
+        mb = self._transferred / (1024 * 1024)
+        recent = list(self._recent)
+        recent_mbps = None
+        if len(recent) >= 2 and recent[-1][0] > recent[0][0]:
+            recent_mbps = (recent[-1][1] - recent[0][1]) / (recent[-1][0] - recent[0][0]) / (1024 * 1024)
+        mbps = mb / elapsed if elapsed > 0 else None
+        remaining = self.bytes_total - self._transferred
+        rate = recent_mbps or mbps
+        return {
+            "camera_id": self.camera_id,
+            "state": self.state,
+            "dest": self.dest,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "files_skipped": self.files_skipped,
+            "files_failed": self.files_failed,
+            "mb_total": round(self.bytes_total / (1024 * 1024), 1),
+            "mb_done": round(mb, 1),
+            "mb_per_sec": round(mbps, 2) if mbps else None,
+            "recent_mb_per_sec": round(recent_mbps, 2) if recent_mbps else None,
+            "eta_sec": round(remaining / (rate * 1024 * 1024), 1) if rate and self.state == "downloading" else None,
+            "elapsed_sec": round(elapsed, 2),
+            "reconnects": self.reconnects,
+            "error": self.error,
+        }
+
+
+def main():
+    from camera_backend import BACKEND_GPHOTO2, BACKEND_SIM, SimFixtures, create_backend
+
+    parser = argparse.ArgumentParser(description="카메라 카드의 사진 한꺼번에 가져오기 (이어 받기 지원)")
+    parser.add_argument("--dest", default="./card_import", help="받을 폴더 (카메라 폴더 이름별 하위 폴더)")
+    parser.add_argument("--format", dest="save_format", choices=("both", "raw", "jpeg"), default="both")
+    parser.add_argument("--camera-id", default=None, help="여러 대일 때 대상 카메라 (cam1, cam2, ...)")
+    parser.add_argument("--writers", type=int, default=DEFAULT_INGEST_WRITERS, help="디스크 쓰기 스레드 수")
+    parser.add_argument("--backend", choices=(BACKEND_GPHOTO2, BACKEND_SIM), default=BACKEND_GPHOTO2)
+    parser.add_argument("--sim-card-shots", type=int, default=100, help="시뮬레이션 카드에 있는 촬영 수")
+    parser.add_argument("--sim-usb-mbps", type=float, default=40.0)
+    parser.add_argument("--sim-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", metavar="PATH", help="결과를 JSON 으로 저장")
+    args = parser.parse_args()
+
+    if args.backend == BACKEND_SIM:
+        backend = create_backend(BACKEND_SIM, fixtures=SimFixtures(save_format=args.save_format), shots=0,
+                                 card_shots=args.sim_card_shots, usb_mbps=args.sim_usb_mbps,
+                                 error_rate=args.sim_error_rate)
+    else:
+        backend = create_backend(BACKEND_GPHOTO2)
+    # 업로드는 하지 않으므로 업로드 저널은 임시 폴더에
+    journal_dir = tempfile.mkdtemp(prefix="card_ingest_")
+    engine = TetherEngine(save_dir=args.dest, save_format=args.save_format, log_callback=print, backend=backend,
+                          journal_path=os.path.join(journal_dir, "upload_journal.db"))
+    engine.s3_manager.upload_enabled = False
+    try:
+        if not engine.connect_camera():
+            raise SystemExit("카메라가 연결되어 있지 않습니다.")
+        ingest = engine.start_ingest(args.dest, camera_id=args.camera_id, writers=args.writers)
+        try:
+            while not ingest.wait(1.0):
+                s = ingest.status()
+                print(f"[{s['state']}] {s['files_done']}/{s['files_total']}개 {s['mb_done']}/{s['mb_total']}MB "
+                      f"{s['recent_mb_per_sec'] or 0:.1f}MB/s 남은 시간 {s['eta_sec'] or '-'}초")
+        except KeyboardInterrupt:
+            engine.stop_ingest()
+        result = ingest.status()
+        for k, v in result.items():
+            print(f"{k:>18}: {v}")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+    finally:
+        engine.shutdown()
+        shutil.rmtree(journal_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
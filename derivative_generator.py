@@ -0,0 +1,107 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+
+# 원본 저장 폴더 아래 축소본 저장 폴더 (<save_dir>/.derivatives/<variant>/)
+DERIVATIVE_DIR_NAME = ".derivatives"
+
+# 축소본 종류: variant -> (긴 변 최대 픽셀, JPEG 품질)
+DERIVATIVE_SPECS = {
+    "web": (2048, 85),
+    "thumb": (256, 80),
+}
+
+DEFAULT_DERIVATIVE_WORKERS = 2
+
+
+def derivative_path(image_path, variant):
+    """원본 경로에 대응하는 축소본 경로"""
+    save_dir, name = os.path.split(os.path.abspath(image_path))
+    stem = os.path.splitext(name)[0]
+    return os.path.join(save_dir, DERIVATIVE_DIR_NAME, variant, f"{stem}_{variant}.jpg")
+
+
+def split_derivative_path(path):
+    """축소본 경로면 (variant, 원본 저장 폴더), 아니면 (None, 파일이 있는 폴더)"""
+    parent = os.path.dirname(os.path.abspath(path))
+    variant = os.path.basename(parent)
+    derivative_dir = os.path.dirname(parent)
+    if variant in DERIVATIVE_SPECS and os.path.basename(derivative_dir) == DERIVATIVE_DIR_NAME:
+        return variant, os.path.dirname(derivative_dir)
+    return None, parent
+
+
+def generate_derivatives(image_path, variants=None):
+    """원본 JPEG에서 축소본 생성 (프로세스 풀에서 실행)
+
+    큰 것부터 만들고 작은 것은 직전 결과에서 줄여 디코딩은 한 번만 한다.
+    draft 모드로 JPEG를 DCT 단계에서 1/2~1/8로 줄여 읽으므로 전체 디코딩보다 훨씬 빠르다.
+
+    Returns:
+        dict: {variant: 축소본 경로}
+    """
+    variants = variants or list(DERIVATIVE_SPECS)
+    variants = sorted(variants, key=lambda v: DERIVATIVE_SPECS[v][0], reverse=True)
+    results = {}
+    with Image.open(image_path) as src:
+        largest = DERIVATIVE_SPECS[variants[0]][0]
+        src.draft("RGB", (largest, largest))
+        img = ImageOps.exif_transpose(src)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        for variant in variants:
+            max_size, quality = DERIVATIVE_SPECS[variant]
+            img.thumbnail((max_size, max_size), resample=Image.LANCZOS)
+            target = derivative_path(image_path, variant)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp = target + ".tmp"
+            img.save(tmp, "JPEG", quality=quality, optimize=True)
+            os.replace(tmp, target)
+            results[variant] = target
+    return results
+
+
+class DerivativeGenerator:
+    """축소본 생성 스테이지 (프로세스 풀, 완료 시 콜백)"""
+
+    def __init__(self, log_callback=None, max_workers=DEFAULT_DERIVATIVE_WORKERS):
+        self.log_callback = log_callback
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def log(self, msg):
+        if self.log_callback:
+            self.log_callback(msg)
+        else:
+            print(f"[Derivative] {msg}")
+
+    def _get_executor(self):
+        # 프로세스 풀은 처음 쓸 때 생성 (축소본을 안 쓰면 프로세스도 띄우지 않음)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def submit(self, image_path, on_done=None):
+        """축소본 생성 요청 (비동기), 완료 시 on_done({variant: path}) 호출 (풀 스레드에서)"""
+        future = self._get_executor().submit(generate_derivatives, image_path)
+
+        def _done(f):
+            try:
+                results = f.result()
+            except Exception as e:
+                self.log(f"축소본 생성 실패: {os.path.basename(image_path)} - {e}")
+                return
+            if on_done:
+                on_done(results)
+
+        future.add_done_callback(_done)
+        return future
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -0,0 +1,102 @@
+"""GUI 이벤트 로그 (logging 기반, 로그 창은 모아서 갱신)
+
+    로그 남기는 스레드 : QueueHandler 로 큐에 넣기만 함 (파일/위젯 작업 없음)
+    리스너 스레드      : 회전 파일(JSON 한 줄씩)에 기록 + 화면용 줄을 고정 크기 링 버퍼에 쌓음
+    Tk 스레드          : FLUSH_INTERVAL_MS 마다 drain() 으로 최대 MAX_FLUSH_LINES 줄을 한 번에 넣음
+
+연사/업로드가 몰려도 Tk 가 로그에 쓰는 시간은 일정하고, 밀린 줄은 "... (N줄 생략)" 으로 표시한다.
+"""
+import os
+import queue
+import logging
+import logging.handlers
+from collections import deque
+
+from tether_engine import JSONLogFormatter
+
+EVENT_LOG_PATH = os.path.join(os.path.expanduser("./"), ".settings", "logs", "mutzin_tether.log")
+EVENT_LOG_MAX_BYTES = 5 * 1024 * 1024
+EVENT_LOG_BACKUPS = 3
+RING_SIZE = 1000          # 화면에 아직 안 보낸 줄 상한 (밀리면 오래된 줄부터 버림)
+WIDGET_MAX_LINES = 1000   # 로그 창에 남기는 줄 수
+FLUSH_INTERVAL_MS = 100   # 로그 창 갱신 주기 (초당 10번)
+MAX_FLUSH_LINES = 200     # 한 번 갱신에 넣는 최대 줄 수
+
+
+class RingBufferHandler(logging.Handler):
+    """포맷한 줄을 고정 크기 deque 에 쌓아 두고 Tk 스레드가 drain() 으로 꺼내감
+
+    deque.append/popleft 는 스레드 안전하므로 락 없이 리스너 스레드와 Tk 스레드가 나눠 쓴다.
+    """
+
+    def __init__(self, capacity=RING_SIZE):
+        super().__init__()
+        self._lines = deque(maxlen=capacity)
+        self.dropped = 0   # 화면에 못 보내고 버린 줄 (누적)
+        self._reported = 0
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._lines) == self._lines.maxlen:
+            self.dropped += 1
+        self._lines.append(line)
+
+    def drain(self, limit=MAX_FLUSH_LINES):
+        """쌓인 줄을 최대 limit 개 꺼냄, 그 사이 버린 줄이 있으면 맨 앞에 표시"""
+        lines = []
+        dropped = self.dropped - self._reported
+        if dropped:
+            self._reported += dropped
+            lines.append(f"... ({dropped}줄 생략)")
+        while len(lines) < limit:
+            try:
+                lines.append(self._lines.popleft())
+            except IndexError:
+                break
+        return lines
+
+
+class EventLog:
+    """logging 기반 이벤트 로그 (GUI 용)
+
+    로그를 남기는 스레드는 QueueHandler 로 큐에 넣기만 하고, 파일 기록(JSON 한 줄씩, 용량별 교체)과
+    화면용 포맷은 QueueListener 스레드에서 처리한다. 화면은 drain() 으로 모아서 일정 주기로 갱신.
+    """
+
+    def __init__(self, logger_name="mutzin", log_file=EVENT_LOG_PATH, level=logging.INFO, capacity=RING_SIZE):
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+        self.log_file = log_file
+        self.ring = RingBufferHandler(capacity)
+        self.ring.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%H:%M:%S"))
+        handlers = [self.ring]
+        if log_file:
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=EVENT_LOG_MAX_BYTES, backupCount=EVENT_LOG_BACKUPS, encoding="utf-8", delay=True
+            )
+            file_handler.setFormatter(JSONLogFormatter())
+            handlers.append(file_handler)
+        self._queue = queue.SimpleQueue()
+        self._queue_handler = logging.handlers.QueueHandler(self._queue)
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers, respect_handler_level=True)
+
+    def start(self):
+        if self.logger.level == logging.NOTSET or self.logger.level > self.level:
+            self.logger.setLevel(self.level)
+        self.logger.addHandler(self._queue_handler)
+        self._listener.start()
+
+    def stop(self):
+        """남은 로그를 모두 기록하고 리스너 스레드 종료"""
+        self.logger.removeHandler(self._queue_handler)
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+
+    def drain(self, limit=MAX_FLUSH_LINES):
+        return self.ring.drain(limit)
@@ -0,0 +1,326 @@
+"""핫폴더 감시: 제조사 테더링 프로그램이 사진을 써 넣는 폴더를 감시해 새 파일을 파이프라인으로 넘김 (gphoto2 불필요)
+
+    python tether_engine.py --hot-folder /path/to/vendor/output
+
+리눅스에서는 inotify(ctypes 로 libc 직접 호출)로 이벤트를 기다리므로 새 파일이 없으면 CPU 를 쓰지 않는다.
+inotify 를 쓸 수 없으면 DEFAULT_POLL_SEC 마다 폴더를 훑는다 (os.scandir, 크기/수정시각 비교).
+
+파일을 쓰는 도중에 넘기지 않도록 크기/수정시각이 일정 시간 그대로인 파일만 완성된 것으로 본다
+(close_write 이벤트를 받았으면 CLOSED_STABLE_SEC, 아니면 stable_sec). 한꺼번에 여러 장이 들어오면
+batch_sec 동안 모아서 on_files([(path, mtime), ...]) 로 한 번에 넘긴다. 하위 폴더는 감시하지 않는다.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+
+DEFAULT_EXTS = (".jpg", ".jpeg", ".arw", ".raw", ".nef", ".cr2", ".cr3", ".orf", ".rw2", ".dng")
+DEFAULT_STABLE_SEC = 1.0  # 이 시간 동안 크기가 그대로면 다 쓴 것으로 봄
+CLOSED_STABLE_SEC = 0.1  # close_write/moved_to 를 받은 뒤에는 이만큼만 더 지켜봄
+DEFAULT_BATCH_SEC = 0.2
+DEFAULT_POLL_SEC = 1.0
+IGNORED_SUFFIXES = (".part", ".tmp", "~")
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+# 감시 이벤트 종류
+CHANGED = "changed"
+CLOSED = "closed"  # 쓰기를 마치고 닫았거나 다른 곳에서 옮겨 옴
+REMOVED = "removed"
+RESCAN = "rescan"  # 이벤트가 넘쳐서 폴더를 다시 훑어야 함
+
+
+class InotifyWatcher:
+    """inotify 로 폴더 하나 감시 (리눅스 전용, 안 되면 생성자에서 OSError)"""
+
+    name = "inotify"
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, folder):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify 를 지원하지 않는 시스템")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch 실패: {folder}")
+        # stop() 에서 select 를 깨우기 위한 파이프
+        self._wake_r, self._wake_w = os.pipe()
+
+    def wait(self, timeout):
+        """이벤트가 올 때까지 (timeout 초, None 이면 무한정) 기다려 [(이름, 종류)] 반환"""
+        ready, _, _ = select.select([self.fd, self._wake_r], [], [], timeout)
+        if self._wake_r in ready:
+            os.read(self._wake_r, 64)
+        if self.fd not in ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                events.append((None, RESCAN))
+            elif not name or mask & IN_ISDIR:
+                continue
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append((name, REMOVED))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                events.append((name, CLOSED))
+            else:
+                events.append((name, CHANGED))
+        return events
+
+    def wake(self):
+        os.write(self._wake_w, b"x")
+
+    def close(self):
+        for fd in (self.fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class PollingWatcher:
+    """poll_sec 마다 폴더를 훑어 크기/수정시각이 바뀐 파일을 알려줌 (inotify 가 없을 때)"""
+
+    name = "polling"
+
+    def __init__(self, folder, poll_sec=DEFAULT_POLL_SEC):
+        self.folder = folder
+        self.poll_sec = poll_sec
+        self._wake = threading.Event()
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        try:
+            with os.scandir(self.folder) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file():
+                            st = entry.stat()
+                            snapshot[entry.name] = (st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return snapshot
+
+    def wait(self, timeout):
+        self._wake.wait(self.poll_sec if timeout is None else min(timeout, self.poll_sec))
+        self._wake.clear()
+        snapshot = self._scan()
+        events = [(name, CHANGED) for name, sig in snapshot.items() if self._snapshot.get(name) != sig]
+        events.extend((name, REMOVED) for name in self._snapshot if name not in snapshot)
+        self._snapshot = snapshot
+        return events
+
+    def wake(self):
+        self._wake.set()
+
+    def close(self):
+        pass
+
+
+def create_watcher(folder, use_inotify=None, poll_sec=DEFAULT_POLL_SEC):
+    """use_inotify 가 None 이면 되는 쪽으로 (inotify 우선)"""
+    if use_inotify is not False:
+        try:
+            return InotifyWatcher(folder)
+        except (OSError, AttributeError):
+            if use_inotify:
+                raise
+    return PollingWatcher(folder, poll_sec)
+
+
+class HotFolderSource:
+    """폴더에 새로 다 써진 사진을 on_files([(path, mtime), ...]) 로 넘기는 감시 스레드
+
+    on_files 는 감시 스레드에서 호출된다. files() 는 폴더에 있는 완성된 사진 목록으로,
+    화면이 폴더를 다시 훑지 않고 썸네일 목록을 만들 때 쓴다.
+    """
+
+    def __init__(self, folder, on_files, exts=DEFAULT_EXTS, stable_sec=DEFAULT_STABLE_SEC,
+                 batch_sec=DEFAULT_BATCH_SEC, poll_sec=DEFAULT_POLL_SEC, use_inotify=None, log_func=None):
+        self.folder = os.path.abspath(folder)
+        self.on_files = on_files
+        self.exts = tuple(e.lower() for e in exts)
+        self.stable_sec = stable_sec
+        self.batch_sec = batch_sec
+        self.poll_sec = poll_sec
+        self.use_inotify = use_inotify
+        self.log_func = log_func
+        self.watcher = None
+        self.stop_event = threading.Event()
+        self.thread = None
+        self._files = {}  # 이름 -> mtime (완성된 사진)
+        self._candidates = {}  # 이름 -> [size, mtime_ns, 마지막 변화 시각, 지켜볼 시간]
+        self._batch = []
+        self._batch_deadline = None
+        self._lock = threading.Lock()
+        self.delivered = 0
+        self.batches = 0
+
+    def log(self, msg):
+        if self.log_func:
+            self.log_func(msg)
+
+    def _wanted(self, name):
+        lower = name.lower()
+        return not name.startswith(".") and not lower.endswith(IGNORED_SUFFIXES) and lower.endswith(self.exts)
+
+    # ---------- 제어 ----------
+    def start(self):
+        os.makedirs(self.folder, exist_ok=True)
+        # 감시를 먼저 걸고 기존 파일을 훑어야 그 사이에 생긴 파일을 놓치지 않음
+        self.watcher = create_watcher(self.folder, self.use_inotify, self.poll_sec)
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if self._wanted(entry.name) and entry.is_file():
+                    self._files[entry.name] = entry.stat().st_mtime
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="hot-folder", daemon=True)
+        self.thread.start()
+        self.log(f"핫폴더 감시 시작 ({self.watcher.name}): {self.folder}, 기존 사진 {len(self._files)}장")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.watcher:
+            self.watcher.wake()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        if self.watcher:
+            self.watcher.close()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def files(self):
+        """완성된 사진 [(path, mtime)] (최신 먼저)"""
+        with self._lock:
+            items = list(self._files.items())
+        items.sort(key=lambda item: item[1], reverse=True)
+        return [(os.path.join(self.folder, name), mtime) for name, mtime in items]
+
+    # ---------- 감시 ----------
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                events = self.watcher.wait(self._timeout(time.monotonic()))
+            except OSError as e:
+                self.log(f"핫폴더 감시 오류: {e}")
+                self.stop_event.wait(1.0)
+                continue
+            now = time.monotonic()
+            for name, kind in events:
+                if kind == RESCAN:
+                    self._rescan(now)
+                elif self._wanted(name):
+                    self._on_event(name, kind, now)
+            self._check_candidates(now)
+            if self._batch and now >= self._batch_deadline:
+                self._flush()
+        if self._batch:
+            self._flush()
+
+    def _timeout(self, now):
+        """다음에 확인할 때까지 기다릴 시간 (지켜볼 파일이 없으면 None = 이벤트가 올 때까지)"""
+        deadlines = [changed_at + quiet for _, _, changed_at, quiet in self._candidates.values()]
+        if self._batch_deadline is not None and self._batch:
+            deadlines.append(self._batch_deadline)
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - now)
+
+    def _on_event(self, name, kind, now):
+        if kind == REMOVED:
+            self._candidates.pop(name, None)
+            with self._lock:
+                self._files.pop(name, None)
+            return
+        try:
+            st = os.stat(os.path.join(self.folder, name))
+        except OSError:
+            return
+        quiet = CLOSED_STABLE_SEC if kind == CLOSED else self.stable_sec
+        candidate = self._candidates.get(name)
+        if candidate and candidate[0] == st.st_size and candidate[1] == st.st_mtime_ns:
+            candidate[3] = min(candidate[3], quiet)
+            return
+        self._candidates[name] = [st.st_size, st.st_mtime_ns, now, quiet]
+
+    def _rescan(self, now):
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if self._wanted(entry.name) and entry.name not in self._files:
+                    self._on_event(entry.name, CHANGED, now)
+
+    def _check_candidates(self, now):
+        for name, (size, mtime_ns, changed_at, quiet) in list(self._candidates.items()):
+            if now - changed_at < quiet:
+                continue
+            try:
+                st = os.stat(os.path.join(self.folder, name))
+            except OSError:
+                self._candidates.pop(name, None)
+                continue
+            if st.st_size != size or st.st_mtime_ns != mtime_ns or st.st_size == 0:
+                # 아직 쓰는 중: 다시 stable_sec 동안 지켜봄
+                self._candidates[name] = [st.st_size, st.st_mtime_ns, now, self.stable_sec]
+                continue
+            del self._candidates[name]
+            with self._lock:
+                is_new = name not in self._files
+                self._files[name] = st.st_mtime
+            if is_new:
+                if not self._batch:
+                    self._batch_deadline = now + self.batch_sec
+                self._batch.append((os.path.join(self.folder, name), st.st_mtime))
+
+    def _flush(self):
+        batch, self._batch = self._batch, []
+        self._batch_deadline = None
+        batch.sort(key=lambda item: item[1])
+        self.delivered += len(batch)
+        self.batches += 1
+        try:
+            self.on_files(batch)
+        except Exception as e:
+            self.log(f"핫폴더 처리 오류: {e}")
+
+    def status(self):
+        return {
+            "folder": self.folder,
+            "watcher": self.watcher.name if self.watcher else None,
+            "running": self.is_running(),
+            "files": len(self._files),
+            "watching": len(self._candidates),
+            "delivered": self.delivered,
+            "batches": self.batches,
+        }
@@ -0,0 +1,245 @@
+"""사진별 화면 상태와 디코딩한 원본을 메모리 한도 안에서 보관
+
+    ImageRecordStore        : 경로 -> __slots__ 레코드 (메인/비교 회전·확대), 최근 사진만 LRU 로 유지 + 촬영 순서
+    DecodedImageCache       : 디코딩한 원본 PIL 이미지, 픽셀 바이트 합이 한도를 넘으면 오래 안 쓴 것부터 버림
+    MemoryDiagnosticsWindow : RSS/최대 RSS/파이썬 객체 수/레코드·캐시 사용량 창
+
+장시간 촬영에서도 메모리가 찍은 장수에 비례해 늘지 않도록, 밀려난 사진은 기본 회전/확대로 돌아가고
+원본은 다시 볼 때 디코딩한다. 모두 Tk 스레드 전용.
+"""
+import gc
+import os
+import sys
+import time
+import itertools
+from collections import OrderedDict
+import tkinter as tk
+from tkinter import ttk
+
+DEFAULT_MAX_RECORDS = 2000      # 회전/확대 상태를 기억하는 사진 수 (넘으면 오래 안 본 사진부터 기본값으로)
+DEFAULT_MAX_HISTORY = 500       # 촬영 순서 목록 길이 (최신 사진 / 직전 사진 / 썸네일)
+DEFAULT_DECODE_BUDGET_MB = 400  # 디코딩한 원본 픽셀 상한 (61MP RGB 두 장 ≈ 366MB)
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class ImageRecord:
+    """사진 한 장의 화면 상태 (None 이면 아직 정한 적 없음 → 호출하는 쪽 기본값)"""
+    __slots__ = ("record_id", "path", "main_rotation", "main_zoom", "compare_rotation", "compare_zoom")
+
+    def __init__(self, record_id, path):
+        self.record_id = record_id
+        self.path = path
+        self.main_rotation = None
+        self.main_zoom = None
+        self.compare_rotation = None
+        self.compare_zoom = None
+
+
+class ImageRecordStore:
+    """경로 -> ImageRecord, 최근 max_records 장만 보관 (Tk 스레드 전용)
+
+    사진마다 dict 네 개에 항목을 쌓던 것을 작은 레코드 하나로 합치고, 오래 안 본 사진은 버린다.
+    촬영 순서(history)는 최신순으로 max_history 장까지만 유지한다.
+    """
+
+    def __init__(self, max_records=DEFAULT_MAX_RECORDS, max_history=DEFAULT_MAX_HISTORY):
+        self.max_records = max_records
+        self.max_history = max_history
+        self._records = OrderedDict()   # path -> ImageRecord, 마지막이 가장 최근에 쓴 것
+        self._history = OrderedDict()   # path -> None, 마지막이 최신 사진
+        self._ids = itertools.count(1)
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def record(self, path):
+        """레코드를 가져오거나 새로 만듦 (최근 사용으로 표시)"""
+        rec = self._records.get(path)
+        if rec is None:
+            rec = self._records[path] = ImageRecord(next(self._ids), path)
+            while len(self._records) > self.max_records:
+                self._records.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._records.move_to_end(path)
+        return rec
+
+    def peek(self, path):
+        """있으면 레코드, 없으면 None (새로 만들거나 순서를 바꾸지 않음)"""
+        return self._records.get(path)
+
+    def set_history(self, paths):
+        """촬영 순서를 통째로 교체 (paths 는 최신순)"""
+        self._history.clear()
+        for path in reversed(paths[:self.max_history]):
+            self._history[path] = None
+
+    def push_history(self, path):
+        """최신 사진으로 추가, 새로 들어왔으면 True"""
+        is_new = path not in self._history
+        self._history[path] = None
+        self._history.move_to_end(path)
+        while len(self._history) > self.max_history:
+            self._history.popitem(last=False)
+        return is_new
+
+    def history(self, limit=None):
+        """최신순 경로 목록"""
+        it = reversed(self._history)
+        return list(itertools.islice(it, limit)) if limit is not None else list(it)
+
+    def latest(self, index=0):
+        """index 번째로 최신인 사진 (0: 최신, 1: 직전), 없으면 None"""
+        for i, path in enumerate(reversed(self._history)):
+            if i == index:
+                return path
+        return None
+
+    def history_len(self):
+        return len(self._history)
+
+    def stats(self):
+        return {"records": len(self._records), "max_records": self.max_records,
+                "history": len(self._history), "evicted": self.evicted}
+
+
+def image_nbytes(img):
+    """PIL 이미지의 픽셀 메모리 (대략, 밴드당 1바이트 기준이고 16비트/float 모드는 4바이트)"""
+    bands = len(img.getbands())
+    per_band = 1 if img.mode in ("1", "L", "P", "RGB", "RGBA", "RGBX", "CMYK", "YCbCr", "LAB", "HSV", "LA", "PA") else 4
+    return img.width * img.height * bands * per_band
+
+
+class DecodedImageCache:
+    """디코딩한 원본 이미지 LRU, 픽셀 합계가 budget 을 넘으면 오래 안 쓴 것부터 버림 (Tk 스레드 전용)
+
+    메인/비교 캔버스가 같은 캐시를 쓰므로 같은 사진을 두 번 디코딩하지 않는다.
+    방금 넣은 이미지는 budget 보다 커도 남긴다 (화면에 보여야 하므로).
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_DECODE_BUDGET_MB * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self._items = OrderedDict()  # path -> (image, nbytes)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, path, loader):
+        """캐시에 있으면 그대로, 없으면 loader(path) 로 디코딩해서 넣음 (예외는 그대로 전달)"""
+        item = self._items.get(path)
+        if item is not None:
+            self._items.move_to_end(path)
+            self.hits += 1
+            return item[0]
+        self.misses += 1
+        img = loader(path)
+        nbytes = image_nbytes(img)
+        self._items[path] = (img, nbytes)
+        self.total_bytes += nbytes
+        while self.total_bytes > self.budget_bytes and len(self._items) > 1:
+            _, (_, old_bytes) = self._items.popitem(last=False)
+            self.total_bytes -= old_bytes
+            self.evicted += 1
+        return img
+
+    def discard(self, path):
+        item = self._items.pop(path, None)
+        if item is not None:
+            self.total_bytes -= item[1]
+
+    def clear(self):
+        self._items.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        return {"images": len(self._items), "mb": self.total_bytes / 1e6, "budget_mb": self.budget_bytes / 1e6,
+                "hits": self.hits, "misses": self.misses, "evicted": self.evicted}
+
+
+def current_rss():
+    """현재 프로세스 RSS (바이트), 알 수 없으면 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def peak_rss():
+    """최대 RSS (바이트), 알 수 없으면 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # 리눅스는 KB, macOS 는 바이트
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryDiagnosticsWindow(tk.Toplevel):
+    """메모리 진단 창 (RSS, 파이썬 객체 수, 레코드/캐시 사용량, 2초마다 갱신)
+
+    stats_func() 는 {항목 이름: 값} 을 돌려주며 RSS/객체 수 아래에 그대로 표시한다.
+    """
+
+    def __init__(self, parent, stats_func):
+        super().__init__(parent)
+        self.title("메모리 진단")
+        self.geometry("420x360")
+        self.stats_func = stats_func
+        self._start_rss = current_rss()
+        self._started = time.monotonic()
+
+        self.tree = ttk.Treeview(self, columns=("value",), show="tree headings", height=14)
+        self.tree.heading("#0", text="항목")
+        self.tree.column("#0", width=200)
+        self.tree.heading("value", text="값")
+        self.tree.column("value", width=180, anchor="e")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill="x", padx=10, pady=(0, 10))
+        ttk.Button(btn_frame, text="GC 실행", command=self._collect).pack(side="left")
+        self.status_var = tk.StringVar()
+        ttk.Label(btn_frame, textvariable=self.status_var).pack(side="left", padx=10)
+
+        self._refresh()
+
+    def _collect(self):
+        found = gc.collect()
+        self.status_var.set(f"GC: {found}개 회수")
+
+    def _rows(self):
+        rss = current_rss()
+        peak = peak_rss()
+        rows = [
+            ("RSS (MB)", f"{rss / 1e6:.1f}" if rss is not None else "-"),
+            ("최대 RSS (MB)", f"{peak / 1e6:.1f}" if peak is not None else "-"),
+        ]
+        if rss is not None and self._start_rss is not None:
+            minutes = max((time.monotonic() - self._started) / 60, 1e-9)
+            grown = (rss - self._start_rss) / 1e6
+            rows.append(("창 연 뒤 증가 (MB)", f"{grown:+.1f} ({grown / minutes:+.2f}/분)"))
+        rows.append(("파이썬 객체 수", f"{len(gc.get_objects()):,}"))
+        rows.extend((name, str(value)) for name, value in self.stats_func().items())
+        return rows
+
+    def _refresh(self):
+        if not self.winfo_exists():
+            return
+        self.tree.delete(*self.tree.get_children())
+        for name, value in self._rows():
+            self.tree.insert("", "end", text=name, values=(value,))
+        self.after(2000, self._refresh)
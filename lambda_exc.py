@@ -1,9 +1,25 @@
+import argparse
 import requests
 import json
 
 api_url = "<yourapiurl>prod/generate-url"
+
+parser = argparse.ArgumentParser(description="Presigned URL 발급 테스트")
+parser.add_argument("--url", default=api_url, help="Lambda(API) URL")
+parser.add_argument("--local", action="store_true", help="local_s3_server 대역 서버를 띄워 오프라인으로 테스트")
+args = parser.parse_args()
+
+server = None
+if args.local:
+    from local_s3_server import LocalS3Server
+    server = LocalS3Server().start()
+    args.url = server.lambda_url
+
 payload = {"filename": "test_photo.jpg"}
 
-response = requests.post(api_url, json=payload)
+response = requests.post(args.url, json=payload)
 print(response.status_code)
 print(response.json())  # presigned_url 확인
+
+if server:
+    server.stop()
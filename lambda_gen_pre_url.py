@@ -4,7 +4,7 @@
 #   "Statement": [
 #     {
 #       "Effect": "Allow",
-#       "Action": ["s3:PutObject", "s3:PutObjectAcl"],
+#       "Action": ["s3:PutObject", "s3:PutObjectAcl", "s3:AbortMultipartUpload"],
 #       "Resource": "arn:aws:s3:::<your-buckert>/*"
 #     }
 #   ]
@@ -14,42 +14,34 @@ import json
 import boto3
 import os
 
+from presign_service import PresignService, Boto3Presigner
+
 s3_client = boto3.client('s3')
 BUCKET_NAME = os.environ['S3_BUCKET'] #S3_BUCKET 환경변수 추가
+# 요청 규약(배치/variant/멀티파트, 키 결정)은 presign_service.py 에 있으므로 함께 배포
+# PRESIGN_MODE=service 면 boto3 대신 presign_service 의 SigV4 서명을 직접 계산
+# KEY_PARTITION=date 와 함께 쓰면 키를 <세션>/<날짜>/... 로 나눠 prefix 별 요청 한도를 피함
+PRESIGN_MODE = os.environ.get('PRESIGN_MODE', 'boto3')
+
+
+def response(status_code, data):
+    return {
+        "statusCode": status_code,
+        "body": json.dumps(data)
+    }
+
+
+# 서명 키 캐시가 웜 스타트 사이에 유지되도록 모듈 로드 시 한 번만 생성
+presign_service = PresignService.from_env(
+    s3_api=s3_client,
+    presigner=None if PRESIGN_MODE == 'service' else Boto3Presigner(s3_client, BUCKET_NAME)
+)
+
 
 def lambda_handler(event, context):
     try:
-        # body가 문자열로 전달되므로 JSON 파싱
-        body = event.get('body')
-        if body:
-            body_json = json.loads(body)
-        else:
-            body_json = {}
-
-        filename = body_json.get('filename')
-        if not filename:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "filename required"})
-            }
-
-        presigned_url = s3_client.generate_presigned_url(
-            ClientMethod='put_object',
-            Params={
-                'Bucket': BUCKET_NAME,
-                'Key': filename,
-                'ContentType': 'image/jpeg'
-            },
-            ExpiresIn=3600
-        )
-
-        return {
-            "statusCode": 200,
-            "body": json.dumps({"presigned_url": presigned_url})
-        }
-
+        # 단건 {"filename"}, 배치 {"filenames": [...]}, 축소본 {"variant"},
+        # 멀티파트 {"action": "create_multipart" | "part_urls" | "complete_multipart" | "abort_multipart", ...}
+        return presign_service.handle_event(event)
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": str(e)})
-        }
+        return response(500, {"error": str(e)})
@@ -0,0 +1,275 @@
+import csv
+import json
+import threading
+import time
+import tkinter as tk
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from tkinter import ttk, filedialog, messagebox
+
+# 파이프라인 단계 (표시 순서)
+STAGE_CAPTURE = "capture"          # PC 촬영 명령 (camera.capture)
+STAGE_DETECT = "detect"            # 이벤트 수신 -> 다운로드 시작 (카메라 락 대기 포함)
+STAGE_FILE_GET = "file_get"        # 카메라 -> 메모리 (USB 전송)
+STAGE_SAVE = "save"                # 메모리 -> 디스크
+STAGE_NOTIFY = "notify"            # 저장 알림 처리 (업로드 큐 추가 등)
+STAGE_PRESIGN = "presign"          # Presigned URL 발급 (캐시 미스일 때 Lambda 호출)
+STAGE_PUT = "put"                  # S3 PUT (멀티파트는 전체)
+STAGE_DECODE = "decode"            # 미리보기 이미지 디코딩
+STAGE_RESIZE = "resize"            # 회전/축소
+STAGE_DRAW = "draw"                # PhotoImage 생성 + 캔버스 그리기
+STAGE_TO_PREVIEW = "shot_to_preview"   # 촬영 감지 -> 미리보기 표시 (전체)
+STAGE_TO_UPLOAD = "shot_to_upload"     # 촬영 감지 -> 업로드 완료 (전체)
+
+STAGES = (
+    STAGE_CAPTURE, STAGE_DETECT, STAGE_FILE_GET, STAGE_SAVE, STAGE_NOTIFY,
+    STAGE_PRESIGN, STAGE_PUT, STAGE_DECODE, STAGE_RESIZE, STAGE_DRAW,
+    STAGE_TO_PREVIEW, STAGE_TO_UPLOAD,
+)
+
+# 히스토그램 구간 상한(ms), 마지막 구간은 그 이상 전부
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+MAX_SAMPLES = 2048      # 단계별 백분위 계산용 최근 샘플 수
+MAX_TRACES = 500        # 촬영 단위로 보관할 최근 트레이스 수
+
+
+class StageHistogram:
+    """단계 하나의 소요시간 분포 (고정 구간 누적 카운트 + 최근 샘플)"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.samples = deque(maxlen=MAX_SAMPLES)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        i = 0
+        while i < len(BUCKET_BOUNDS_MS) and ms > BUCKET_BOUNDS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.samples.append(ms)
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct):
+        if not self.samples:
+            return None
+        values = sorted(self.samples)
+        return values[min(len(values) - 1, int(pct / 100.0 * len(values)))]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms if self.count else None,
+            "buckets": dict(zip([f"<={b}" for b in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}"], self.counts)),
+        }
+
+
+class LatencyTracer:
+    """촬영 -> 미리보기/업로드 파이프라인 단계별 소요시간 기록
+
+    단계 소요시간은 항상 히스토그램에 쌓이고, trace_id(촬영 단위, 저장 후에는 로컬 경로)를 주면
+    해당 촬영의 트레이스에도 남아 촬영 감지 시점부터의 전체 지연을 계산할 수 있다.
+    여러 스레드(카메라 이벤트, 업로드 워커, Tk)에서 동시에 호출해도 된다.
+    """
+
+    def __init__(self, max_traces=MAX_TRACES):
+        self.max_traces = max_traces
+        self.enabled = True
+        self.tags = {}  # 내보내기에 함께 저장할 정보 (카메라 모델 등)
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._traces = OrderedDict()  # trace_id -> {"start": perf_counter, "wall": time, "spans": [...]}
+        self._aliases = {}
+        self._next_id = 0
+
+    def set_tag(self, key, value):
+        with self._lock:
+            self.tags[key] = value
+
+    # ---------- 트레이스 ----------
+    def start_trace(self, trace_id=None):
+        """촬영 하나의 트레이스 시작, trace_id 반환 (생략 시 자동 번호)"""
+        with self._lock:
+            if trace_id is None:
+                self._next_id += 1
+                trace_id = f"shot-{self._next_id}"
+            self._traces[trace_id] = {"start": time.perf_counter(), "wall": time.time(), "spans": []}
+            while len(self._traces) > self.max_traces:
+                old, _ = self._traces.popitem(last=False)
+                self._aliases = {k: v for k, v in self._aliases.items() if v != old}
+        return trace_id
+
+    def alias(self, trace_id, other_id):
+        """trace_id 트레이스를 other_id(저장된 파일 경로 등)로도 찾을 수 있게"""
+        with self._lock:
+            if trace_id in self._traces:
+                self._aliases[other_id] = trace_id
+
+    def _resolve(self, trace_id):
+        trace_id = self._aliases.get(trace_id, trace_id)
+        return trace_id, self._traces.get(trace_id)
+
+    def finish(self, trace_id, stage):
+        """트레이스 시작부터 지금까지를 stage(전체 지연 단계)로 기록. 이미 기록했으면 무시"""
+        if not self.enabled or trace_id is None:
+            return None
+        with self._lock:
+            _, trace = self._resolve(trace_id)
+            if trace is None or any(s[0] == stage for s in trace["spans"]):
+                return None
+            elapsed = time.perf_counter() - trace["start"]
+        self.record(stage, elapsed, trace_id)
+        return elapsed
+
+    # ---------- 구간 기록 ----------
+    def record(self, stage, seconds, trace_id=None):
+        if not self.enabled:
+            return
+        ms = seconds * 1000.0
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = StageHistogram()
+            hist.add(ms)
+            if trace_id is not None:
+                _, trace = self._resolve(trace_id)
+                if trace is not None:
+                    offset = (time.perf_counter() - seconds - trace["start"]) * 1000.0
+                    trace["spans"].append((stage, offset, ms))
+
+    @contextmanager
+    def span(self, stage, trace_id=None):
+        """with tracer.span("file_get", trace_id): ... 구간 소요시간 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, trace_id)
+
+    # ---------- 조회/내보내기 ----------
+    def summary(self):
+        """{stage: 요약} (STAGES 순서, 그 외 단계는 뒤에)"""
+        with self._lock:
+            names = [s for s in STAGES if s in self._histograms]
+            names += sorted(s for s in self._histograms if s not in STAGES)
+            return OrderedDict((s, self._histograms[s].summary()) for s in names)
+
+    def traces(self):
+        with self._lock:
+            aliases = {}
+            for other, tid in self._aliases.items():
+                aliases.setdefault(tid, []).append(other)
+            return [
+                {
+                    "trace_id": tid,
+                    "started_at": t["wall"],
+                    "aliases": aliases.get(tid, []),
+                    "spans": [{"stage": s, "offset_ms": round(o, 3), "duration_ms": round(d, 3)} for s, o, d in t["spans"]],
+                }
+                for tid, t in self._traces.items()
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._traces.clear()
+            self._aliases.clear()
+
+    def export_json(self, path):
+        data = {
+            "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "tags": dict(self.tags),
+            "bucket_bounds_ms": list(BUCKET_BOUNDS_MS),
+            "stages": self.summary(),
+            "traces": self.traces(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def export_csv(self, path):
+        """단계별 요약 한 줄씩 (태그는 앞 열에 반복, 카메라 바디별 결과를 이어 붙여 비교하기 쉽게)"""
+        tag_keys = sorted(self.tags)
+        bucket_names = [f"le_{b}ms" for b in BUCKET_BOUNDS_MS] + [f"gt_{BUCKET_BOUNDS_MS[-1]}ms"]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(tag_keys + ["stage", "count", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"] + bucket_names)
+            for stage, s in self.summary().items():
+                writer.writerow(
+                    [self.tags[k] for k in tag_keys]
+                    + [stage, s["count"]]
+                    + [_fmt_ms(s[k]) for k in ("mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")]
+                    + list(s["buckets"].values())
+                )
+
+
+def _fmt_ms(value):
+    return "" if value is None else f"{value:.1f}"
+
+
+class LatencyStatsWindow(tk.Toplevel):
+    """단계별 지연시간 통계 창 (1초마다 갱신)"""
+
+    COLUMNS = ("count", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")
+
+    def __init__(self, parent, tracer):
+        super().__init__(parent)
+        self.title("지연시간 통계")
+        self.geometry("620x360")
+        self.tracer = tracer
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="tree headings", height=12)
+        self.tree.heading("#0", text="단계")
+        self.tree.column("#0", width=140)
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col.replace("_ms", " (ms)"))
+            self.tree.column(col, width=75, anchor="e")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill="x", padx=10, pady=(0, 10))
+        self.enabled_var = tk.BooleanVar(value=tracer.enabled)
+        ttk.Checkbutton(btn_frame, text="기록", variable=self.enabled_var,
+                        command=lambda: setattr(self.tracer, "enabled", self.enabled_var.get())).pack(side="left")
+        ttk.Button(btn_frame, text="초기화", command=self._reset).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="CSV 내보내기", command=self._export_csv).pack(side="right", padx=5)
+        ttk.Button(btn_frame, text="JSON 내보내기", command=self._export_json).pack(side="right")
+
+        self._refresh()
+
+    def _refresh(self):
+        if not self.winfo_exists():
+            return
+        summary = self.tracer.summary()
+        self.tree.delete(*self.tree.get_children())
+        for stage, s in summary.items():
+            values = [s["count"]] + [_fmt_ms(s[c]) for c in self.COLUMNS[1:]]
+            self.tree.insert("", "end", text=stage, values=values)
+        self.after(1000, self._refresh)
+
+    def _reset(self):
+        self.tracer.reset()
+        self._refresh_now()
+
+    def _refresh_now(self):
+        self.tree.delete(*self.tree.get_children())
+
+    def _export_json(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")], initialfile="latency.json")
+        if path:
+            self.tracer.export_json(path)
+            messagebox.showinfo("내보내기", f"저장됨: {path}", parent=self)
+
+    def _export_csv(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv")], initialfile="latency.csv")
+        if path:
+            self.tracer.export_csv(path)
+            messagebox.showinfo("내보내기", f"저장됨: {path}", parent=self)
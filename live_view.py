@@ -0,0 +1,191 @@
+"""라이브뷰: camera.capture_preview() 프레임을 전용 스레드에서 받아 디코딩 워커를 거쳐 화면으로 넘김
+
+    카메라 스레드(LiveViewStream) -> 디코딩 워커(LiveViewDecoder) -> Tk (PhotoImage.paste)
+
+각 단계는 최신 프레임 하나만 들고 있어서, 뒤 단계가 밀리면 오래된 프레임은 버려진다.
+디코딩/그리기가 목표 프레임 간격보다 오래 걸리면 카메라에서 받아오는 간격도 늘려
+카메라 락을 쓸데없이 오래 잡지 않는다.
+"""
+import io
+import threading
+import time
+from collections import deque
+
+from PIL import Image
+
+DEFAULT_LIVE_VIEW_FPS = 20
+MAX_LIVE_VIEW_FPS = 30
+LIVE_VIEW_EVENT_WAIT_MS = 20   # 라이브뷰 중 카메라 이벤트 대기 시간 (평소 1000ms)
+LIVE_VIEW_YIELD_SEC = 0.003    # 프레임마다 락을 놓고 쉬는 최소 시간 (대기 중인 이벤트 스레드에 차례를 넘김)
+EWMA_ALPHA = 0.2
+
+
+class RateMeter:
+    """최근 n 개 시각으로 초당 횟수 계산"""
+
+    def __init__(self, n=30):
+        self.times = deque(maxlen=n)
+
+    def tick(self, now=None):
+        self.times.append(time.perf_counter() if now is None else now)
+
+    def rate(self):
+        if len(self.times) < 2:
+            return 0.0
+        span = self.times[-1] - self.times[0]
+        return (len(self.times) - 1) / span if span > 0 else 0.0
+
+
+def _ewma(prev, value):
+    return value if prev is None else prev + EWMA_ALPHA * (value - prev)
+
+
+class LiveViewStream:
+    """카메라에서 라이브뷰 프레임(JPEG 바이트)을 받아 on_frame(data, grabbed_at) 으로 넘기는 스레드
+
+    카메라 락은 capture_preview 한 번 동안만 잡고, 프레임 사이에는 반드시 놓고 쉰다.
+    get_min_interval 이 있으면 (소비 쪽 처리 시간) 그보다 자주 받아오지 않는다.
+    get_camera 가 None 을 돌려주는 동안(재연결 중)은 기다린다. 프레임 오류는 on_error(e) 로 알린다.
+    """
+
+    def __init__(self, get_camera, camera_lock, on_frame, target_fps=DEFAULT_LIVE_VIEW_FPS,
+                 get_min_interval=None, log_func=None, on_error=None):
+        self.get_camera = get_camera
+        self.camera_lock = camera_lock
+        self.on_frame = on_frame
+        self.target_fps = max(1, min(int(target_fps), MAX_LIVE_VIEW_FPS))
+        self.get_min_interval = get_min_interval
+        self.log_func = log_func
+        self.on_error = on_error
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.frames = 0
+        self.errors = 0
+        self.grab_ms = None  # capture_preview 소요시간 이동평균
+        self.grab_rate = RateMeter()
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="live-view", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2)
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _interval(self):
+        interval = 1.0 / self.target_fps
+        if self.get_min_interval:
+            interval = max(interval, self.get_min_interval() or 0.0)
+        return interval
+
+    def _run(self):
+        next_at = time.perf_counter()
+        while not self.stop_event.is_set():
+            delay = next_at - time.perf_counter()
+            if delay > 0 and self.stop_event.wait(delay):
+                break
+            camera = self.get_camera()
+            if camera is None:
+                self.stop_event.wait(0.2)
+                next_at = time.perf_counter()
+                continue
+            started = time.perf_counter()
+            try:
+                with self.camera_lock:
+                    camera_file = camera.capture_preview()
+                    data = bytes(camera_file.get_data_and_size())
+            except Exception as e:
+                self.errors += 1
+                if self.log_func and self.errors <= 3:
+                    self.log_func(f"라이브뷰 프레임 오류: {e}")
+                if self.on_error:
+                    self.on_error(e)
+                self.stop_event.wait(0.5)
+                next_at = time.perf_counter()
+                continue
+            grabbed_at = time.perf_counter()
+            self.frames += 1
+            self.grab_ms = _ewma(self.grab_ms, (grabbed_at - started) * 1000.0)
+            self.grab_rate.tick(grabbed_at)
+            self.on_frame(data, started)
+            next_at = max(started + self._interval(), time.perf_counter() + LIVE_VIEW_YIELD_SEC)
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "errors": self.errors,
+            "grab_fps": round(self.grab_rate.rate(), 1),
+            "grab_ms": round(self.grab_ms, 1) if self.grab_ms is not None else None,
+        }
+
+
+class LiveViewDecoder:
+    """라이브뷰 프레임 디코딩 워커 (최신 프레임 하나만 대기, 밀린 프레임은 버림)
+
+    submit 은 카메라 스레드에서 호출되고, 디코딩+축소한 PIL 이미지는 on_image(img, grabbed_at) 로 넘긴다.
+    get_size 는 (너비, 높이) 를 돌려주며, JPEG draft 로 그 크기에 가깝게 축소 디코딩한다.
+    """
+
+    def __init__(self, on_image, get_size):
+        self.on_image = on_image
+        self.get_size = get_size
+        self._cond = threading.Condition()
+        self._pending = None
+        self._stopped = False
+        self.decoded = 0
+        self.dropped = 0
+        self.decode_ms = None
+        self.draw_ms = None
+        self._thread = threading.Thread(target=self._run, name="live-view-decode", daemon=True)
+        self._thread.start()
+
+    def submit(self, data, grabbed_at):
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (data, grabbed_at)
+            self._cond.notify()
+
+    def report_draw(self, seconds):
+        """화면 쪽 그리기 시간 (프레임 간격 조절에 반영)"""
+        self.draw_ms = _ewma(self.draw_ms, seconds * 1000.0)
+
+    def report_dropped(self, n=1):
+        self.dropped += n
+
+    def min_interval(self):
+        """한 프레임을 처리하는 데 드는 시간(초), LiveViewStream.get_min_interval 용"""
+        return ((self.decode_ms or 0.0) + (self.draw_ms or 0.0)) / 1000.0
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                data, grabbed_at = self._pending
+                self._pending = None
+            started = time.perf_counter()
+            try:
+                width, height = self.get_size()
+                img = Image.open(io.BytesIO(data))
+                img.draft("RGB", (width, height))
+                img = img.convert("RGB")
+                img.thumbnail((max(1, width), max(1, height)), resample=Image.BILINEAR)
+            except Exception:
+                self.dropped += 1
+                continue
+            self.decode_ms = _ewma(self.decode_ms, (time.perf_counter() - started) * 1000.0)
+            self.decoded += 1
+            self.on_image(img, grabbed_at)
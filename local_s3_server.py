@@ -0,0 +1,344 @@
+"""로컬 S3 + Lambda 대역 서버 (오프라인 업로드 테스트/벤치마크용)
+
+lambda_gen_pre_url.lambda_handler 와 같은 요청/응답 규약(presign_service.PresignService)으로 Presigned 스타일 URL 을
+발급하고, 그 URL 로 들어오는 PUT 을 내장 sink 가 받는다. 지연, 대역폭 제한, 오류를 주입할 수 있다.
+서명과 멀티파트 저장만 이 서버 것이고 요청 파싱/검증/키 결정은 Lambda 와 같은 코드를 쓴다.
+
+    python local_s3_server.py --port 9000 --latency-ms 30 --bandwidth-mbps 5 --error-rate 0.02
+
+AWS 설정의 Lambda URL 에 출력된 주소를 넣으면 GUI 에서도 그대로 사용 가능.
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote, unquote
+
+from presign_service import PresignService, MultipartError, EXPIRES_IN, PARTITION_NONE, PARTITION_DATE
+from upload_scheduler import TokenBucket, READ_CHUNK_SIZE
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 벤치마크 중 동시 연결이 몰려도 거절되지 않도록
+    request_queue_size = 128
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (클라이언트 연결 풀 동작 확인용)
+
+    def log_message(self, format, *args):
+        if self.server.stand_in.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body=b"", headers=None, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, data):
+        self._send(status, json.dumps(data).encode("utf-8"))
+
+    def _read_body(self, throttle=False):
+        length = int(self.headers.get("Content-Length") or 0)
+        stand_in = self.server.stand_in
+        md5 = hashlib.md5()
+        chunks = [] if stand_in.store_dir else None
+        remaining = length
+        while remaining > 0:
+            n = min(READ_CHUNK_SIZE, remaining)
+            if throttle:
+                stand_in.bandwidth.consume(n)
+            chunk = self.rfile.read(n)
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            md5.update(chunk)
+            if chunks is not None:
+                chunks.append(chunk)
+        received = length - remaining
+        return received, md5, (b"".join(chunks) if chunks is not None else None)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/stats":
+            return self._send_json(200, self.server.stand_in.stats())
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        stand_in = self.server.stand_in
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        stand_in.sleep_ms(stand_in.presign_latency_ms)
+        if stand_in.inject_error():
+            return self._send_json(503, {"error": "injected error"})
+        try:
+            body_json = json.loads(raw) if raw else {}
+        except ValueError:
+            return self._send_json(400, {"error": "invalid json"})
+        base_url = f"http://{self.headers.get('Host') or stand_in.address}"
+        status, data = stand_in.handle_lambda(body_json, base_url)
+        self._send_json(status, data)
+
+    def do_PUT(self):
+        stand_in = self.server.stand_in
+        parsed = urlparse(self.path)
+        if not parsed.path.startswith("/sink/"):
+            return self._send_json(404, {"error": "not found"})
+        key = unquote(parsed.path[len("/sink/"):])
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+        # 본문은 항상 끝까지 읽어야 keep-alive 연결이 깨지지 않음
+        stand_in.sleep_ms(stand_in.latency_ms)
+        size, md5, data = self._read_body(throttle=True)
+
+        error = stand_in.check_signature("PUT", key, query)
+        if error:
+            return self._send(403, f"<Error><Code>{error}</Code></Error>".encode(), content_type="application/xml")
+        if stand_in.inject_error():
+            return self._send(503, b"<Error><Code>SlowDown</Code></Error>", content_type="application/xml")
+        content_md5 = self.headers.get("Content-MD5")
+        if content_md5 and base64.b64decode(content_md5) != md5.digest():
+            return self._send(400, b"<Error><Code>BadDigest</Code></Error>", content_type="application/xml")
+
+        etag = f'"{md5.hexdigest()}"'
+        if "uploadId" in query:
+            ok = stand_in.store_part(query["uploadId"], int(query.get("partNumber", 0)), size, md5.hexdigest(), data)
+            if not ok:
+                return self._send(404, b"<Error><Code>NoSuchUpload</Code></Error>", content_type="application/xml")
+        else:
+            stand_in.store_object(key, size, md5.hexdigest(), data)
+        self._send(200, headers={"ETag": etag})
+
+
+class SinkPresigner:
+    """PresignService 용 서명기: 요청이 들어온 주소(base_url)의 /sink/ URL 에 이 서버의 HMAC 서명"""
+
+    def __init__(self, server, base_url):
+        self.server = server
+        self.base_url = base_url
+
+    def presign_put(self, key, expires_in=EXPIRES_IN, now=None):
+        return self.server.presign(self.base_url, key, expires_in=expires_in)
+
+    def presign_upload_part(self, key, upload_id, part_number, expires_in=EXPIRES_IN, now=None):
+        return self.server.presign(self.base_url, key, upload_id, part_number, expires_in)
+
+
+class LocalS3Server:
+    """Lambda(Presigned URL 발급) + S3 PUT sink 대역
+
+    latency_ms: PUT 마다 추가 지연
+    presign_latency_ms: Lambda 호출마다 추가 지연 (콜드스타트 흉내)
+    bandwidth_mbps: 서버 전체 수신 대역폭 제한 (MB/s, 0 = 무제한)
+    error_rate: 요청 중 503 으로 응답할 비율 (0.0 ~ 1.0)
+    store_dir: 지정하면 받은 객체를 파일로 저장 (기본은 크기/MD5 만 기록)
+    partition: 키 파티셔닝 (presign_service.PARTITION_NONE / PARTITION_DATE)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0, presign_latency_ms=0,
+                 bandwidth_mbps=0, error_rate=0.0, store_dir=None, expires_in=EXPIRES_IN,
+                 seed=None, verbose=False, partition=PARTITION_NONE):
+        self.latency_ms = latency_ms
+        self.presign_latency_ms = presign_latency_ms
+        self.error_rate = error_rate
+        self.store_dir = store_dir
+        self.expires_in = expires_in
+        self.partition = partition
+        self.verbose = verbose
+        self.bandwidth = TokenBucket(int(bandwidth_mbps * 1024 * 1024))
+        self._secret = secrets.token_bytes(32)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.objects = {}          # key -> {"size", "md5", "completed_at"}
+        self.multipart = {}        # upload_id -> {"key", "parts": {n: (size, md5)}}
+        self.counters = {"lambda_calls": 0, "puts": 0, "injected_errors": 0, "bytes_received": 0}
+        self.httpd = StandInHTTPServer((host, port), StandInHandler)
+        self.httpd.stand_in = self
+        self._thread = None
+
+    # ---------- 서버 ----------
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def lambda_url(self):
+        return f"http://{self.address}/lambda"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="local-s3", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def sleep_ms(self, ms):
+        if ms:
+            time.sleep(ms / 1000.0)
+
+    def inject_error(self):
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            hit = self._random.random() < self.error_rate
+            if hit:
+                self.counters["injected_errors"] += 1
+        return hit
+
+    def stats(self):
+        with self._lock:
+            data = dict(self.counters)
+            data["objects"] = len(self.objects)
+            data["open_multipart"] = len(self.multipart)
+        return data
+
+    # ---------- 서명 ----------
+    def _signature(self, method, key, expires, upload_id="", part=""):
+        msg = f"{method}\n{key}\n{expires}\n{upload_id}\n{part}".encode("utf-8")
+        return hmac.new(self._secret, msg, hashlib.sha256).hexdigest()
+
+    def presign(self, base_url, key, upload_id="", part="", expires_in=None):
+        expires = int(time.time()) + (expires_in or self.expires_in)
+        url = f"{base_url}/sink/{quote(key)}?expires={expires}&signature={self._signature('PUT', key, expires, upload_id, part)}"
+        if upload_id:
+            url += f"&uploadId={upload_id}&partNumber={part}"
+        return url
+
+    def check_signature(self, method, key, query):
+        """서명/만료 확인, 문제 있으면 S3 오류 코드 반환"""
+        try:
+            expires = int(query.get("expires", 0))
+        except ValueError:
+            return "AccessDenied"
+        expected = self._signature(method, key, expires, query.get("uploadId", ""), query.get("partNumber", ""))
+        if not hmac.compare_digest(expected, query.get("signature", "")):
+            return "SignatureDoesNotMatch"
+        if time.time() > expires:
+            return "AccessDenied"  # 실제 S3 도 만료 시 403 AccessDenied
+        return None
+
+    # ---------- 저장 ----------
+    def _write(self, key, data):
+        if self.store_dir and data is not None:
+            target = os.path.join(self.store_dir, *key.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(data)
+
+    def store_object(self, key, size, md5_hex, data=None):
+        self._write(key, data)
+        with self._lock:
+            self.objects[key] = {"size": size, "md5": md5_hex, "completed_at": time.time()}
+            self.counters["puts"] += 1
+            self.counters["bytes_received"] += size
+
+    def store_part(self, upload_id, part_number, size, md5_hex, data=None):
+        with self._lock:
+            upload = self.multipart.get(upload_id)
+            if upload is None:
+                return False
+            upload["parts"][part_number] = (size, md5_hex, data)
+            self.counters["puts"] += 1
+            self.counters["bytes_received"] += size
+        return True
+
+    # ---------- Lambda 규약 ----------
+    def handle_lambda(self, body_json, base_url):
+        """lambda_gen_pre_url.lambda_handler 와 같은 규약으로 처리, (status, dict) 반환"""
+        with self._lock:
+            self.counters["lambda_calls"] += 1
+        service = PresignService(SinkPresigner(self, base_url), None, partition=self.partition,
+                                 expires_in=self.expires_in, s3_api=self)
+        return service.handle(body_json)
+
+    # ---------- 멀티파트 (PresignService 의 s3_api, boto3 S3 클라이언트와 같은 이름) ----------
+    def create_multipart_upload(self, Bucket, Key, ContentType=None):
+        upload_id = secrets.token_hex(8)
+        with self._lock:
+            self.multipart[upload_id] = {"key": Key, "parts": {}}
+        return {"UploadId": upload_id}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = sorted(MultipartUpload["Parts"], key=lambda p: p["PartNumber"])
+        with self._lock:
+            upload = self.multipart.get(UploadId)
+            if upload is None or upload["key"] != Key:
+                raise MultipartError(404, "NoSuchUpload")
+            stored = upload["parts"]
+            for p in parts:
+                got = stored.get(p["PartNumber"])
+                if got is None or f'"{got[1]}"' != p["ETag"]:
+                    raise MultipartError(400, "InvalidPart")
+            del self.multipart[UploadId]
+        # S3 멀티파트 ETag 규칙: md5(각 파트 md5 digest 연결)-파트수
+        digest = hashlib.md5(b"".join(bytes.fromhex(stored[p["PartNumber"]][1]) for p in parts))
+        size = sum(stored[p["PartNumber"]][0] for p in parts)
+        if self.store_dir:
+            self._write(Key, b"".join(stored[p["PartNumber"]][2] or b"" for p in parts))
+        with self._lock:
+            self.objects[Key] = {
+                "size": size,
+                "md5": f"{digest.hexdigest()}-{len(parts)}",
+                "completed_at": time.time(),
+            }
+        return {"Key": Key}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        with self._lock:
+            if self.multipart.pop(UploadId, None) is None:
+                raise MultipartError(404, "NoSuchUpload")
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 S3 + Lambda 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0, help="PUT 마다 추가 지연")
+    parser.add_argument("--presign-latency-ms", type=float, default=0, help="Lambda 호출마다 추가 지연")
+    parser.add_argument("--bandwidth-mbps", type=float, default=0, help="수신 대역폭 제한 MB/s (0=무제한)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    parser.add_argument("--store-dir", default=None, help="받은 객체를 저장할 폴더")
+    parser.add_argument("--key-partition", choices=[PARTITION_NONE, PARTITION_DATE], default=PARTITION_NONE,
+                        help="키 파티셔닝 (Lambda 의 KEY_PARTITION 과 같음)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = LocalS3Server(
+        host=args.host, port=args.port, latency_ms=args.latency_ms,
+        presign_latency_ms=args.presign_latency_ms, bandwidth_mbps=args.bandwidth_mbps,
+        error_rate=args.error_rate, store_dir=args.store_dir, verbose=args.verbose,
+        partition=args.key_partition
+    )
+    print(f"Lambda URL: {server.lambda_url}")
+    print(f"통계: http://{server.address}/stats")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
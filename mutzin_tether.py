@@ -1,14 +1,25 @@
-import gphoto2 as gp
 import os
 import glob
-import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
 import time
+import threading
+import contextlib
 from PIL import Image, ImageTk
-from pose_estimator import *
 import json
-from aws_manager import AWSSettingsWindow, AWSS3Manager
+import logging
+from aws_manager import AWSSettingsWindow
+from upload_scheduler import format_eta
+from latency_tracer import LatencyStatsWindow, STAGE_DECODE, STAGE_RESIZE, STAGE_DRAW, STAGE_TO_PREVIEW
+from lock_profiler import LockProfileWindow
+from live_view import LiveViewDecoder, RateMeter
+from event_log import EventLog, WIDGET_MAX_LINES, FLUSH_INTERVAL_MS, MAX_FLUSH_LINES
+from render_engine import PreviewRenderer
+from image_records import ImageRecordStore, DecodedImageCache, MemoryDiagnosticsWindow
+from tether_engine import (TetherEngine, JPEG_EXTS, list_cameras, get_camera_setting, set_camera_config_with_choices,
+                           set_aperture, get_unique_filename, download_file, event_listener)
+
+MAX_THUMBNAILS = 200  # 썸네일 줄에 올리는 최신 사진 수 (PhotoImage/버튼이 사진 수만큼 쌓이지 않게)
 
 AWS_CONFIG_PATH = os.path.join(os.path.expanduser("./"), ".settings/.aws_camera_settings", "config.json")
 
@@ -25,121 +36,26 @@ def save_aws_settings(settings):
     with open(AWS_CONFIG_PATH, "w") as f:
         json.dump(settings, f, indent=2)
 
-# --------- CAMERA UTILS ----------
-def list_cameras():
-    context = gp.Context()
-    abilities_list = gp.Camera.autodetect(context)
-    return abilities_list
-
-def get_camera_setting(camera, option):
-    try:
-        config = camera.get_config()
-        child = config.get_child_by_name(option)
-        return child.get_value()
-    except Exception:
-        return None
-
-def set_camera_config_with_choices(camera, option, value):
-    try:
-        config = camera.get_config()
-        child = config.get_child_by_name(option)
-        choices = list(child.get_choices())
-        if value not in choices:
-            return False, f"잘못된 입력입니다! 설정 가능한 값 중에서 선택하세요: {choices}"
-        child.set_value(value)
-        camera.set_config(config)
-        return True, f"{option}가 {value}(으)로 설정되었습니다."
-    except Exception:
-        return False, f"{option} 설정 실패"
-
-def set_aperture(camera, value):
-    for option in ["aperture", "f-number"]:
-        ok, msg = set_camera_config_with_choices(camera, option, value)
-        if ok:
-            return ok, msg
-    return False, "조리개(f-number, aperture) 둘 다 설정 실패: 카메라 또는 렌즈에서 원격조리개 설정이 지원되지 않을 수 있습니다."
-
-def get_unique_filename(folder, base_filename, ext):
-    n = 1
-    candidate = f"{base_filename}{ext}"
-    while os.path.exists(os.path.join(folder, candidate)):
-        n += 1
-        candidate = f"{base_filename}_{n}{ext}"
-    return candidate
-
-def download_file(camera, folder, name, save_path, base_filename, exts, log_func=None, camera_lock=None):
-    ext = os.path.splitext(name)[1].lower()
-    if ext not in exts:
-        return None
-    outname = get_unique_filename(save_path, base_filename, ext)
-    camera_file = gp.CameraFile()
-    if camera_lock:
-        with camera_lock:
-            camera.file_get(folder, name, gp.GP_FILE_TYPE_NORMAL, camera_file)
-    else:
-        camera.file_get(folder, name, gp.GP_FILE_TYPE_NORMAL, camera_file)
-    target = os.path.join(save_path, outname)
-    camera_file.save(target)
-    if log_func:
-        log_func(f"파일 다운로드 완료: {target}")
-    return target
-
-def event_listener(camera, get_save_dir, get_base_filename, get_save_format, notify_saved, log_func, camera_lock, stop_event):
-    raw_exts = [".arw", ".raw", ".nef", ".cr2", ".cr3", ".orf", ".rw2", ".dng"]
-    jpeg_exts = [".jpg", ".jpeg"]
-    while not stop_event.is_set():
-        try:
-            with camera_lock:
-                event_type, event_data = camera.wait_for_event(1000)
-            if event_type == gp.GP_EVENT_FILE_ADDED:
-                folder = event_data.folder
-                name = event_data.name
-                save_format = get_save_format()
-                if save_format == "raw":
-                    exts = raw_exts
-                elif save_format == "jpeg":
-                    exts = jpeg_exts
-                else:
-                    exts = raw_exts + jpeg_exts
-                save_dir = get_save_dir()
-                base_filename = get_base_filename()
-                if not os.path.exists(save_dir):
-                    os.makedirs(save_dir, exist_ok=True)
-                log_func(f"[바디 촬영 감지] 파일 생성됨: {folder}/{name}")
-                path = download_file(camera, folder, name, save_dir, base_filename, exts, log_func, camera_lock=camera_lock)
-                if path:
-                    notify_saved(path)
-        except gp.GPhoto2Error as e:
-            if e.code in (-53, -110):
-                log_func(f"이벤트 감시 오류(-53 or -110): {e}. 카메라 재초기화 시도")
-                try:
-                    with camera_lock:
-                        camera.exit()
-                        time.sleep(1)
-                        camera.init()
-                        time.sleep(1)
-                except Exception as e2:
-                    log_func(f"이벤트 감시 카메라 재초기화 실패: {e2}")
-            else:
-                log_func(f"이벤트 감시 오류: {e}")
-            time.sleep(1)
-        except Exception as e:
-            log_func(f"이벤트 감시 오류: {e}")
-            time.sleep(1)
-
 # --------- GUI IMAGE PREVIEW ----------
 class FastResizableImageCanvas(tk.Canvas):
-    def __init__(self, master, get_rotation_callback, get_quality_callback, get_zoom_callback, **kwargs):
+    def __init__(self, master, get_rotation_callback, get_quality_callback, get_zoom_callback, tracer=None,
+                 image_cache=None, renderer=None, **kwargs):
         super().__init__(master, highlightthickness=0, **kwargs)
+        self.tracer = tracer
         self.get_rotation = get_rotation_callback
         self.get_quality = get_quality_callback
         self.get_zoom = get_zoom_callback
-        self.pil_image = None
+        # 원본 픽셀은 캔버스가 들고 있지 않고 공유 캐시에서 꺼냄 (메모리 한도 안에서 밀려나면 다시 디코딩)
+        self.image_cache = image_cache if image_cache is not None else DecodedImageCache()
+        self.renderer = renderer if renderer is not None else PreviewRenderer()
         self.tk_image = None
         self.current_image_path = None
         self.width = 500
         self.height = 500
         self.last_preview_args = (None, None, None, None, None, None)
+        self.live_mode = False
+        self._live_photo = None
+        self._live_item = None
         self.bind("<Configure>", self._on_resize)
         self.bind("<Button-1>", self._on_click)
         self.bind("<MouseWheel>", self._on_mousewheel)  # Windows
@@ -162,13 +78,27 @@ class FastResizableImageCanvas(tk.Canvas):
             if self._zoom_callback:
                 self._zoom_callback(zoom_in=False)
 
+    def _span(self, stage):
+        if self.tracer is None:
+            return contextlib.nullcontext()
+        return self.tracer.span(stage, self.current_image_path)
+
+    def _decode(self, image_path):
+        with self._span(STAGE_DECODE):
+            pil_img = Image.open(image_path)
+            pil_img.load()
+        return pil_img
+
+    def _source_image(self):
+        return self.image_cache.get(self.current_image_path, self._decode)
+
     def set_image(self, image_path):
         try:
-            pil_img = Image.open(image_path)
-            self.pil_image = pil_img
             self.current_image_path = image_path
+            self._source_image()
             self._update_preview(force=True)
-        except Exception as e:
+        except Exception:
+            self.current_image_path = None
             self.delete("all")
             self.create_text(10, 10, anchor="nw", text="이미지 열기 오류", fill="red")
 
@@ -177,8 +107,35 @@ class FastResizableImageCanvas(tk.Canvas):
         self.height = event.height
         self._update_preview()
 
+    # 라이브뷰: 사진 미리보기 대신 프레임 표시, 끄면 마지막 사진으로 복귀
+    def start_live(self):
+        self.live_mode = True
+        self._live_photo = None
+        self.delete("all")
+
+    def stop_live(self):
+        self.live_mode = False
+        self._live_photo = None
+        self._live_item = None
+        self._update_preview(force=True)
+
+    def show_live_frame(self, img):
+        """라이브뷰 프레임 표시 (크기가 같으면 PhotoImage 하나에 paste 로 덮어써서 매 프레임 할당하지 않음)"""
+        if not self.live_mode:
+            return
+        if self._live_photo is None or (self._live_photo.width(), self._live_photo.height()) != img.size:
+            self._live_photo = ImageTk.PhotoImage(img)
+            self.delete("all")
+            self._live_item = self.create_image(self.width // 2, self.height // 2, image=self._live_photo, anchor="center")
+        else:
+            self._live_photo.paste(img)
+
     def _update_preview(self, force=False):
-        if not self.pil_image:
+        if self.live_mode:
+            if self._live_item is not None:
+                self.coords(self._live_item, self.width // 2, self.height // 2)
+            return
+        if self.current_image_path is None:
             self.delete("all")
             self.create_text(10, 10, anchor="nw", text="(여기에 사진이 나타납니다)", fill="#666")
             return
@@ -192,27 +149,33 @@ class FastResizableImageCanvas(tk.Canvas):
             zoom == self.last_preview_args[3] and
             (self.width, self.height) == self.last_preview_args[4:6]):
             return
-        img = self.pil_image.copy()
-        if rot != 0:
-            img = img.rotate(-rot, expand=True)
-        scale = qual
-        if scale < 1.0:
-            img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))), resample=Image.BILINEAR)
-        if zoom != 1.0:
-            img = img.resize((max(1, int(img.width * zoom)), max(1, int(img.height * zoom))), resample=Image.BILINEAR)
-        img.thumbnail((self.width, self.height), resample=Image.BILINEAR)
-        self.tk_image = ImageTk.PhotoImage(img)
-        self.delete("all")
-        self.create_image(self.width // 2, self.height // 2, image=self.tk_image, anchor="center")
+        try:
+            src = self._source_image()
+        except Exception:
+            self.delete("all")
+            self.create_text(10, 10, anchor="nw", text="이미지 열기 오류", fill="red")
+            return
+        with self._span(STAGE_RESIZE):
+            img = self._render(src, rot, qual, zoom)
+        with self._span(STAGE_DRAW):
+            self.tk_image = ImageTk.PhotoImage(img)
+            self.delete("all")
+            self.create_image(self.width // 2, self.height // 2, image=self.tk_image, anchor="center")
         self.last_preview_args = (self.current_image_path, rot, qual, zoom, self.width, self.height)
 
+    def _render(self, src, rot, qual, zoom):
+        """화면 크기로 한 번만 줄인 뒤 회전 (원본 크기 사본/회전본을 만들지 않음)"""
+        scale = (qual if qual < 1.0 else 1.0) * zoom
+        return self.renderer.render(src, (self.width, self.height), rot, scale)
+
     def refresh_rotation_or_quality(self, force=False):
         self._update_preview(force=force)
 
 class ThumbnailGallery(ttk.Frame):
-    def __init__(self, master, on_thumbnail_click, thumb_size=56, **kwargs):
+    def __init__(self, master, on_thumbnail_click, thumb_size=56, on_thumbnail_select=None, **kwargs):
         super().__init__(master, **kwargs)
         self.on_thumbnail_click = on_thumbnail_click
+        self.on_thumbnail_select = on_thumbnail_select
         self.thumb_size = thumb_size
         self.thumbnails = []
         self.row_frame = ttk.Frame(self)
@@ -233,18 +196,35 @@ class ThumbnailGallery(ttk.Frame):
     def _on_canvas_configure(self, event):
         self.canvas.itemconfig(self.canvas.find_all()[0], width=event.width)
 
-    def add_thumbnail(self, image_path):
+    def add_thumbnail(self, image_path, caption=None, front=False):
+        """썸네일 추가 (front=True 면 맨 앞, 새로 찍은 사진용)"""
         try:
             pil_img = Image.open(image_path)
             pil_img.thumbnail((self.thumb_size, self.thumb_size))
             tk_img = ImageTk.PhotoImage(pil_img)
             btn = tk.Button(self.inner_frame, image=tk_img, width=self.thumb_size, height=self.thumb_size, command=lambda p=image_path: self.on_thumbnail_click(p))
+            if caption:
+                # 여러 카메라 촬영 시 카메라 ID 표시
+                btn.config(text=caption, compound="top", height=self.thumb_size + 14)
             btn.image = tk_img
-            btn.pack(side="left", padx=4, pady=2)
-            self.thumbnails.append((image_path, tk_img, btn))
+            if self.on_thumbnail_select:
+                # 우클릭: A컷 지정
+                btn.bind("<Button-3>", lambda e, p=image_path: self.on_thumbnail_select(p))
+            if front and self.thumbnails:
+                btn.pack(side="left", padx=4, pady=2, before=self.thumbnails[0][2])
+                self.thumbnails.insert(0, (image_path, tk_img, btn))
+            else:
+                btn.pack(side="left", padx=4, pady=2)
+                self.thumbnails.append((image_path, tk_img, btn))
         except Exception:
             pass
 
+    def trim(self, limit):
+        """뒤(오래된 사진)부터 지워서 limit 개만 남김"""
+        while len(self.thumbnails) > limit:
+            _, _, btn = self.thumbnails.pop()
+            btn.destroy()
+
     def clear(self):
         for _, _, btn in self.thumbnails:
             btn.destroy()
@@ -254,28 +234,41 @@ class CameraGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Sony Camera Tether GUI")
-        self.camera = None
-        self.event_thread = None
-        self.event_stop = threading.Event()
-        self.camera_lock = threading.Lock()
+        # 로그는 어느 스레드에서든 logging 으로 남기고, 로그 창은 FLUSH_INTERVAL_MS 마다 모아서 갱신
+        self.logger = logging.getLogger("mutzin.gui")
+        self.event_log = EventLog()
+        self.event_log.start()
+        self.root.after(FLUSH_INTERVAL_MS, self._flush_log)
+        # 촬영 -> 다운로드 -> 분석 -> 업로드는 엔진 스레드에서 처리, GUI 는 결과 표시만
+        # (엔진 로그는 mutzin.tether 로거로 남으므로 log_callback 불필요)
+        self.engine = TetherEngine()
+        self.engine.add_listener(self._on_engine_event)
+        self.camera_lock = self.engine.camera_lock
+        self.latency_tracer = self.engine.latency_tracer
+        self.s3_manager = self.engine.s3_manager
         self.jpeg_quality = 1.0
-        self.jpeg_history = []
-        self.main_rotation_map = {}
-        self.compare_rotation_map = {}
-        self.main_zoom_map = {}
-        self.compare_zoom_map = {}
+        # 사진별 회전/확대와 촬영 순서는 최근 사진만 기억, 디코딩한 원본은 메인/비교 캔버스가 함께 씀
+        self.image_records = ImageRecordStore()
+        self.image_cache = DecodedImageCache()
+        self.renderer = PreviewRenderer()
         self.compare_path = None
+        # 엔진 스레드의 saved 이벤트를 모아 두었다가 Tk 콜백 한 번에 처리 (핫폴더/연사로 여러 장이 몰릴 때)
+        self._saved_lock = threading.Lock()
+        self._saved_paths = []
+        self._saved_flush_scheduled = False
         self.default_main_rotation = 0
         self.default_main_zoom = 1.0
 
         self.compare_layout_var = tk.StringVar(value="right")
+        self._settings_loading = False
+        self.live_decoder = None
+        self._live_pending = False
+        self._live_meter = RateMeter()
+        self._live_latency_ms = None
 
         self.paned = ttk.Panedwindow(root, orient=tk.HORIZONTAL)
         self.paned.pack(fill="both", expand=True)
-        self.pose_estimator = None
         self.pose_estimation_enabled = tk.BooleanVar(value=False)
-        self.pose_estimation_in_progress = False
-        self.pose_estimation_thread = None
         # -----------------------------
 
 
@@ -286,6 +279,19 @@ class CameraGUI:
         settings_menu = tk.Menu(self.menubar, tearoff=0)
         self.menubar.add_cascade(label="설정", menu=settings_menu)
         settings_menu.add_command(label="AWS 설정", command=self.show_aws_settings)
+        settings_menu.add_command(label="지연시간 통계", command=self.show_latency_stats)
+        settings_menu.add_command(label="카메라 락 프로파일", command=self.show_lock_profile)
+        settings_menu.add_command(label="메모리 진단", command=self.show_memory_diagnostics)
+
+        card_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="카드", menu=card_menu)
+        card_menu.add_command(label="카드 전체 가져오기...", command=self.start_card_ingest)
+        card_menu.add_command(label="가져오기 중지", command=self.stop_card_ingest)
+
+        hot_folder_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label="핫폴더", menu=hot_folder_menu)
+        hot_folder_menu.add_command(label="폴더 감시 시작...", command=self.start_hot_folder)
+        hot_folder_menu.add_command(label="감시 중지", command=self.stop_hot_folder)
 
         # S3 자동 업로드 설정 변수
         self.s3_upload_var = tk.BooleanVar(value=True)  # 기본값 True
@@ -299,16 +305,48 @@ class CameraGUI:
 
         # GUI에 pose estimation 컨트롤 추가
         self._init_param_frame(param_frame)
-        # AWS S3 매니저 초기화
-        self.s3_manager = AWSS3Manager(log_callback=self.log)
+        self._sync_engine_output()
 
         # 썸네일 갱신 이벤트 연결
         self.save_dir_var.trace_add("write", lambda *a: self.refresh_thumbnails())
         self.base_filename_var.trace_add("write", lambda *a: self.refresh_thumbnails())
+        # 저장 설정은 엔진에도 반영 (다음 파일부터 적용)
+        for var in (self.save_dir_var, self.base_filename_var, self.save_format_var):
+            var.trace_add("write", lambda *a: self._sync_engine_output())
 
         self.connect_camera()
         self.refresh_thumbnails()
         self.poll_camera_settings()
+        self.poll_upload_status()
+
+    @property
+    def camera(self):
+        return self.engine.camera
+
+    def _sync_engine_output(self):
+        self.engine.set_output(
+            save_dir=self.save_dir_var.get(),
+            base_filename=self.base_filename_var.get(),
+            save_format=self.save_format_var.get(),
+        )
+
+    def _on_engine_event(self, event, data):
+        """엔진 이벤트 (엔진 스레드에서 호출되므로 Tk 스레드로 넘김)"""
+        if event == "saved":
+            if os.path.splitext(data)[1].lower() in JPEG_EXTS:
+                with self._saved_lock:
+                    self._saved_paths.append(data)
+                    if self._saved_flush_scheduled:
+                        return
+                    self._saved_flush_scheduled = True
+                self.root.after(0, self._flush_saved)
+        elif event == "camera":
+            self.root.after(0, lambda: self.camera_status.config(text=data))
+        elif event == "pose_status":
+            self.root.after(0, lambda: self.pose_status_label.config(text=data))
+            if data != "Estimating pose...":
+                self.root.after(3000, lambda: self.pose_status_label.config(
+                    text="활성화됨" if self.engine.pose_enabled else "비활성화됨"))
 
     def _init_preview_pane(self):
         if self.preview_pane is not None:
@@ -323,6 +361,9 @@ class CameraGUI:
             get_rotation_callback=self.get_main_rotation,
             get_quality_callback=lambda: self.jpeg_quality,
             get_zoom_callback=self.get_main_zoom,
+            tracer=self.latency_tracer,
+            image_cache=self.image_cache,
+            renderer=self.renderer,
             bg="white"
         )
         self.compare_canvas = FastResizableImageCanvas(
@@ -330,48 +371,104 @@ class CameraGUI:
             get_rotation_callback=self.get_compare_rotation,
             get_quality_callback=lambda: self.jpeg_quality,
             get_zoom_callback=self.get_compare_zoom,
+            tracer=self.latency_tracer,
+            image_cache=self.image_cache,
+            renderer=self.renderer,
             bg="#f6f7fa"
         )
         self.main_canvas.set_zoom_callback(self._main_zoom)
         self.compare_canvas.set_zoom_callback(self._compare_zoom)
         self.preview_pane.add(self.main_canvas, weight=4)
         self.preview_pane.add(self.compare_canvas, weight=4)
-        self.thumb_gallery = ThumbnailGallery(self.preview_pane, self.on_thumbnail_click, thumb_size=64)
+        self.thumb_gallery = ThumbnailGallery(self.preview_pane, self.on_thumbnail_click, thumb_size=64,
+                                              on_thumbnail_select=self.on_thumbnail_select)
         self.preview_pane.add(self.thumb_gallery, weight=0)
         self._add_rotate_buttons()
+        if self.live_decoder:
+            self.main_canvas.start_live()
 
     def show_aws_settings(self):
         aws_settings = AWSSettingsWindow(self.root)
         aws_settings.transient(self.root)
         aws_settings.grab_set()
         self.root.wait_window(aws_settings)
-        # 설정 변경 후 S3 매니저 재초기화
-        self.s3_manager.initialize_client()
+        if aws_settings.saved:
+            # 설정 변경 후 S3 매니저 재초기화 (워커 재시작 시 join 대기가 있으므로 Tk 스레드 밖에서)
+            threading.Thread(target=self.s3_manager.initialize_client, name="s3-reinit", daemon=True).start()
+
+    def show_latency_stats(self):
+        LatencyStatsWindow(self.root, self.latency_tracer).transient(self.root)
+
+    def show_lock_profile(self):
+        # 카메라가 여러 대면 카메라별 락마다 창 하나씩
+        for lock in self.engine.camera_locks():
+            LockProfileWindow(self.root, lock).transient(self.root)
+
+    def show_memory_diagnostics(self):
+        MemoryDiagnosticsWindow(self.root, self._memory_stats).transient(self.root)
+
+    def _memory_stats(self):
+        records = self.image_records.stats()
+        cache = self.image_cache.stats()
+        return {
+            "사진 레코드": f"{records['records']} / {records['max_records']} (버림 {records['evicted']})",
+            "촬영 순서 목록": records["history"],
+            "디코딩 캐시 (MB)": f"{cache['mb']:.1f} / {cache['budget_mb']:.0f}",
+            "디코딩 캐시 장수": f"{cache['images']} (적중 {cache['hits']}, 디코딩 {cache['misses']}, 버림 {cache['evicted']})",
+            "썸네일": len(self.thumb_gallery.thumbnails),
+        }
 
-    def show_jpeg_preview(self, image_path):
+    def start_hot_folder(self):
+        """제조사 테더링 프로그램이 사진을 쓰는 폴더를 감시 (카메라 연결 없이 미리보기/자세 추정/업로드)"""
+        folder = filedialog.askdirectory(title="감시할 폴더", initialdir=self.save_dir_var.get())
+        if not folder:
+            return
+        self.save_dir_var.set(folder)
+        self.engine.start_hot_folder(folder)
         self.refresh_thumbnails()
-        # 중복 방지(새 파일만 추가)
-        if image_path not in self.jpeg_history:
-            self.jpeg_history.insert(0, image_path)
-            self.thumb_gallery.add_thumbnail(image_path)
-        if len(self.jpeg_history) > 1 and self.compare_path is None:
-            self.compare_path = self.jpeg_history[1]
-            self.compare_canvas.set_image(self.compare_path)
-        path = image_path
-        if path not in self.main_rotation_map:
-            self.main_rotation_map[path] = self.default_main_rotation
-        if path not in self.main_zoom_map:
-            self.main_zoom_map[path] = self.default_main_zoom
-        self.main_canvas.set_image(image_path)
-        self.main_canvas.refresh_rotation_or_quality(force=True)
-        if self.pose_estimation_enabled.get() and not self.pose_estimation_in_progress:
-            import threading
-            self.pose_estimation_thread = threading.Thread(
-                target=self._estimate_pose,
-                args=(image_path,),
-                daemon=True
-            )
-            self.pose_estimation_thread.start()
+
+    def stop_hot_folder(self):
+        self.engine.stop_hot_folder()
+        self.camera_status.config(text="핫폴더 감시 중지")
+        self.refresh_thumbnails()
+
+    def start_card_ingest(self):
+        """카메라 카드에 있는 사진 중 받을 폴더에 없는 것을 모두 받기 (다시 실행하면 이어 받음)"""
+        if not self.camera:
+            self.log("카드 가져오기 실패: 카메라가 연결되어 있지 않습니다!")
+            return
+        if self.engine.ingest and self.engine.ingest.is_running():
+            self.log("카드 가져오기가 이미 진행 중입니다.")
+            return
+        dest = filedialog.askdirectory(title="카드 사진을 받을 폴더",
+                                       initialdir=os.path.join(self.save_dir_var.get(), "card_import"))
+        if not dest:
+            return
+        self.engine.start_ingest(dest, save_format=self.save_format_var.get())
+        self.log(f"카드 가져오기 시작: {dest}")
+        self._poll_ingest_status()
+
+    def stop_card_ingest(self):
+        if self.engine.ingest and self.engine.ingest.is_running():
+            threading.Thread(target=self.engine.stop_ingest, daemon=True).start()
+
+    def _poll_ingest_status(self):
+        ingest = self.engine.ingest
+        if not ingest:
+            return
+        s = ingest.status()
+        if s["state"] == "scanning":
+            text = "카드 가져오기: 카드 훑는 중..."
+        else:
+            text = (f"카드 가져오기: {s['files_done']}/{s['files_total']}개 {s['mb_done']}/{s['mb_total']}MB "
+                    f"{s['recent_mb_per_sec'] or 0:.1f}MB/s 남은 시간 {format_eta(s['eta_sec'])}")
+        if ingest.is_running():
+            self.ingest_status_var.set(text)
+            self.root.after(500, self._poll_ingest_status)
+        else:
+            self.ingest_status_var.set("")
+            self.log(f"카드 가져오기 {s['state']}: {s['files_done']}/{s['files_total']}개 "
+                     f"(이미 있음 {s['files_skipped']}, 실패 {s['files_failed']}), 평균 {s['mb_per_sec'] or 0}MB/s")
 
     def _add_pose_estimation_controls(self, row, param_frame):
         # row = len(param_frame.grid_slaves()) // 4  # 기존 위젯 다음 행
@@ -394,64 +491,71 @@ class CameraGUI:
         self.pose_status_label.grid(row=row+2, column=2, columnspan=2, sticky="w")
 
     def _toggle_pose_estimation(self):
-        if self.pose_estimation_enabled.get():
-            from pose_estimator import PoseEstimator
-            self.pose_estimator = PoseEstimator()
-            self.pose_status_label.config(text="활성화됨")
+        enabled = self.pose_estimation_enabled.get()
+        self.engine.set_pose_enabled(enabled)
+        self.pose_status_label.config(text="활성화됨" if enabled else "비활성화됨")
+
+    # ---------- 라이브뷰 ----------
+    def _toggle_live_view(self):
+        if self.live_view_var.get():
+            self.start_live_view()
         else:
-            self.pose_estimator = None
-            self.pose_status_label.config(text="비활성화됨")
-
-    def _save_pose_estimation(self, image_path, results):
-        """자세 추정 결과를 JSON 파일로 저장"""
-        save_dir = os.path.dirname(image_path)
-        base_name = os.path.basename(image_path)
-        json_file = os.path.join(save_dir, "pose_estimation.json")
-
-        # 새로운 결과 데이터 생성
-        new_entry = {
-            "filename": base_name,
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-            "pose": results['pose'],
-            "view": results['view'],
-            "full_body": results['full_body'],
-        }
-
-        # 기존 JSON 파일 읽기 또는 새로 생성
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = {"pose_estimations": []}
-
-        # 새 데이터 추가
-        data["pose_estimations"].append(new_entry)
-
-        # JSON 파일 저장
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-
-        # 로그에 결과 표시
-        formatted_result = self.pose_estimator.get_formatted_result(results)
-        self.log(f"[Pose Estimation] {base_name}: {formatted_result}")
-
-    def _estimate_pose(self, image_path):
-        """별도 스레드에서 자세 추정을 수행"""
-        if not self.pose_estimator or not self.pose_estimation_enabled.get():
+            self.stop_live_view()
+
+    def start_live_view(self):
+        decoder = LiveViewDecoder(self._on_live_image, lambda: (self.main_canvas.width, self.main_canvas.height))
+        if not self.engine.start_live_view(decoder.submit, get_min_interval=decoder.min_interval):
+            decoder.stop()
+            self.live_view_var.set(False)
+            messagebox.showerror("라이브뷰", "카메라가 연결되어 있지 않습니다!")
+            return
+        self.live_decoder = decoder
+        self._live_pending = False
+        self._live_meter = RateMeter()
+        self._live_latency_ms = None
+        self.main_canvas.start_live()
+        self._poll_live_view_status(decoder)
+
+    def stop_live_view(self):
+        decoder, self.live_decoder = self.live_decoder, None
+        self.engine.stop_live_view()
+        if decoder:
+            decoder.stop()
+        self.main_canvas.stop_live()
+        self.live_view_status_var.set("")
+
+    def _on_live_image(self, img, grabbed_at):
+        """디코딩 워커 스레드에서 호출, Tk 가 이전 프레임을 아직 못 그렸으면 이번 프레임은 버림"""
+        decoder = self.live_decoder
+        if decoder is None:
             return
+        if self._live_pending:
+            decoder.report_dropped()
+            return
+        self._live_pending = True
+        self.root.after(0, self._draw_live_frame, decoder, img, grabbed_at)
 
-        self.pose_estimation_in_progress = True
-        self.pose_status_label.config(text="Estimating pose...")
+    def _draw_live_frame(self, decoder, img, grabbed_at):
+        self._live_pending = False
+        if decoder is not self.live_decoder:
+            return
+        started = time.perf_counter()
+        self.main_canvas.show_live_frame(img)
+        now = time.perf_counter()
+        decoder.report_draw(now - started)
+        self._live_meter.tick(now)
+        latency = (now - grabbed_at) * 1000.0
+        self._live_latency_ms = latency if self._live_latency_ms is None else self._live_latency_ms * 0.8 + latency * 0.2
+
+    def _poll_live_view_status(self, decoder):
+        if decoder is not self.live_decoder:
+            return
+        latency = "-" if self._live_latency_ms is None else f"{self._live_latency_ms:.0f}ms"
+        self.live_view_status_var.set(
+            f"{self._live_meter.rate():.1f}fps | 지연 {latency} | 건너뜀 {decoder.dropped}"
+        )
+        self.root.after(500, self._poll_live_view_status, decoder)
 
-        try:
-            results = self.pose_estimator.estimate(image_path)
-            self._save_pose_estimation(image_path, results)
-            self.root.after(0, lambda: self.pose_status_label.config(text="Pose estimation complete"))
-        except Exception as e:
-            self.root.after(0, lambda: self.pose_status_label.config(text=f"Pose estimation failed: {str(e)}"))
-        finally:
-            self.pose_estimation_in_progress = False
-            self.root.after(3000, lambda: self.pose_status_label.config(text="Enabled"))
     def update_compare_layout(self):
         self.paned.forget(self.preview_pane)
         self._init_preview_pane()
@@ -550,7 +654,31 @@ class CameraGUI:
         self.base_filename_entry.grid(row=row, column=1, sticky="w")
         row += 1
         self.capture_btn = ttk.Button(param_frame, text="촬영 및 저장(PC에서)", command=self.capture)
-        self.capture_btn.grid(row=row, column=0, columnspan=4, pady=12, sticky="ew")
+        self.capture_btn.grid(row=row, column=0, columnspan=4, pady=(12, 4), sticky="ew")
+        row += 1
+        ttk.Label(param_frame, text="인터벌(초):").grid(row=row, column=0, sticky="e")
+        self.interval_var = tk.StringVar(value="5")
+        ttk.Entry(param_frame, textvariable=self.interval_var, width=6).grid(row=row, column=1, sticky="w")
+        ttk.Label(param_frame, text="장 수(0=무제한):").grid(row=row, column=2, sticky="e")
+        self.interval_count_var = tk.StringVar(value="0")
+        ttk.Entry(param_frame, textvariable=self.interval_count_var, width=6).grid(row=row, column=3, sticky="w")
+        row += 1
+        self.interval_btn = ttk.Button(param_frame, text="인터벌 촬영 시작", command=self._toggle_interval)
+        self.interval_btn.grid(row=row, column=0, sticky="w")
+        self.capture_status_var = tk.StringVar(value="")
+        ttk.Label(param_frame, textvariable=self.capture_status_var).grid(row=row, column=1, columnspan=3, sticky="w")
+        row += 1
+        self.live_view_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(param_frame, text="라이브뷰", variable=self.live_view_var,
+                        command=self._toggle_live_view).grid(row=row, column=0, sticky="w")
+        self.live_view_status_var = tk.StringVar(value="")
+        ttk.Label(param_frame, textvariable=self.live_view_status_var).grid(row=row, column=1, columnspan=3, sticky="w")
+        row += 1
+        self.upload_status_var = tk.StringVar(value="업로드: -")
+        ttk.Label(param_frame, textvariable=self.upload_status_var).grid(row=row, column=0, columnspan=4, sticky="w")
+        row += 1
+        self.ingest_status_var = tk.StringVar(value="")
+        ttk.Label(param_frame, textvariable=self.ingest_status_var).grid(row=row, column=0, columnspan=4, sticky="w")
         row += 1
         ttk.Label(param_frame, text="이벤트 로그:").grid(row=row, column=0, sticky="w")
         self.log_text = tk.Text(param_frame, height=7, width=50, state="disabled", wrap="word", font=("Consolas", 10))
@@ -561,62 +689,74 @@ class CameraGUI:
         self.main_canvas.refresh_rotation_or_quality(force=True)
         self.compare_canvas.refresh_rotation_or_quality(force=True)
 
+    def _main_record(self, create=False):
+        path = self.image_records.latest()
+        if not path:
+            return None
+        return self.image_records.record(path) if create else self.image_records.peek(path)
+
+    def _compare_record(self, create=False):
+        path = self.compare_path
+        if not path:
+            return None
+        return self.image_records.record(path) if create else self.image_records.peek(path)
+
     def get_main_rotation(self):
-        path = self.jpeg_history[0] if self.jpeg_history else None
-        if path in self.main_rotation_map:
-            return self.main_rotation_map.get(path, 0)
+        rec = self._main_record()
+        if rec is not None and rec.main_rotation is not None:
+            return rec.main_rotation
         else:
             return self.default_main_rotation
 
     def get_compare_rotation(self):
-        path = self.compare_path
-        return self.compare_rotation_map.get(path, 0) if path else 0
+        rec = self._compare_record()
+        return (rec.compare_rotation or 0) if rec is not None else 0
 
     def set_main_rotation(self, deg):
         self.default_main_rotation = deg
-        path = self.jpeg_history[0] if self.jpeg_history else None
-        if path:
-            self.main_rotation_map[path] = deg
+        rec = self._main_record(create=True)
+        if rec is not None:
+            rec.main_rotation = deg
             self.main_canvas.refresh_rotation_or_quality(force=True)
 
     def set_compare_rotation(self, deg):
-        path = self.compare_path
-        if path:
-            self.compare_rotation_map[path] = deg
+        rec = self._compare_record(create=True)
+        if rec is not None:
+            rec.compare_rotation = deg
             self.compare_canvas.refresh_rotation_or_quality(force=True)
 
     def get_main_zoom(self):
-        path = self.jpeg_history[0] if self.jpeg_history else None
-        if path in self.main_zoom_map:
-            return self.main_zoom_map.get(path, 1.0)
+        rec = self._main_record()
+        if rec is not None and rec.main_zoom is not None:
+            return rec.main_zoom
         else:
             return self.default_main_zoom
 
     def get_compare_zoom(self):
-        path = self.compare_path
-        return self.compare_zoom_map.get(path, 1.0) if path else 1.0
+        rec = self._compare_record()
+        return (rec.compare_zoom or 1.0) if rec is not None else 1.0
 
     def _main_zoom(self, zoom_in=True):
-        path = self.jpeg_history[0] if self.jpeg_history else None
-        if not path: return
-        z = self.main_zoom_map.get(path, self.default_main_zoom)
+        rec = self._main_record(create=True)
+        if rec is None: return
+        z = rec.main_zoom if rec.main_zoom is not None else self.default_main_zoom
         if zoom_in:
             z = min(z * 1.25, 8.0)
         else:
             z = max(z / 1.25, 0.2)
-        self.main_zoom_map[path] = z
+        rec.main_zoom = z
         self.main_canvas.refresh_rotation_or_quality(force=True)
         self.default_main_zoom = z
 
     def _compare_zoom(self, zoom_in=True):
-        path = self.compare_path
-        if not path: return
-        z = self.compare_zoom_map.get(path, 1.0)
+        rec = self._compare_record(create=True)
+        if rec is None: return
+        z = rec.compare_zoom or 1.0
         if zoom_in:
             z = min(z * 1.25, 8.0)
         else:
             z = max(z / 1.25, 0.2)
-        self.compare_zoom_map[path] = z
+        rec.compare_zoom = z
         self.compare_canvas.refresh_rotation_or_quality(force=True)
 
     def _make_rotate_buttons(self, canvas, which="main"):
@@ -626,18 +766,16 @@ class CameraGUI:
                 deg = (self.get_main_rotation() - 90) % 360
                 self.set_main_rotation(deg)
             else:
-                path = self.compare_path
-                if path:
-                    deg = (self.compare_rotation_map.get(path, 0) - 90) % 360
+                if self.compare_path:
+                    deg = (self.get_compare_rotation() - 90) % 360
                     self.set_compare_rotation(deg)
         def rotate_right():
             if which == "main":
                 deg = (self.get_main_rotation() + 90) % 360
                 self.set_main_rotation(deg)
             else:
-                path = self.compare_path
-                if path:
-                    deg = (self.compare_rotation_map.get(path, 0) + 90) % 360
+                if self.compare_path:
+                    deg = (self.get_compare_rotation() + 90) % 360
                     self.set_compare_rotation(deg)
         def reset():
             if which == "main":
@@ -653,165 +791,158 @@ class CameraGUI:
         return frame
 
     def refresh_thumbnails(self):
+        if self.engine.hot_folder:
+            # 핫폴더 모드: 감시 스레드가 알고 있는 목록 그대로 (폴더를 다시 훑지 않음, 수정 시각 순)
+            files = [p for p, _ in self.engine.hot_folder.files() if os.path.splitext(p)[1].lower() in JPEG_EXTS]
+        else:
+            files = self._scan_thumbnails()
+        self.thumb_gallery.clear()
+        self.image_records.set_history(files)
+        for f in files[:MAX_THUMBNAILS]:
+            self.thumb_gallery.add_thumbnail(f, self._camera_caption(f))
+        if files:
+            self.main_canvas.set_image(files[0])
+
+    def _scan_thumbnails(self):
         save_dir = self.save_dir_var.get()
         base_filename = self.base_filename_var.get()
         files = []
         for ext in ("jpg", "jpeg", "png", "JPG", "JPEG", "PNG"):
             pattern = os.path.join(save_dir, f"{base_filename}*.{ext}")
             files.extend(glob.glob(pattern))
-        files = sorted(files, key=os.path.getmtime, reverse=True)
-        self.thumb_gallery.clear()
-        self.jpeg_history = []
-        for f in files:
-            self.thumb_gallery.add_thumbnail(f)
-            self.jpeg_history.append(f)
-        if self.jpeg_history:
-            self.main_canvas.set_image(self.jpeg_history[0])
+        # 이번 실행에서 받은 파일은 촬영 감지 시각, 그 외는 수정 시각 기준 (여러 카메라를 한 줄로 합침)
+        return sorted(files, key=lambda f: self.engine.captured_at(f) or os.path.getmtime(f), reverse=True)
+
+    def _camera_caption(self, image_path):
+        """여러 카메라 연결 시 썸네일에 표시할 카메라 ID"""
+        if len(self.engine.sessions) > 1:
+            return self.engine.camera_id_for(image_path)
+        return None
+
+    def _flush_saved(self):
+        with self._saved_lock:
+            paths, self._saved_paths = self._saved_paths, []
+            self._saved_flush_scheduled = False
+        if paths:
+            self.show_new_photos(paths)
 
     def show_jpeg_preview(self, image_path):
-        self.refresh_thumbnails()
-        # 중복 방지(새 파일만 추가)
-        if image_path not in self.jpeg_history:
-            self.jpeg_history.insert(0, image_path)
-            self.thumb_gallery.add_thumbnail(image_path)
-        if len(self.jpeg_history) > 1 and self.compare_path is None:
-            self.compare_path = self.jpeg_history[1]
+        self.show_new_photos([image_path])
+
+    def show_new_photos(self, paths):
+        """새로 저장된 사진들 (저장 순): 썸네일은 새 것만 앞에 붙이고, 미리보기는 마지막 사진만 디코딩"""
+        for path in paths:
+            # 중복 방지(새 파일만 추가)
+            if self.image_records.push_history(path):
+                self.thumb_gallery.add_thumbnail(path, self._camera_caption(path), front=True)
+        self.thumb_gallery.trim(MAX_THUMBNAILS)
+        if self.image_records.history_len() > 1 and self.compare_path is None:
+            self.compare_path = self.image_records.latest(1)
             self.compare_canvas.set_image(self.compare_path)
-        path = image_path
-        if path not in self.main_rotation_map:
-            self.main_rotation_map[path] = self.default_main_rotation
-        if path not in self.main_zoom_map:
-            self.main_zoom_map[path] = self.default_main_zoom
+        image_path = paths[-1]
+        rec = self.image_records.record(image_path)
+        if rec.main_rotation is None:
+            rec.main_rotation = self.default_main_rotation
+        if rec.main_zoom is None:
+            rec.main_zoom = self.default_main_zoom
         self.main_canvas.set_image(image_path)
         self.main_canvas.refresh_rotation_or_quality(force=True)
-        if self.pose_estimation_enabled.get() and not self.pose_estimation_in_progress:
-            import threading
-            self.pose_estimation_thread = threading.Thread(
-                target=self._estimate_pose,
-                args=(image_path,),
-                daemon=True
-            )
-            self.pose_estimation_thread.start()
+        for path in paths:
+            self.latency_tracer.finish(path, STAGE_TO_PREVIEW)
 
     def set_compare_image(self, image_path):
         self.compare_path = image_path
         self.compare_canvas.set_image(image_path)
-        if image_path not in self.compare_rotation_map:
-            self.compare_rotation_map[image_path] = 0
-        if image_path not in self.compare_zoom_map:
-            self.compare_zoom_map[image_path] = 1.0
+        rec = self.image_records.record(image_path)
+        if rec.compare_rotation is None:
+            rec.compare_rotation = 0
+        if rec.compare_zoom is None:
+            rec.compare_zoom = 1.0
         self.compare_canvas.refresh_rotation_or_quality(force=True)
 
     def on_thumbnail_click(self, image_path):
         self.set_compare_image(image_path)
 
+    def on_thumbnail_select(self, image_path):
+        """A컷 지정: 해당 파일을 가장 먼저 업로드"""
+        self.s3_manager.promote(image_path)
+        self.log(f"A컷 지정 (우선 업로드): {os.path.basename(image_path)}")
+
     def connect_camera(self):
+        """카메라 검색/연결은 엔진 스레드에서 (검색 재시도 동안 화면이 멈추지 않게)"""
         self.camera_status.config(text="카메라 검색 중...")
-        self.root.update()
-        camera_list = []
-        for _ in range(3):
-            camera_list = list_cameras()
-            if camera_list: break
-            time.sleep(1)
-        if not camera_list:
-            self.camera_status.config(text="카메라가 연색결되어 있지 않습니다.")
-            self.camera = None
-            return
-        try:
-            self.event_stop.set()
-            if self.event_thread and self.event_thread.is_alive():
-                self.event_thread.join(timeout=2)
-            if self.camera:
-                with self.camera_lock:
-                    self.camera.exit()
-            self.camera = gp.Camera()
-            with self.camera_lock:
-                self.camera.init()
-            self.camera_status.config(text=f"연결됨: {camera_list[0][0]}")
+        self.reload_btn.config(state="disabled")
+        self.engine.connect_camera_async(lambda ok: self.root.after(0, self._on_camera_connected, ok))
+
+    def _on_camera_connected(self, ok):
+        self.reload_btn.config(state="normal")
+        if ok:
             self.load_settings()
-            self.event_stop.clear()
-            self.event_thread = threading.Thread(
-                target=event_listener,
-                args=(
-                    self.camera,
-                    lambda: self.save_dir_var.get(),
-                    lambda: self.base_filename_var.get(),
-                    lambda: self.save_format_var.get(),
-                    self.notify_saved_from_thread,
-                    self.log_from_thread,
-                    self.camera_lock,
-                    self.event_stop,
-                ),
-                daemon=True
-            )
-            self.event_thread.start()
-            self.log("카메라 연결 및 이벤트 감시 시작.")
-        except Exception as e:
-            self.camera_status.config(text=f"카메라 연결 실패: {e}")
-            self.log(f"카메라 연결 실패: {e}")
-            self.camera = None
-
-    def notify_saved_from_thread(self, path):
-        self.log_from_thread(f"자동 저장: {path}")
-        ext = os.path.splitext(path)[1].lower()
-        # S3 업로드
-        if ext in (".jpg", ".jpeg") and self.s3_manager.settings.get('upload_enabled', True):
-            self.s3_manager.manual_upload(path)
-        if ext in (".jpg", ".jpeg"):
-            self.root.after(0, self.show_jpeg_preview, path)
-
-    def log(self, msg):
-        timestamp = time.strftime("[%H:%M:%S] ")
-        self.log_text.config(state="normal")
-        self.log_text.insert("end", f"{timestamp}{msg}\n")
-        self.log_text.see("end")
-        self.log_text.config(state="disabled")
-
-    def log_from_thread(self, msg):
-        self.root.after(0, self.log, msg)
+
+    def log(self, msg, level=logging.INFO):
+        # 큐에 넣기만 함 (위젯은 _flush_log 에서), 어느 스레드에서 불러도 됨
+        self.logger.log(level, msg)
+
+    log_from_thread = log
+
+    def _flush_log(self):
+        """쌓인 로그 줄을 한 번에 넣고 오래된 줄은 잘라서 위젯 크기를 일정하게 유지"""
+        lines = self.event_log.drain(MAX_FLUSH_LINES)
+        if lines:
+            text = self.log_text
+            text.config(state="normal")
+            text.insert("end", "\n".join(lines) + "\n")
+            excess = int(text.index("end-1c").split(".")[0]) - 1 - WIDGET_MAX_LINES
+            if excess > 0:
+                text.delete("1.0", f"{excess + 1}.0")
+            text.see("end")
+            text.config(state="disabled")
+        self.root.after(FLUSH_INTERVAL_MS, self._flush_log)
 
     def load_settings(self):
-        if not self.camera:
-            self.iso_var.set("N/A")
-            self.ss_var.set("N/A")
-            self.ap_var.set("N/A")
-            self.wb_var.set("N/A")
-            self.kelvin_var.set("N/A")
+        """카메라 설정 읽기는 다른 스레드에서 (다운로드 중 카메라 락을 기다리는 동안 화면이 멈추지 않게)"""
+        if self._settings_loading:
+            return
+        self._settings_loading = True
+
+        def run():
+            try:
+                values = self.engine.read_camera_settings()
+            except Exception:
+                values = None
+            self.root.after(0, self._apply_settings, values)
+        threading.Thread(target=run, name="camera-settings", daemon=True).start()
+
+    def _apply_settings(self, values):
+        self._settings_loading = False
+        if values is None:
             return
-        with self.camera_lock:
-            iso = get_camera_setting(self.camera, "iso") or "N/A"
-            ss = get_camera_setting(self.camera, "shutterspeed") or "N/A"
-            ap = get_camera_setting(self.camera, "aperture")
-            if ap is None:
-                ap = get_camera_setting(self.camera, "f-number")
-            ap = ap or "N/A"
-            wb = get_camera_setting(self.camera, "whitebalance")
-            if wb is None:
-                wb = get_camera_setting(self.camera, "white balance")
-            wb = wb or "N/A"
-            kelvin = "N/A"
-            kelvin_keys = ["colortemperature", "color temperature", "kelvin", "whitebalancekelvin", "whitebalance_kelvin"]
-            for key in kelvin_keys:
-                v = get_camera_setting(self.camera, key)
-                if v is not None:
-                    kelvin = str(v)
-                    break
-        self.iso_var.set(iso)
-        self.ss_var.set(ss)
-        self.ap_var.set(ap)
-        self.wb_var.set(wb)
-        self.kelvin_var.set(kelvin)
+        self.iso_var.set(values["iso"])
+        self.ss_var.set(values["shutterspeed"])
+        self.ap_var.set(values["aperture"])
+        self.wb_var.set(values["whitebalance"])
+        self.kelvin_var.set(values["kelvin"])
 
     def poll_camera_settings(self):
         self.load_settings()
         self.root.after(1000, self.poll_camera_settings)
 
+    def poll_upload_status(self):
+        """업로드 대기 수 / 속도 / 남은 시간 표시"""
+        stats = self.s3_manager.get_upload_stats()
+        text = (f"업로드: 대기 {stats['pending']}개 | "
+                f"{stats['bytes_per_sec'] / (1024 * 1024):.2f}MB/s | "
+                f"남은 시간 {format_eta(stats['eta_sec'])}")
+        if stats["failed"]:
+            text += f" | 실패 {stats['failed']}개"
+        self.upload_status_var.set(text)
+        self.root.after(1000, self.poll_upload_status)
+
     def set_iso(self):
         if not self.camera: return
         iso = simpledialog.askstring("ISO 설정", f"ISO 값을 직접 입력하세요 (현재: {self.iso_var.get()})", parent=self.root)
         if not iso: return
-        with self.camera_lock:
-            ok, msg = set_camera_config_with_choices(self.camera, "iso", iso)
+        ok, msg = self.engine.set_camera_config("iso", iso)
         messagebox.showinfo("ISO 설정", msg)
         self.load_settings()
 
@@ -819,8 +950,7 @@ class CameraGUI:
         if not self.camera: return
         ss = simpledialog.askstring("셔터속도 설정", f"셔터속도 값을 직접 입력하세요 (현재: {self.ss_var.get()})", parent=self.root)
         if not ss: return
-        with self.camera_lock:
-            ok, msg = set_camera_config_with_choices(self.camera, "shutterspeed", ss)
+        ok, msg = self.engine.set_camera_config("shutterspeed", ss)
         messagebox.showinfo("셔터속도 설정", msg)
         self.load_settings()
 
@@ -828,8 +958,7 @@ class CameraGUI:
         if not self.camera: return
         ap = simpledialog.askstring("조리개 설정", f"조리개 값을 직접 입력하세요 (현재: {self.ap_var.get()})", parent=self.root)
         if not ap: return
-        with self.camera_lock:
-            ok, msg = set_aperture(self.camera, ap)
+        ok, msg = self.engine.set_camera_config("aperture", ap)
         messagebox.showinfo("조리개 설정", msg)
         self.load_settings()
 
@@ -839,96 +968,73 @@ class CameraGUI:
             self.save_dir_var.set(d)
 
     def capture(self):
-        """촬영 함수"""
+        """촬영 요청만 넣고 바로 돌아옴 (결과는 _on_capture_done 에서 로그로 표시)"""
         if not self.camera:
-            messagebox.showerror("오류", "카메라가 연결되어 있지 않습니다!")
+            self.log("촬영 실패: 카메라가 연결되어 있지 않습니다!")
+            return
+        if self.engine.capture_async(on_done=self._capture_callback) is None:
+            self.log("촬영 요청이 너무 많이 밀려 있어 무시했습니다.")
+        self._update_capture_status()
+
+    def _capture_callback(self, result):
+        # 엔진 스레드에서 호출됨
+        self.root.after(0, self._on_capture_done, result)
+
+    def _on_capture_done(self, result):
+        if result["error"]:
+            self.log(f"촬영 실패: {result['error']}")
+        elif not result["saved"]:
+            self.log("촬영 실패: 저장된 파일이 없습니다. (카메라의 저장 포맷, 확장자, 동시 저장 설정을 확인하세요.)")
+        else:
+            self.log(f"촬영 저장 완료 ({result['elapsed_sec']:.1f}초): " + ", ".join(os.path.basename(p) for p in result["saved"]))
+        self._update_capture_status()
+
+    def _update_capture_status(self):
+        pending = self.engine.captures_pending()
+        text = f"촬영 대기 {pending}개" if pending else ""
+        sequence = self.engine.interval_capture
+        if sequence:
+            status = sequence.status()
+            text = f"인터벌 {status['triggered']}/{status['count'] or '∞'}장 (건너뜀 {status['skipped']}) " + text
+            if not status["running"]:
+                self.engine.stop_interval()
+                self.interval_btn.config(text="인터벌 촬영 시작")
+        else:
+            # 장 수를 채워 엔진이 스스로 내린 경우
+            self.interval_btn.config(text="인터벌 촬영 시작")
+        self.capture_status_var.set(text)
+
+    def _toggle_interval(self):
+        if self.engine.interval_capture:
+            self.engine.stop_interval()
+            self.interval_btn.config(text="인터벌 촬영 시작")
+            self._update_capture_status()
+            return
+        if not self.camera:
+            self.log("인터벌 촬영 실패: 카메라가 연결되어 있지 않습니다!")
             return
-
-        save_dir = self.save_dir_var.get()
-        base_filename = self.base_filename_var.get()
-        save_format = self.save_format_var.get()
-
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir, exist_ok=True)
-
         try:
-            self.log("PC에서 촬영 명령 실행")
-            with self.camera_lock:
-                file_path = self.camera.capture(gp.GP_CAPTURE_IMAGE)
-                folder = file_path.folder
-                name = file_path.name
-                base_name, ext = os.path.splitext(name)
-                files = self.camera.folder_list_files(folder)[0]
-
-                raw_exts = [".arw", ".raw", ".nef", ".cr2", ".cr3", ".orf", ".rw2", ".dng"]
-                jpeg_exts = [".jpg", ".jpeg"]
-
-                if save_format == "raw":
-                    exts = raw_exts
-                elif save_format == "jpeg":
-                    exts = jpeg_exts
-                else:
-                    exts = raw_exts + jpeg_exts
-
-                saved = []
-                jpeg_saved = None
-
-                for file in files:
-                    if file is None or not file.startswith(base_name):
-                        continue
-
-                    fext = os.path.splitext(file)[1].lower()
-                    if fext in exts:
-                        outname = get_unique_filename(save_dir, base_filename, fext)
-                        camera_file = gp.CameraFile()
-                        self.camera.file_get(folder, file, gp.GP_FILE_TYPE_NORMAL, camera_file)
-                        target = os.path.join(save_dir, outname)
-                        camera_file.save(target)
-                        saved.append(target)
-                        self.log(f"PC촬영 저장: {target}")
-
-                        # # JPEG 파일인 경우 S3 업로드 큐에 추가
-                        # if fext in jpeg_exts and self.s3_upload_var.get():
-                        #     self.s3_manager.queue_upload(target)
-                        #     jpeg_saved = target
-
-                if jpeg_saved:
-                    self.show_jpeg_preview(jpeg_saved)
-
-                if not saved:
-                    messagebox.showerror("촬영 실패", "저장된 파일이 없습니다. (카메라의 저장 포맷, 확장자, 동시 저장 설정을 확인하세요.)")
-                else:
-                    messagebox.showinfo("촬영 결과", f"저장 완료:\n" + "\n".join(saved))
-
-            time.sleep(1.0)
-
-        except gp.GPhoto2Error as e:
-            self.log(f"PC촬영 오류: {e}")
-            if e.code in (-53, -110):
-                try:
-                    with self.camera_lock:
-                        self.camera.exit()
-                    time.sleep(1)
-                    with self.camera_lock:
-                        self.camera.init()
-                    time.sleep(1)
-                except Exception as e2:
-                    self.camera_status.config(text=f"카메라 재초기화 실패: {e2}")
-                    self.log(f"카메라 재초기화 실패: {e2}")
-            messagebox.showerror("촬영 실패", str(e))
-        except Exception as e:
-            messagebox.showerror("촬영 실패", str(e))
-            self.log(f"PC촬영 오류: {e}")
-        self.load_settings()
+            interval = float(self.interval_var.get())
+            count = int(self.interval_count_var.get() or 0)
+        except ValueError:
+            self.log("인터벌 촬영: 간격과 장 수는 숫자로 입력하세요.")
+            return
+        self.engine.start_interval(interval, count or None, on_done=self._capture_callback)
+        self.interval_btn.config(text="인터벌 촬영 정지")
+        self._poll_interval_status()
+
+    def _poll_interval_status(self):
+        self._update_capture_status()
+        if self.engine.interval_capture:
+            self.root.after(500, self._poll_interval_status)
 
     def on_close(self):
         """프로그램 종료 시 호출"""
-        self.event_stop.set()
-        if self.event_thread and self.event_thread.is_alive():
-            self.event_thread.join(timeout=2)
-        # S3 업로드 워커 정지
-        if self.s3_manager:
-            self.s3_manager.stop_upload_worker()
+        if self.live_decoder:
+            self.live_decoder.stop()
+            self.live_decoder = None
+        self.engine.shutdown()
+        self.event_log.stop()
         self.root.destroy()
 
 if __name__ == "__main__":
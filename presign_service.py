@@ -0,0 +1,360 @@
+"""Presigned URL 발급 규약 (요청 파싱/검증, 키 결정) 과 SigV4 서명
+
+PresignService 가 배치/variant/멀티파트 요청 규약을 한 곳에서 처리하고, 서명(presigner)과
+멀티파트 API(s3_api)만 바꿔 끼운다.
+    Lambda (lambda_gen_pre_url)   : Boto3Presigner 또는 PRESIGN_MODE=service 면 SigV4Presigner, s3_api = boto3
+    local_s3_server               : 내장 sink 용 서명, 메모리 멀티파트
+
+SigV4Presigner 는 boto3 의 generate_presigned_url 대신 SigV4 쿼리 서명을 표준 라이브러리로 직접 계산한다.
+서명은 네트워크 호출이 없는 순수 연산이라 자격 증명만 주면 오프라인에서도 동작/검증 가능하다.
+
+빠른 경로:
+    - 서명 키(날짜/리전/서비스로 4번 HMAC)는 날짜가 바뀔 때만 다시 계산
+    - 배치 요청의 URL 들은 같은 X-Amz-Date(서명 시각)를 공유
+    - Content-Type 추정은 확장자별로 캐시
+
+키 파티셔닝(KEY_PARTITION=date): <세션>/<YYYY-MM-DD>/<variant prefix><파일명>
+    S3 는 prefix 마다 초당 요청 한도가 있어 모든 스튜디오가 같은 prefix(derivatives/web/ 등)에 쓰면
+    한도에 걸린다. 세션을 맨 앞에 두면 세션마다 prefix 가 나뉘고, 날짜로 한 번 더 나뉜다.
+
+Lambda 에는 lambda_gen_pre_url.py 와 이 파일을 함께 배포한다.
+"""
+import datetime
+import hashlib
+import hmac
+import json
+import mimetypes
+import os
+import re
+import time
+from urllib.parse import quote
+
+EXPIRES_IN = 3600
+MAX_EXPIRES_IN = 7 * 24 * 3600  # SigV4 presigned URL 최대 유효기간
+MAX_BATCH_SIZE = 100
+MAX_PARTS = 10000
+
+VARIANT_PREFIXES = {
+    "web": "derivatives/web/",
+    "thumb": "derivatives/thumb/",
+}
+
+PARTITION_NONE = "none"
+PARTITION_DATE = "date"
+UNSORTED_SESSION = "unsorted"  # 세션 폴더 없이 파일명만 온 경우
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+_content_types = {}
+
+
+def guess_content_type(filename):
+    # 클라이언트(aws_manager.guess_content_type)와 같은 규칙, 확장자별 캐시
+    ext = os.path.splitext(filename)[1].lower()
+    ctype = _content_types.get(ext)
+    if ctype is None:
+        ctype = _content_types[ext] = mimetypes.guess_type("x" + ext)[0] or "application/octet-stream"
+    return ctype
+
+
+def uri_encode(value, safe="-_.~"):
+    """SigV4 규칙의 URI 인코딩 (비예약 문자만 그대로)"""
+    return quote(value, safe=safe)
+
+
+def partitioned_key(filename, variant=None, day=None):
+    """<세션>/<YYYY-MM-DD>/<variant prefix><파일명> (filename 은 클라이언트 키 <세션>/<파일명>)"""
+    session, _, name = filename.rpartition("/")
+    day = day or datetime.datetime.now(datetime.timezone.utc).date()
+    return f"{session or UNSORTED_SESSION}/{day.isoformat()}/{VARIANT_PREFIXES.get(variant, '')}{name}"
+
+
+class SigV4Presigner:
+    """S3 SigV4 쿼리 서명 (presigned URL) 생성기
+
+    host 를 생략하면 가상 호스트 방식 <bucket>.s3.<region>.amazonaws.com 을 쓴다.
+    """
+
+    def __init__(self, access_key, secret_key, region, session_token=None, host=None, bucket=None):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.session_token = session_token
+        self.bucket = bucket
+        self.host = host or (f"{bucket}.s3.{region}.amazonaws.com" if bucket else None)
+        self._key_date = None
+        self._key_hmac = None
+
+    def _signer(self, date_stamp):
+        """날짜별 서명 키로 초기화된 HMAC (copy 해서 사용)"""
+        if self._key_date != date_stamp:
+            k = ("AWS4" + self.secret_key).encode("utf-8")
+            for part in (date_stamp, self.region, "s3", "aws4_request"):
+                k = hmac.new(k, part.encode("utf-8"), hashlib.sha256).digest()
+            self._key_hmac = hmac.new(k, digestmod=hashlib.sha256)
+            self._key_date = date_stamp
+        return self._key_hmac
+
+    def presign(self, method, key, expires_in=EXPIRES_IN, params=None, content_type=None, now=None):
+        """presigned URL 하나 생성
+
+        params: 추가 쿼리 파라미터 (uploadId, partNumber 등)
+        content_type: 지정하면 content-type 헤더도 서명 (업로드 시 같은 값을 보내야 함)
+        now: 서명 시각 (epoch 초), 배치에서는 같은 값을 넘겨 재사용
+        """
+        if not 1 <= expires_in <= MAX_EXPIRES_IN:
+            raise ValueError(f"expires_in must be 1..{MAX_EXPIRES_IN}")
+        t = time.gmtime(time.time() if now is None else now)
+        amz_date = time.strftime("%Y%m%dT%H%M%SZ", t)
+        date_stamp = amz_date[:8]
+        scope = f"{date_stamp}/{self.region}/s3/aws4_request"
+
+        if content_type:
+            signed_headers = "content-type;host"
+            canonical_headers = f"content-type:{content_type}\nhost:{self.host}\n"
+        else:
+            signed_headers = "host"
+            canonical_headers = f"host:{self.host}\n"
+
+        query = {
+            "X-Amz-Algorithm": ALGORITHM,
+            "X-Amz-Credential": f"{self.access_key}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires_in),
+            "X-Amz-SignedHeaders": signed_headers,
+        }
+        if self.session_token:
+            query["X-Amz-Security-Token"] = self.session_token
+        if params:
+            query.update({k: str(v) for k, v in params.items()})
+        canonical_query = "&".join(
+            f"{uri_encode(k)}={uri_encode(v)}" for k, v in sorted(query.items())
+        )
+
+        canonical_uri = "/" + uri_encode(key, safe="-_.~/")
+        canonical_request = "\n".join((
+            method, canonical_uri, canonical_query, canonical_headers, signed_headers, UNSIGNED_PAYLOAD
+        ))
+        string_to_sign = "\n".join((
+            ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
+        ))
+        h = self._signer(date_stamp).copy()
+        h.update(string_to_sign.encode("utf-8"))
+        return f"https://{self.host}{canonical_uri}?{canonical_query}&X-Amz-Signature={h.hexdigest()}"
+
+    def presign_put(self, key, expires_in=EXPIRES_IN, now=None):
+        # boto3 generate_presigned_url(put_object, ContentType=...) 과 같이 content-type 을 서명
+        return self.presign("PUT", key, expires_in, content_type=guess_content_type(key), now=now)
+
+    def presign_upload_part(self, key, upload_id, part_number, expires_in=EXPIRES_IN, now=None):
+        return self.presign(
+            "PUT", key, expires_in, params={"partNumber": part_number, "uploadId": upload_id}, now=now
+        )
+
+
+class Boto3Presigner:
+    """boto3 generate_presigned_url 로 서명 (Lambda 기본 모드, SigV4Presigner 와 같은 메서드)"""
+
+    def __init__(self, s3_client, bucket):
+        self.s3_client = s3_client
+        self.bucket = bucket
+
+    def presign_put(self, key, expires_in=EXPIRES_IN, now=None):
+        return self.s3_client.generate_presigned_url(
+            ClientMethod="put_object",
+            Params={"Bucket": self.bucket, "Key": key, "ContentType": guess_content_type(key)},
+            ExpiresIn=expires_in,
+        )
+
+    def presign_upload_part(self, key, upload_id, part_number, expires_in=EXPIRES_IN, now=None):
+        return self.s3_client.generate_presigned_url(
+            ClientMethod="upload_part",
+            Params={"Bucket": self.bucket, "Key": key, "UploadId": upload_id, "PartNumber": part_number},
+            ExpiresIn=expires_in,
+        )
+
+
+class MultipartError(Exception):
+    """s3_api 가 멀티파트 요청을 거부함 (status 와 error 를 그대로 응답)"""
+
+    def __init__(self, status, error):
+        super().__init__(error)
+        self.status = status
+        self.error = error
+
+
+class PresignService:
+    """Presigned URL 발급 요청/응답 규약 (Lambda 와 local_s3_server 가 공유)
+
+    presigner: presign_put / presign_upload_part 를 가진 서명기 (SigV4Presigner, Boto3Presigner 등)
+    s3_api: 멀티파트 생성/완료/취소에 쓸 boto3 S3 클라이언트 또는 같은 메서드를 가진 객체
+            (생략 시 처음 필요할 때 boto3 로 생성)
+    """
+
+    def __init__(self, presigner, bucket, partition=PARTITION_NONE, expires_in=EXPIRES_IN, s3_api=None):
+        if partition not in (PARTITION_NONE, PARTITION_DATE):
+            raise ValueError(f"unknown partition: {partition}")
+        self.presigner = presigner
+        self.bucket = bucket
+        self.partition = partition
+        self.expires_in = expires_in
+        self._s3_api = s3_api
+
+    @classmethod
+    def from_env(cls, s3_api=None, presigner=None):
+        """Lambda 환경변수로 생성 (presigner 생략 시 Lambda 실행 역할의 임시 자격 증명으로 SigV4 서명)"""
+        bucket = os.environ["S3_BUCKET"]
+        if presigner is None:
+            region = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION", "us-east-1")
+            presigner = SigV4Presigner(
+                os.environ["AWS_ACCESS_KEY_ID"],
+                os.environ["AWS_SECRET_ACCESS_KEY"],
+                region,
+                session_token=os.environ.get("AWS_SESSION_TOKEN"),
+                bucket=bucket,
+            )
+        return cls(
+            presigner, bucket,
+            partition=os.environ.get("KEY_PARTITION", PARTITION_NONE),
+            expires_in=int(os.environ.get("PRESIGN_EXPIRES_IN", EXPIRES_IN)),
+            s3_api=s3_api,
+        )
+
+    @property
+    def s3_api(self):
+        if self._s3_api is None:
+            import boto3  # 멀티파트 생성/완료/취소만 S3 API 호출이 필요
+            self._s3_api = boto3.client("s3")
+        return self._s3_api
+
+    # ---------- 키 ----------
+    def object_key(self, filename, variant=None):
+        if self.partition == PARTITION_DATE:
+            return partitioned_key(filename, variant)
+        return VARIANT_PREFIXES.get(variant, "") + filename
+
+    def _multipart_key(self, body_json, filename):
+        """멀티파트 후속 요청의 키: create 때 돌려준 object_key (자정을 넘겨도 같은 키 유지)"""
+        key = body_json.get("object_key")
+        if self.partition != PARTITION_DATE or not key:
+            return self.object_key(filename)
+        # filename 의 파티션 키가 맞는지 확인 (임의 키에 쓰지 못하게)
+        session = filename.rpartition("/")[0] or UNSORTED_SESSION
+        day = key[len(session) + 1:len(session) + 11]
+        if not _DATE_RE.match(day):
+            raise ValueError("invalid object_key")
+        try:
+            expected = partitioned_key(filename, None, datetime.date.fromisoformat(day))
+        except ValueError:
+            raise ValueError("invalid object_key")
+        if key != expected:
+            raise ValueError("invalid object_key")
+        return key
+
+    # ---------- 요청 처리 ----------
+    def handle(self, body_json):
+        """요청 dict 처리, (status, 응답 dict) 반환"""
+        action = body_json.get("action")
+        if action:
+            return self._handle_multipart(action, body_json)
+
+        variant = body_json.get("variant")
+        if variant is not None and variant not in VARIANT_PREFIXES:
+            return 400, {"error": f"unknown variant: {variant}"}
+
+        filenames = body_json.get("filenames")
+        if filenames is not None:
+            if not isinstance(filenames, list) or not all(isinstance(n, str) and n for n in filenames):
+                return 400, {"error": "filenames must be a list of names"}
+            if len(filenames) > MAX_BATCH_SIZE:
+                return 400, {"error": f"too many filenames (max {MAX_BATCH_SIZE})"}
+            now = time.time()
+            object_keys = {name: self.object_key(name, variant) for name in dict.fromkeys(filenames)}
+            return 200, {
+                "presigned_urls": {
+                    name: self.presigner.presign_put(key, self.expires_in, now) for name, key in object_keys.items()
+                },
+                "object_keys": object_keys,
+                "expires_in": self.expires_in,
+            }
+
+        filename = body_json.get("filename")
+        if not filename:
+            return 400, {"error": "filename required"}
+        key = self.object_key(filename, variant)
+        return 200, {
+            "presigned_url": self.presigner.presign_put(key, self.expires_in),
+            "object_key": key,
+            "expires_in": self.expires_in,
+        }
+
+    def _part_urls(self, key, upload_id, part_numbers):
+        now = time.time()
+        return {
+            str(n): self.presigner.presign_upload_part(key, upload_id, n, self.expires_in, now)
+            for n in part_numbers
+        }
+
+    def _handle_multipart(self, action, body_json):
+        try:
+            return self._multipart(action, body_json)
+        except MultipartError as e:
+            return e.status, {"error": e.error}
+
+    def _multipart(self, action, body_json):
+        filename = body_json.get("filename")
+        if not filename:
+            return 400, {"error": "filename required"}
+
+        if action == "create_multipart":
+            parts = body_json.get("parts")
+            if not isinstance(parts, int) or not 1 <= parts <= MAX_PARTS:
+                return 400, {"error": f"parts must be 1..{MAX_PARTS}"}
+            key = self.object_key(filename)
+            created = self.s3_api.create_multipart_upload(
+                Bucket=self.bucket, Key=key, ContentType=guess_content_type(key)
+            )
+            upload_id = created["UploadId"]
+            return 200, {
+                "upload_id": upload_id,
+                "object_key": key,
+                "part_urls": self._part_urls(key, upload_id, range(1, parts + 1)),
+                "expires_in": self.expires_in,
+            }
+
+        upload_id = body_json.get("upload_id")
+        if not upload_id:
+            return 400, {"error": "upload_id required"}
+        try:
+            key = self._multipart_key(body_json, filename)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        if action == "part_urls":
+            part_numbers = body_json.get("part_numbers") or []
+            if not all(isinstance(n, int) and 1 <= n <= MAX_PARTS for n in part_numbers):
+                return 400, {"error": "invalid part_numbers"}
+            return 200, {"part_urls": self._part_urls(key, upload_id, part_numbers), "expires_in": self.expires_in}
+
+        if action == "complete_multipart":
+            parts = body_json.get("parts") or []
+            self.s3_api.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id,
+                MultipartUpload={"Parts": [{"PartNumber": p["part_number"], "ETag": p["etag"]} for p in parts]}
+            )
+            return 200, {"completed": True}
+
+        if action == "abort_multipart":
+            self.s3_api.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            return 200, {"aborted": True}
+
+        return 400, {"error": f"unknown action: {action}"}
+
+    def handle_event(self, event):
+        """Lambda 이벤트 처리 (API Gateway 프록시 응답 형식)"""
+        body = event.get("body")
+        body_json = json.loads(body) if body else {}
+        status, data = self.handle(body_json)
+        return {"statusCode": status, "body": json.dumps(data)}
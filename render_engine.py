@@ -0,0 +1,141 @@
+"""미리보기 렌더링 (GPU 없이 빠르게)
+
+    줄이기  : 정수배로 크게 줄일 부분은 Image.reduce (박스 평균, 가장 빠름), 남은 배율만 BILINEAR
+    회전    : 90도 단위는 transpose (보간 없이 픽셀 재배치, 무손실), 화면 크기로 줄인 뒤에 적용
+    색 관리 : 사진에 들어 있는 ICC 프로파일 -> sRGB 변환, 프로파일별 변환 객체를 캐시
+
+ImageCms(littlecms) 가 없는 Pillow 빌드에서는 색 변환만 건너뛴다.
+"""
+import io
+import threading
+from PIL import Image
+
+try:
+    from PIL import ImageCms
+except ImportError:
+    ImageCms = None
+
+REDUCING_GAP = 2.0  # reduce 후 남기는 여유 배율 (목표 크기의 2배 이상에서 BILINEAR 마무리 → 계단 현상 없음)
+
+# 시계 방향 회전 각도 -> transpose (rotate(-deg, expand=True) 와 같은 결과)
+TRANSPOSE_FOR_ROTATION = {
+    90: Image.Transpose.ROTATE_270,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_90,
+}
+
+
+def reduce_factor(src_size, size, gap=REDUCING_GAP):
+    """src_size 를 size 로 줄일 때 먼저 적용할 정수 reduce 배율 (1 이면 reduce 안 함)"""
+    ratio = min(src_size[0] / size[0], src_size[1] / size[1])
+    exact = src_size[0] % size[0] == 0 and src_size[1] % size[1] == 0 and \
+        src_size[0] // size[0] == src_size[1] // size[1]
+    if exact:
+        return int(ratio)  # 정확히 정수배면 reduce 만으로 끝
+    return max(1, int(ratio / gap))
+
+
+def fit_size(src_size, box, rotation=0, scale=1.0):
+    """회전/배율 적용 후 box 안에 들어가는 크기 (회전 전 기준으로 반환, 확대는 하지 않음)"""
+    w, h = src_size
+    if rotation % 180:
+        w, h = h, w
+    w, h = max(1, int(w * scale)), max(1, int(h * scale))
+    fit = min(1.0, box[0] / w, box[1] / h)
+    w, h = max(1, round(w * fit)), max(1, round(h * fit))
+    return (h, w) if rotation % 180 else (w, h)
+
+
+class PreviewRenderer:
+    """원본 PIL 이미지 -> 화면 크기 미리보기 (원본은 읽기만 하고 바꾸지 않음)
+
+    color_manage: 사진의 ICC 프로파일을 sRGB 로 변환 (sRGB 프로파일이면 skip_srgb 로 건너뜀)
+    """
+
+    def __init__(self, color_manage=True, skip_srgb=True, reducing_gap=REDUCING_GAP):
+        self.color_manage = color_manage and ImageCms is not None
+        self.skip_srgb = skip_srgb
+        self.reducing_gap = reducing_gap
+        self._transforms = {}  # (프로파일 바이트, 모드) -> ImageCms 변환 (None: 변환 불필요/불가)
+        self._lock = threading.Lock()
+        self._srgb = ImageCms.createProfile("sRGB") if self.color_manage else None
+        self.transform_builds = 0
+
+    # ---------- 크기/회전 ----------
+    def resize(self, src, size):
+        if size == src.size:
+            return src
+        factor = reduce_factor(src.size, size, self.reducing_gap)
+        img = src
+        if factor > 1:
+            img = img.reduce(factor)
+        if img.size != size:
+            img = img.resize(size, resample=Image.BILINEAR)
+        return img
+
+    @staticmethod
+    def rotate(img, rotation):
+        method = TRANSPOSE_FOR_ROTATION.get(rotation % 360)
+        if method is None:
+            # 90도 단위가 아니면 보간 회전
+            return img.rotate(-rotation, expand=True, resample=Image.BILINEAR) if rotation % 360 else img
+        return img.transpose(method)
+
+    # ---------- 색 관리 ----------
+    def _transform_for(self, icc, mode):
+        key = (icc, mode)
+        transform = self._transforms.get(key, False)
+        if transform is not False:
+            return transform
+        with self._lock:
+            if key in self._transforms:
+                return self._transforms[key]
+            transform = None
+            try:
+                profile = ImageCms.ImageCmsProfile(io.BytesIO(icc))
+                is_srgb = "srgb" in (ImageCms.getProfileDescription(profile) or "").lower()
+                if not (self.skip_srgb and is_srgb):
+                    transform = ImageCms.buildTransform(profile, self._srgb, mode, "RGB")
+                    self.transform_builds += 1
+            except (ImageCms.PyCMSError, OSError, ValueError):
+                transform = None  # 깨진/지원 안 되는 프로파일은 그대로 표시
+            self._transforms[key] = transform
+            return transform
+
+    def to_srgb(self, img, icc, in_place=False):
+        """icc 프로파일 기준 픽셀을 sRGB 로 (변환할 필요 없으면 그대로)"""
+        if not (self.color_manage and icc) or img.mode not in ("RGB", "CMYK"):
+            return img
+        transform = self._transform_for(icc, img.mode)
+        if transform is None:
+            return img
+        if in_place and img.mode == "RGB":
+            ImageCms.applyTransform(img, transform, inPlace=True)
+            return img
+        return ImageCms.applyTransform(img, transform)
+
+    # ---------- 전체 ----------
+    def render(self, src, box, rotation=0, scale=1.0):
+        """src 를 scale 배 해서 box 안에 맞추고 rotation(시계 방향, 도) 만큼 돌린 미리보기"""
+        size = fit_size(src.size, box, rotation, scale)
+        img = self.resize(src, size)
+        # 색 변환은 작아진 이미지에 (원본을 그대로 쓰는 경우엔 사본에)
+        img = self.to_srgb(img, src.info.get("icc_profile"), in_place=img is not src)
+        return self.rotate(img, rotation)
+
+    def stats(self):
+        return {"profiles": len(self._transforms), "transform_builds": self.transform_builds,
+                "color_manage": self.color_manage}
+
+
+def legacy_render(src, box, rotation=0, quality=1.0, zoom=1.0):
+    """예전 미리보기 경로 (원본 사본 -> 회전 -> 배율마다 resize -> thumbnail), 벤치마크 비교용"""
+    img = src.copy()
+    if rotation != 0:
+        img = img.rotate(-rotation, expand=True)
+    if quality < 1.0:
+        img = img.resize((max(1, int(img.width * quality)), max(1, int(img.height * quality))), resample=Image.BILINEAR)
+    if zoom != 1.0:
+        img = img.resize((max(1, int(img.width * zoom)), max(1, int(img.height * zoom))), resample=Image.BILINEAR)
+    img.thumbnail(box, resample=Image.BILINEAR)
+    return img
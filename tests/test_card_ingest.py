@@ -0,0 +1,82 @@
+"""카드 가져오기 이어 받기 (시뮬레이션 카메라)"""
+import os
+
+import pytest
+
+from aws_manager import AWSS3Manager
+from camera_backend import SimFixtures, SimulatedBackend
+from card_ingest import PART_SUFFIX
+from tether_engine import TetherEngine
+
+CARD_SHOTS = 6
+
+
+@pytest.fixture
+def engine(tmp_path):
+    backend = SimulatedBackend(fixtures=SimFixtures(jpeg_kb=20, raw_mb=0.1), shots=0, card_shots=CARD_SHOTS,
+                               usb_mbps=None)
+    s3_manager = AWSS3Manager(log_callback=lambda msg: None, journal_path=str(tmp_path / "upload_journal.db"),
+                              settings={"lambda_url": "", "upload_enabled": False})
+    engine = TetherEngine(save_dir=str(tmp_path / "photos"), backend=backend, s3_manager=s3_manager)
+    assert engine.connect_camera()
+    yield engine
+    engine.shutdown()
+
+
+def ingest(engine, dest):
+    job = engine.start_ingest(dest)
+    assert job.wait(30)
+    return job.status()
+
+
+def ingested_files(dest):
+    """받은 파일 목록 (축소본이 생기는 .derivatives 는 빼고)"""
+    files = []
+    for root, dirs, names in os.walk(dest):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        files.extend(os.path.relpath(os.path.join(root, name), dest) for name in names)
+    return sorted(files)
+
+
+def test_ingest_resumes_with_missing_files_only(engine, tmp_path):
+    dest = str(tmp_path / "card_import")
+    camera = next(iter(engine.backend.cameras.values()))
+
+    first = ingest(engine, dest)
+    files = ingested_files(dest)
+    assert first["state"] == "done"
+    assert first["files_done"] == len(files) == CARD_SHOTS * 2
+    assert first["files_skipped"] == 0
+    assert not any(name.endswith(PART_SUFFIX) for name in files)
+
+    # 중간에 끊긴 것처럼 일부는 지우고, 하나는 받다 만 .part 로 남김
+    removed = files[:3]
+    for name in removed:
+        os.remove(os.path.join(dest, name))
+    truncated = os.path.join(dest, files[3])
+    with open(truncated, "rb") as f:
+        head = f.read(100)
+    os.remove(truncated)
+    with open(truncated + PART_SUFFIX, "wb") as f:
+        f.write(head)
+    sent_before = camera.bytes_sent
+    expected_bytes = sum(len(camera.files[os.path.basename(name)]) for name in files[:4])
+
+    second = ingest(engine, dest)
+    assert second["state"] == "done"
+    assert second["files_done"] == 4
+    assert second["files_skipped"] == len(files) - 4
+    assert camera.bytes_sent - sent_before == expected_bytes
+    assert ingested_files(dest) == files
+
+
+def test_ingest_skips_everything_when_complete(engine, tmp_path):
+    dest = str(tmp_path / "card_import")
+    ingest(engine, dest)
+    camera = next(iter(engine.backend.cameras.values()))
+    sent_before = camera.bytes_sent
+
+    again = ingest(engine, dest)
+    assert again["files_done"] == 0
+    assert again["files_skipped"] == CARD_SHOTS * 2
+    assert camera.bytes_sent == sent_before
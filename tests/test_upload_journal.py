@@ -0,0 +1,152 @@
+"""업로드 저널 상태 전이 (pending -> in_flight -> done / pending / failed, 재시작 복구)"""
+import threading
+import time
+
+import pytest
+
+from aws_manager import AWSS3Manager
+from upload_journal import (UploadJournal, MAX_ATTEMPTS, RETRY_MAX_DELAY, STATE_FAILED, STATE_IN_FLIGHT,
+                            STATE_PENDING)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    j = UploadJournal(str(tmp_path / "upload_journal.db"))
+    yield j
+    j.close()
+
+
+def states(journal):
+    with journal._lock:
+        return journal._conn.execute("SELECT path, state, attempts FROM uploads ORDER BY id").fetchall()
+
+
+def make_due(journal):
+    """백오프 대기 중인 항목을 바로 가져갈 수 있게"""
+    journal.retry_now()
+
+
+def test_add_same_path_keeps_one_row_and_higher_priority(journal):
+    a = journal.add("/shoot/a.jpg", priority=0)
+    assert journal.add("/shoot/a.jpg", priority=5) == a
+    assert journal.count() == 1
+    assert journal.claim_next()[3] == 5
+
+
+def test_claim_marks_in_flight_in_priority_order(journal):
+    journal.add("/shoot/a.arw", priority=0)
+    journal.add("/shoot/b.jpg", priority=10)
+    journal.add("/shoot/c.jpg", priority=10)
+
+    upload_id, path, attempts, priority = journal.claim_next()
+    assert (path, attempts, priority) == ("/shoot/b.jpg", 0, 10)
+    assert journal.claim_next(min_priority=10)[1] == "/shoot/c.jpg"
+    assert journal.claim_next(min_priority=10) is None
+    assert journal.claim_next()[1] == "/shoot/a.arw"
+    assert journal.claim_next() is None
+    assert {s for _, s, _ in states(journal)} == {STATE_IN_FLIGHT}
+
+
+def test_done_deletes_row(journal):
+    a = journal.add("/shoot/a.jpg")
+    journal.claim_next()
+    journal.mark_done(a)
+    assert states(journal) == []
+
+
+def test_retry_backs_off_and_is_not_claimed_until_due(journal):
+    a = journal.add("/shoot/a.jpg")
+    journal.claim_next()
+    assert journal.mark_retry(a, "timeout") == STATE_PENDING
+    assert journal.claim_next() is None
+    assert journal.next_attempt_delay() > 0
+    make_due(journal)
+    assert journal.claim_next()[2] == 1
+
+
+def test_transport_errors_never_fail(journal):
+    a = journal.add("/shoot/a.jpg")
+    for _ in range(MAX_ATTEMPTS * 10):
+        journal.claim_next()
+        assert journal.mark_retry(a, "connection reset") == STATE_PENDING
+        make_due(journal)
+    assert states(journal) == [("/shoot/a.jpg", STATE_PENDING, MAX_ATTEMPTS * 10)]
+    journal.claim_next()
+    journal.mark_retry(a, "connection reset")
+    assert journal.next_attempt_delay() <= RETRY_MAX_DELAY
+
+
+def test_rejected_fails_after_max_attempts(journal):
+    a = journal.add("/shoot/a.jpg")
+    results = []
+    for _ in range(MAX_ATTEMPTS):
+        journal.claim_next()
+        results.append(journal.mark_retry(a, "HTTP 400", rejected=True))
+        make_due(journal)
+    assert results == [STATE_PENDING] * (MAX_ATTEMPTS - 1) + [STATE_FAILED]
+    assert journal.claim_next() is None
+    assert journal.count() == 0 and journal.count(STATE_FAILED) == 1
+
+
+def test_mark_failed_is_not_claimed(journal):
+    a = journal.add("/shoot/a.jpg")
+    journal.claim_next()
+    journal.mark_failed(a, "file not found")
+    assert journal.claim_next() is None
+    assert states(journal) == [("/shoot/a.jpg", STATE_FAILED, 0)]
+
+
+def test_recover_after_restart(tmp_path):
+    path = str(tmp_path / "upload_journal.db")
+    j = UploadJournal(path)
+    j.add("/shoot/a.jpg")
+    b = j.add("/shoot/b.jpg")
+    j.claim_next()  # a: 업로드 중에 앱이 죽음
+    j.claim_next()
+    j.mark_failed(b, "HTTP 400")
+    j.close()
+
+    j = UploadJournal(path)
+    try:
+        assert j.recover() == 1
+        assert states(j) == [("/shoot/a.jpg", STATE_PENDING, 0), ("/shoot/b.jpg", STATE_PENDING, 0)]
+        assert j.claim_next()[1] == "/shoot/a.jpg"
+    finally:
+        j.close()
+
+
+def test_requeue_only_moves_in_flight(journal):
+    a = journal.add("/shoot/a.jpg")
+    journal.requeue(a)
+    assert states(journal) == [("/shoot/a.jpg", STATE_PENDING, 0)]
+    journal.claim_next()
+    journal.requeue(a)
+    assert states(journal) == [("/shoot/a.jpg", STATE_PENDING, 0)]
+    assert journal.next_attempt_delay() == 0
+
+
+def test_upload_interrupted_on_stop_is_requeued(tmp_path, monkeypatch):
+    """워커를 멈추는 동안 중단된 업로드는 시도 횟수를 늘리지 않고 바로 대기 상태로"""
+    photo = tmp_path / "a.jpg"
+    photo.write_bytes(b"\xff\xd8" + b"0" * 1024)
+    started = threading.Event()
+
+    def upload_until_stopped(self, image_path, priority=None):
+        started.set()
+        while not self.stop_flag.is_set():
+            time.sleep(0.01)
+        return False
+
+    monkeypatch.setattr(AWSS3Manager, "upload_file", upload_until_stopped)
+    manager = AWSS3Manager(log_callback=lambda msg: None, journal_path=str(tmp_path / "upload_journal.db"),
+                           settings={"lambda_url": "http://localhost:1", "upload_workers": 1})
+    try:
+        manager.start_upload_worker()
+        manager.queue_upload(str(photo))
+        assert started.wait(5)
+        manager.stop_upload_worker()
+        assert states(manager.journal) == [(str(photo), STATE_PENDING, 0)]
+        assert manager.journal.next_attempt_delay() == 0
+    finally:
+        manager.stop_flag.set()
+        manager.journal.close()
@@ -0,0 +1,1432 @@
+"""헤드리스 테더링 엔진 (Tk 없이 촬영 -> 다운로드 -> 분석 -> 업로드 파이프라인 실행)
+
+    python tether_engine.py --save-dir ./photos --base-filename img --status-port 8765
+
+상태는 http://127.0.0.1:8765/status 에서 JSON 으로 확인할 수 있다.
+mutzin_tether.CameraGUI 도 같은 엔진을 만들어 쓰고, 화면 표시만 담당한다.
+"""
+import argparse
+import bisect
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from camera_backend import create_backend, BACKEND_GPHOTO2, BACKEND_SIM
+from aws_manager import create_s3_manager
+from upload_journal import UPLOAD_JOURNAL_PATH
+from derivative_generator import DerivativeGenerator
+from upload_scheduler import PRIORITY_DERIVATIVE
+from latency_tracer import LatencyTracer, STAGE_CAPTURE, STAGE_DETECT, STAGE_FILE_GET, STAGE_SAVE, STAGE_NOTIFY
+from lock_profiler import ProfiledLock
+from live_view import LiveViewStream, DEFAULT_LIVE_VIEW_FPS, LIVE_VIEW_EVENT_WAIT_MS
+
+RAW_EXTS = [".arw", ".raw", ".nef", ".cr2", ".cr3", ".orf", ".rw2", ".dng"]
+JPEG_EXTS = [".jpg", ".jpeg"]
+
+DEFAULT_STATUS_PORT = 8765
+CONNECT_RETRIES = 3
+EVENT_WAIT_MS = 1000
+INGEST_EVENT_WAIT_MS = 1  # 카드 가져오기 중에는 파일 사이마다 새 촬영만 확인하고 바로 락을 넘김 (USB 를 쉬지 않게)
+RECOVERABLE_ERRORS = (-53, -110)  # USB claim 실패 / camera busy: 재연결하면 대부분 회복됨
+RECONNECT_INITIAL_DELAY = 0.25
+RECONNECT_MAX_DELAY = 8.0
+MAX_GALLERY = 5000  # 통합 갤러리에 기억할 최근 파일 수
+SIBLING_WAIT_MS = 300  # PC 촬영 직후 짝 파일(RAW+JPEG) 이벤트를 기다리는 최대 시간 (파일 수를 모를 때만 다 기다림)
+SIBLING_EVENT_WAIT_MS = 20
+MAX_QUEUED_CAPTURES = 32  # 셔터를 아직 못 누른 + 다운로드 중인 PC 촬영 요청 최대 수
+CAPTURE_RECOVERY_WAIT_SEC = 5.0  # PC 촬영 요청이 재연결을 기다리는 최대 시간
+
+logger = logging.getLogger("mutzin.tether")
+
+
+# --------- CAMERA UTILS ----------
+_default_backend = None
+
+def default_backend():
+    """backend 인자를 생략했을 때 쓰는 실제 카메라(gphoto2) 백엔드"""
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = create_backend(BACKEND_GPHOTO2)
+    return _default_backend
+
+def list_cameras(backend=None):
+    """연결된 카메라 [(모델명, 포트), ...]"""
+    return (backend or default_backend()).autodetect()
+
+def get_camera_setting(camera, option):
+    try:
+        config = camera.get_config()
+        child = config.get_child_by_name(option)
+        return child.get_value()
+    except Exception:
+        return None
+
+def set_camera_config_with_choices(camera, option, value):
+    try:
+        config = camera.get_config()
+        child = config.get_child_by_name(option)
+        choices = list(child.get_choices())
+        if value not in choices:
+            return False, f"잘못된 입력입니다! 설정 가능한 값 중에서 선택하세요: {choices}"
+        child.set_value(value)
+        camera.set_config(config)
+        return True, f"{option}가 {value}(으)로 설정되었습니다."
+    except Exception:
+        return False, f"{option} 설정 실패"
+
+def set_aperture(camera, value):
+    for option in ["aperture", "f-number"]:
+        ok, msg = set_camera_config_with_choices(camera, option, value)
+        if ok:
+            return ok, msg
+    return False, "조리개(f-number, aperture) 둘 다 설정 실패: 카메라 또는 렌즈에서 원격조리개 설정이 지원되지 않을 수 있습니다."
+
+def get_unique_filename(folder, base_filename, ext):
+    n = 1
+    candidate = f"{base_filename}{ext}"
+    while os.path.exists(os.path.join(folder, candidate)):
+        n += 1
+        candidate = f"{base_filename}_{n}{ext}"
+    return candidate
+
+def exts_for_format(save_format):
+    """저장 포맷 설정("raw"/"jpeg"/"both")에 해당하는 확장자 목록"""
+    if save_format == "raw":
+        return RAW_EXTS
+    if save_format == "jpeg":
+        return JPEG_EXTS
+    return RAW_EXTS + JPEG_EXTS
+
+def download_file(camera, folder, name, save_path, base_filename, exts, log_func=None, camera_lock=None,
+                  tracer=None, trace_id=None, backend=None):
+    backend = backend or default_backend()
+    ext = os.path.splitext(name)[1].lower()
+    if ext not in exts:
+        return None
+    outname = get_unique_filename(save_path, base_filename, ext)
+    camera_file = backend.CameraFile()
+    if camera_lock:
+        with camera_lock:
+            if tracer:
+                # 이벤트 수신부터 카메라 락을 얻어 전송을 시작하기까지
+                tracer.finish(trace_id, STAGE_DETECT)
+            _file_get(backend, camera, folder, name, camera_file, tracer, trace_id)
+    else:
+        _file_get(backend, camera, folder, name, camera_file, tracer, trace_id)
+    target = os.path.join(save_path, outname)
+    if tracer:
+        with tracer.span(STAGE_SAVE, trace_id):
+            camera_file.save(target)
+        tracer.alias(trace_id, target)
+    else:
+        camera_file.save(target)
+    if log_func:
+        log_func(f"파일 다운로드 완료: {target}")
+    return target
+
+def _file_get(backend, camera, folder, name, camera_file, tracer=None, trace_id=None):
+    if tracer:
+        with tracer.span(STAGE_FILE_GET, trace_id):
+            camera.file_get(folder, name, backend.GP_FILE_TYPE_NORMAL, camera_file)
+    else:
+        camera.file_get(folder, name, backend.GP_FILE_TYPE_NORMAL, camera_file)
+
+def list_folder(camera, folder):
+    """카메라 폴더의 파일 이름 목록 (folder_list_files 는 (이름, 값) 쌍 목록)"""
+    return [name for name, _ in camera.folder_list_files(folder)]
+
+def event_listener(camera, get_save_dir, get_base_filename, get_save_format, notify_saved, log_func, camera_lock, stop_event,
+                   tracer=None, get_wait_ms=None, backend=None, tracker=None, on_camera_error=None):
+    """새 파일 이벤트를 받아 내려받고 notify_saved(path, detected_at) 호출 (stop_event 까지 반복)
+
+    get_wait_ms 가 있으면 매번 이벤트 대기 시간을 그 값으로 (라이브뷰 중에는 락을 짧게 잡도록).
+    tracker 가 있으면 이벤트를 받은 파일을 file_added/file_done 으로 알려 재연결 후 다시 받을 수 있게 하고,
+    PC 촬영 중에 대신 받아 둔 이벤트(take_deferred)를 먼저 처리하며 이미 받은 파일(handled)은 건너뛴다.
+    on_camera_error 가 있으면 -53/-110 오류 때 직접 재초기화하지 않고 그 함수를 부른 뒤 끝낸다.
+    """
+    gp = backend or default_backend()
+    while not stop_event.is_set():
+        current = None
+        try:
+            deferred = tracker.take_deferred() if tracker else None
+            if deferred is not None:
+                event_type, event_data = gp.GP_EVENT_FILE_ADDED, deferred
+            else:
+                wait_ms = get_wait_ms() if get_wait_ms else EVENT_WAIT_MS
+                with camera_lock:
+                    event_type, event_data = camera.wait_for_event(wait_ms)
+                if event_type != gp.GP_EVENT_FILE_ADDED and wait_ms < EVENT_WAIT_MS:
+                    # 짧게 대기하는 중에는 곧바로 락을 다시 잡지 않고 라이브뷰/PC 촬영 스레드에 차례를 넘김
+                    time.sleep(0.001)
+            if event_type == gp.GP_EVENT_FILE_ADDED:
+                folder = event_data.folder
+                name = event_data.name
+                if tracker and tracker.handled(folder, name):
+                    continue
+                detected_at = time.time()
+                trace_id = tracer.start_trace() if tracer else None
+                current = (folder, name)
+                if tracker:
+                    tracker.file_added(folder, name)
+                exts = exts_for_format(get_save_format())
+                save_dir = get_save_dir()
+                base_filename = get_base_filename()
+                if not os.path.exists(save_dir):
+                    os.makedirs(save_dir, exist_ok=True)
+                log_func(f"[바디 촬영 감지] 파일 생성됨: {folder}/{name}")
+                path = download_file(camera, folder, name, save_dir, base_filename, exts, log_func, camera_lock=camera_lock,
+                                     tracer=tracer, trace_id=trace_id, backend=gp)
+                if tracker:
+                    tracker.file_done(folder, name)
+                if path:
+                    notify_saved(path, detected_at)
+        except gp.GPhoto2Error as e:
+            if e.code in RECOVERABLE_ERRORS and on_camera_error:
+                # 받던 파일은 tracker 에 남겨 두고 재연결 후 다시 받음
+                on_camera_error(e)
+                return
+            if tracker and current:
+                tracker.file_done(*current)  # 파일 자체 문제라 다시 시도해도 소용없음
+                tracker.invalidate_listing(current[0])  # 카드가 바뀌었을 수 있음
+            if e.code in RECOVERABLE_ERRORS:
+                log_func(f"이벤트 감시 오류(-53 or -110): {e}. 카메라 재초기화 시도")
+                try:
+                    with camera_lock:
+                        camera.exit()
+                        time.sleep(1)
+                        camera.init()
+                        time.sleep(1)
+                except Exception as e2:
+                    log_func(f"이벤트 감시 카메라 재초기화 실패: {e2}")
+            else:
+                log_func(f"이벤트 감시 오류: {e}")
+            time.sleep(1)
+        except Exception as e:
+            log_func(f"이벤트 감시 오류: {e}")
+            time.sleep(1)
+
+
+# --------- POSE ----------
+def save_pose_result(image_path, results):
+    """자세 추정 결과를 저장 폴더의 pose_estimation.json 에 추가"""
+    json_file = os.path.join(os.path.dirname(image_path), "pose_estimation.json")
+    new_entry = {
+        "filename": os.path.basename(image_path),
+        "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        "pose": results['pose'],
+        "view": results['view'],
+        "full_body": results['full_body'],
+    }
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {"pose_estimations": []}
+    data["pose_estimations"].append(new_entry)
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+# --------- LOGGING ----------
+class JSONLogFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 하나 (수집기에서 바로 파싱 가능)"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(log_format="json", log_file=None, level=logging.INFO):
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"
+        ))
+    formatter = JSONLogFormatter() if log_format == "json" else logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    root = logging.getLogger()
+    root.setLevel(level)
+    for h in handlers:
+        h.setFormatter(formatter)
+        root.addHandler(h)
+
+
+# --------- STATUS ENDPOINT ----------
+class StatusHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        engine = self.server.engine
+        path = self.path.split("?", 1)[0]
+        if path in ("/", "/status"):
+            return self._send_json(200, engine.status())
+        if path == "/latency":
+            return self._send_json(200, engine.latency_tracer.summary())
+        if path == "/lock":
+            locks = []
+            for lock in engine.camera_locks():
+                rows, waiting = lock.report()
+                locks.append({"name": lock.name, "enabled": lock.enabled, "waiting": waiting, "sites": rows})
+            return self._send_json(200, locks)
+        if path == "/gallery":
+            return self._send_json(200, engine.gallery())
+        if path == "/health":
+            return self._send_json(200, {"ok": True, "camera_connected": engine.camera is not None})
+        self._send_json(404, {"error": "not found"})
+
+
+# --------- ENGINE ----------
+class CameraSession:
+    """포트에 묶인 카메라 한 대: 전용 락, 이벤트 스레드, 카운터
+
+    카메라마다 락이 따로 있어서 한 대가 파일을 내려받는 동안 다른 카메라의 이벤트 대기/전송이 막히지 않는다.
+    연결이 끊겨도 다시 받을 수 있도록 이벤트를 받았지만 아직 못 받은 파일(pending)과
+    폴더별로 이미 알고 있는 파일 이름(known)을 기록한다.
+
+    폴더 목록은 카드에 파일이 많으면 PTP 로 읽는 데 오래 걸리므로 폴더마다 한 번만 읽어(listing)
+    이후에는 이벤트/PC 촬영으로 알게 된 파일을 더해 가며 쓴다.
+    """
+
+    def __init__(self, backend, camera_id, model, port, lock):
+        self.backend = backend
+        self.camera_id = camera_id
+        self.model = model
+        self.port = port
+        self.lock = lock
+        self.camera = None
+        self.event_thread = None
+        self.event_stop = threading.Event()
+        self.closing = threading.Event()
+        self.saved = 0
+        self.last_saved = None
+        # 재연결
+        self.state = "connected"
+        self.recovery_thread = None
+        self.reconnects = 0
+        self.last_recovery_sec = None
+        self.last_error = None
+        self.pending = OrderedDict()  # (folder, name) -> 이벤트 수신 시각
+        self.known = {}  # folder -> 이미 받았거나 이벤트로 알려진 파일 이름 set
+        self._listings = {}  # folder -> {확장자 뺀 이름: 파일 이름 set} (카메라 폴더 목록 캐시)
+        self._track_lock = threading.Lock()
+        # PC 촬영
+        self.deferred = deque()  # PC 촬영 중 받은 다른 파일의 이벤트 (이벤트 스레드가 처리)
+        self.files_per_shot = None  # 한 번 촬영에 생기는 파일 수 (RAW+JPEG 면 2), PC 촬영에서 알아냄
+        self.last_capture = None  # (folder, 확장자 뺀 이름, 파일 이름 set)
+
+    # ---------- 파일 추적 (event_listener 의 tracker) ----------
+    def file_added(self, folder, name, baseline=True):
+        """baseline=False 는 카메라 락을 잡은 채 호출할 때 (폴더 목록을 새로 읽지 않음)"""
+        if baseline and folder not in self.known:
+            self._baseline(folder, name)
+        stem = os.path.splitext(name)[0]
+        with self._track_lock:
+            self.pending[(folder, name)] = time.time()
+            self.known.setdefault(folder, set()).add(name)
+            if folder in self._listings:
+                self._listings[folder].setdefault(stem, set()).add(name)
+            last = self.last_capture
+            if last and last[0] == folder and last[1] == stem and name not in last[2]:
+                # PC 촬영 직후 기다린 시간보다 늦게 온 짝 파일: 파일 수를 다시 알아내도록
+                last[2].add(name)
+                self.files_per_shot = None
+
+    def handled(self, folder, name):
+        """이미 받았거나 받는 중인 파일인지 (PC 촬영으로 받은 파일의 이벤트가 또 오면 건너뜀)"""
+        with self._track_lock:
+            return name in self.known.get(folder, ())
+
+    def file_done(self, folder, name):
+        with self._track_lock:
+            self.pending.pop((folder, name), None)
+
+    def _baseline(self, folder, name):
+        """폴더를 처음 볼 때 기존 파일 목록 기록 (재연결 후 그 사이 새로 생긴 파일만 받도록)
+
+        이벤트를 아직 못 받은 같은 연사의 뒤 파일까지 기존 파일로 치지 않도록,
+        이번 파일보다 이름(확장자 제외)이 앞서는 것만 기록한다.
+        """
+        stem = os.path.splitext(name)[0]
+        try:
+            with self.lock:
+                listing = self.listing(folder)
+        except Exception:
+            listing = {}
+        with self._track_lock:
+            known = self.known.setdefault(folder, set())
+            for other, names in listing.items():
+                if other < stem:
+                    known.update(names)
+
+    def listing(self, folder, refresh=False):
+        """폴더 목록 캐시 {확장자 뺀 이름: 파일 이름 set} (카메라 락을 잡은 채 호출)
+
+        처음 보는 폴더이거나 refresh 면 카메라에서 읽고, 아니면 캐시를 그대로 돌려준다.
+        """
+        with self._track_lock:
+            cached = None if refresh else self._listings.get(folder)
+        if cached is not None:
+            return cached
+        listing = {}
+        for name in list_folder(self.camera, folder):
+            listing.setdefault(os.path.splitext(name)[0], set()).add(name)
+        with self._track_lock:
+            self._listings[folder] = listing
+        return listing
+
+    def invalidate_listing(self, folder=None):
+        """추적할 수 없는 변화가 있었을 때 (재연결, 받으려던 파일이 없음) 폴더 목록 캐시 버림"""
+        with self._track_lock:
+            if folder is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(folder, None)
+
+    def defer_event(self, event_data):
+        self.deferred.append(event_data)
+
+    def take_deferred(self):
+        try:
+            return self.deferred.popleft()
+        except IndexError:
+            return None
+
+    def pending_files(self):
+        with self._track_lock:
+            return list(self.pending)
+
+    def open(self):
+        camera = self.backend.open(self.model, self.port)
+        with self.lock:
+            camera.init()
+        self.camera = camera
+
+    def start_events(self, engine):
+        self.event_stop.clear()
+        self.event_thread = threading.Thread(
+            target=event_listener,
+            args=(
+                self.camera,
+                lambda: engine.save_dir,
+                lambda: engine.base_filename_for(self),
+                lambda: engine.save_format,
+                lambda path, detected_at: engine.notify_saved(path, detected_at, self.camera_id),
+                lambda msg: engine.log(msg, component="camera", camera_id=self.camera_id),
+                self.lock,
+                self.event_stop,
+                engine.latency_tracer,
+                lambda: engine.event_wait_ms(self),
+                self.backend,
+                self,
+                lambda e: engine.start_recovery(self, e),
+            ),
+            name=f"camera-events-{self.camera_id}",
+            daemon=True
+        )
+        self.event_thread.start()
+
+    def close(self):
+        """이벤트/재연결 스레드 정지 후 카메라 해제"""
+        self.closing.set()
+        self.event_stop.set()
+        for thread in (self.event_thread, self.recovery_thread):
+            if thread and thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=2)
+        if self.camera:
+            try:
+                with self.lock:
+                    self.camera.exit()
+            except Exception:
+                pass
+        self.camera = None
+
+    def status(self):
+        return {
+            "id": self.camera_id, "name": self.model, "port": self.port,
+            "connected": self.camera is not None, "state": self.state,
+            "saved": self.saved, "last_saved": self.last_saved,
+            "pending": len(self.pending), "reconnects": self.reconnects,
+            "last_recovery_sec": self.last_recovery_sec, "last_error": self.last_error,
+        }
+
+
+class IntervalCapture:
+    """일정 간격 PC 촬영 (타임랩스) 스레드, TetherEngine.start_interval 로 만든다"""
+
+    def __init__(self, engine, interval_sec, count=None, camera_id=None, on_done=None):
+        self.engine = engine
+        self.interval_sec = max(0.1, float(interval_sec))
+        self.count = count
+        self.camera_id = camera_id
+        self.on_done = on_done
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.triggered = 0
+        self.skipped = 0
+        self._last_id = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="interval-capture", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _run(self):
+        try:
+            self._shoot()
+        finally:
+            self.engine._interval_finished(self)
+
+    def _shoot(self):
+        started = time.perf_counter()
+        index = 0
+        while not self.stop_event.is_set():
+            if self.count and self.triggered >= self.count:
+                break
+            if self._last_id is not None and not self.engine.capture_triggered(self._last_id):
+                # 앞 장이 아직 셔터를 누르지 못했으면 이번 회차는 건너뜀 (다운로드 중인 것은 상관없음)
+                self.skipped += 1
+            else:
+                self._last_id = self.engine.capture_async(self.camera_id, self.on_done)
+                if self._last_id is None:
+                    self.skipped += 1
+                else:
+                    self.triggered += 1
+            index += 1
+            if self.stop_event.wait(max(0.0, started + index * self.interval_sec - time.perf_counter())):
+                break
+
+    def status(self):
+        return {"interval_sec": self.interval_sec, "count": self.count, "triggered": self.triggered,
+                "skipped": self.skipped, "running": self.is_running()}
+
+
+class TetherEngine:
+    """카메라 연결, 이벤트 감시, 다운로드, 축소본/자세 추정/업로드를 묶은 파이프라인
+
+    Tk 에 의존하지 않고 모든 작업을 자체 스레드에서 처리한다. 화면(또는 다른 클라이언트)은
+    add_listener 로 이벤트를 받아 표시만 한다:
+        ("saved", path), ("camera", 상태 문자열), ("pose", (path, results)), ("pose_status", 문자열),
+        ("recovered", {"camera_id", "recovery_sec", "attempts", "resynced"}),
+        ("captured", {"id", "camera_id", "saved", "error", "elapsed_sec"}) (PC 촬영 하나가 끝날 때마다)
+    리스너는 엔진 스레드에서 호출되므로 GUI 는 root.after 로 넘겨야 한다.
+
+    연결된 카메라는 모두 포트별 CameraSession 으로 묶는다 (cam1, cam2, ...).
+    두 대 이상이면 파일 이름에 카메라 ID 를 붙이고(img_cam2_3.jpg), gallery() 는 모든 카메라의
+    파일을 촬영 감지 시각 순으로 합쳐 돌려준다. 설정 변경/PC 촬영은 camera_id 를 생략하면 첫 카메라 대상.
+    """
+
+    def __init__(self, save_dir="./photos", base_filename="img", save_format="both",
+                 pose_enabled=False, log_callback=None, backend=None, journal_path=UPLOAD_JOURNAL_PATH,
+                 s3_manager=None):
+        self.log_callback = log_callback
+        if backend is None:
+            try:
+                backend = default_backend()
+            except RuntimeError as e:
+                # 핫폴더 모드는 gphoto2 없이도 쓸 수 있음 (카메라 연결만 안 됨)
+                logger.warning(str(e))
+        self.backend = backend
+        self.save_dir = save_dir
+        self.base_filename = base_filename
+        self.save_format = save_format
+
+        self.sessions = []  # CameraSession (포트 순)
+        self.live_view = None
+        self._live_view_session = None
+        self.camera_lock = ProfiledLock("camera_lock")  # 첫 카메라의 락 (나머지는 연결 시 생성)
+        self.latency_tracer = LatencyTracer()
+        self._listeners = []
+
+        # 벤치마크/카드 가져오기 CLI 는 임시 journal_path 를 넘겨 설정 폴더에 저널을 만들지 않음
+        self.s3_manager = s3_manager or create_s3_manager(
+            log_callback=lambda msg: self.log(msg, component="s3"), tracer=self.latency_tracer,
+            journal_path=journal_path
+        )
+        self.derivative_generator = DerivativeGenerator(log_callback=lambda msg: self.log(msg, component="derivative"))
+
+        # 자세 추정은 전용 스레드 하나에서 (진행 중이면 새 사진은 건너뜀)
+        self.pose_estimator = None
+        self.pose_enabled = False
+        self._pose_queue = queue.Queue(maxsize=1)
+        self._pose_thread = None
+        if pose_enabled:
+            self.set_pose_enabled(True)
+
+        self.started_at = time.time()
+        self.counters = {"saved": 0, "saved_bytes": 0, "reconnects": 0, "captures": 0, "capture_failed": 0,
+                         "ingested": 0, "ingested_bytes": 0,
+                         "pose_done": 0, "pose_failed": 0}
+        self.last_saved = None
+        self._counter_lock = threading.Lock()
+        self._gallery = []  # (detected_at, path, camera_id), 시각 순
+        self._gallery_index = {}  # path -> (detected_at, camera_id)
+        self._status_server = None
+
+        # PC 촬영: 셔터 스레드 -> 다운로드 스레드 (처음 요청할 때 시작)
+        self._capture_queue = queue.Queue()
+        self._capture_download_queue = queue.Queue()
+        self._capture_thread = None
+        self._capture_download_thread = None
+        self._capture_seq = 0
+        self._capture_triggered_id = 0
+        self._capture_pending = 0
+        self.interval_capture = None
+        self.ingest = None  # CardIngest (카드 가져오기 중일 때)
+        self.hot_folder = None  # HotFolderSource (핫폴더 감시 중일 때)
+
+    # ---------- 로그/리스너 ----------
+    def log(self, msg, level=logging.INFO, **fields):
+        logger.log(level, msg, extra={"fields": fields})
+        if self.log_callback:
+            self.log_callback(msg)
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def _emit(self, event, data=None):
+        for callback in list(self._listeners):
+            try:
+                callback(event, data)
+            except Exception as e:
+                logger.warning(f"리스너 오류 ({event}): {e}")
+
+    def _count(self, key, amount=1):
+        with self._counter_lock:
+            self.counters[key] += amount
+
+    # ---------- 설정 ----------
+    def set_output(self, save_dir=None, base_filename=None, save_format=None):
+        """저장 폴더/파일이름/포맷 변경 (다음 파일부터 적용)"""
+        if save_dir is not None:
+            self.save_dir = save_dir
+        if base_filename is not None:
+            self.base_filename = base_filename
+        if save_format is not None:
+            self.save_format = save_format
+
+    # ---------- 카메라 ----------
+    @property
+    def camera(self):
+        """첫 카메라 (연결 안 되어 있으면 None)"""
+        session = self.session()
+        return session.camera if session else None
+
+    @property
+    def camera_name(self):
+        session = self.session()
+        return session.model if session else None
+
+    def session(self, camera_id=None):
+        """camera_id 의 CameraSession (생략 시 첫 카메라), 없으면 None"""
+        for session in self.sessions:
+            if camera_id is None or session.camera_id == camera_id:
+                return session
+        return None
+
+    def camera_locks(self):
+        return [self.camera_lock] + [s.lock for s in self.sessions if s.lock is not self.camera_lock]
+
+    def base_filename_for(self, session):
+        """여러 대일 때는 카메라 ID 를 붙여 스레드 간 파일 이름 충돌을 막음"""
+        if len(self.sessions) > 1:
+            return f"{self.base_filename}_{session.camera_id}"
+        return self.base_filename
+
+    def connect_camera(self, retries=CONNECT_RETRIES):
+        """연결된 카메라를 모두 포트별로 잡고 카메라마다 이벤트 감시 시작, 한 대 이상 성공 여부 반환"""
+        if self.backend is None:
+            self._emit("camera", "gphoto2 가 설치되어 있지 않습니다.")
+            return False
+        camera_list = []
+        for _ in range(retries):
+            camera_list = list_cameras(self.backend)
+            if camera_list:
+                break
+            time.sleep(1)
+        self._close_sessions()
+        if not camera_list:
+            self._emit("camera", "카메라가 연결되어 있지 않습니다.")
+            return False
+
+        detected = sorted((port, model) for model, port in camera_list)
+        for index, (port, model) in enumerate(detected):
+            lock = self.camera_lock if not self.sessions else ProfiledLock(
+                f"camera_lock[cam{index + 1}]", enabled=self.camera_lock.enabled
+            )
+            session = CameraSession(self.backend, f"cam{index + 1}", model, port, lock)
+            try:
+                session.open()
+            except Exception as e:
+                self.log(f"카메라 연결 실패: {model} ({port}): {e}", logging.ERROR, component="camera", port=port)
+                continue
+            self.sessions.append(session)
+
+        if not self.sessions:
+            self._emit("camera", "카메라 연결 실패")
+            return False
+        for session in self.sessions:
+            session.start_events(self)
+            self.log(f"카메라 연결 및 이벤트 감시 시작: {session.camera_id} {session.model} ({session.port})",
+                     component="camera", camera_id=session.camera_id, camera=session.model, port=session.port)
+        self.latency_tracer.set_tag("camera", ", ".join(s.model for s in self.sessions))
+        if len(self.sessions) == 1:
+            self._emit("camera", f"연결됨: {self.camera_name}")
+        else:
+            self._emit("camera", f"연결됨 ({len(self.sessions)}대): " + ", ".join(
+                f"{s.camera_id} {s.model}" for s in self.sessions))
+        return True
+
+    def _close_sessions(self):
+        self.stop_live_view()
+        sessions, self.sessions = self.sessions, []
+        for session in sessions:
+            session.close()
+
+    def connect_camera_async(self, on_done=None, retries=CONNECT_RETRIES):
+        """connect_camera 를 백그라운드 스레드에서 실행 (GUI 가 멈추지 않게), 끝나면 on_done(성공 여부)"""
+        def run():
+            ok = self.connect_camera(retries)
+            if on_done:
+                on_done(ok)
+        threading.Thread(target=run, name="camera-connect", daemon=True).start()
+
+    # ---------- 재연결 ----------
+    def start_recovery(self, session, error=None):
+        """-53/-110 오류 후 백그라운드 재연결 시작 (이미 진행 중이면 무시)
+
+        카메라 락을 잡은 채 잠들지 않도록, 재시도 사이 대기는 모두 락 밖에서 한다.
+        """
+        with self._counter_lock:
+            if session.state == "recovering" or session.closing.is_set():
+                return
+            session.state = "recovering"
+        session.last_error = str(error) if error else None
+        session.event_stop.set()
+        self._emit("camera", f"{session.camera_id} 연결 끊김, 재연결 중...")
+        self.log(f"카메라 통신 오류, 재연결 시작: {error}", logging.WARNING, component="camera",
+                 camera_id=session.camera_id, code=getattr(error, "code", None))
+        session.recovery_thread = threading.Thread(
+            target=self._recover, args=(session,), name=f"camera-recover-{session.camera_id}", daemon=True
+        )
+        session.recovery_thread.start()
+
+    def _recover(self, session):
+        started = time.perf_counter()
+        if session.event_thread and session.event_thread is not threading.current_thread():
+            session.event_thread.join(timeout=EVENT_WAIT_MS / 1000.0 + 1)
+        delay = RECONNECT_INITIAL_DELAY
+        attempts = 0
+        while not session.closing.is_set():
+            attempts += 1
+            try:
+                self._reopen(session)
+                resynced = self._resync(session)
+                break
+            except Exception as e:
+                self.log(f"재연결 시도 {attempts} 실패: {e} ({delay:.2f}초 후 재시도)", logging.WARNING,
+                         component="camera", camera_id=session.camera_id, attempt=attempts)
+                if session.closing.wait(delay):
+                    return
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        else:
+            return
+        elapsed = time.perf_counter() - started
+        session.state = "connected"  # 이벤트 스레드 시작 전에 (바로 다시 오류가 나도 재연결되도록)
+        session.start_events(self)
+        session.reconnects += 1
+        session.last_recovery_sec = round(elapsed, 3)
+        self._count("reconnects")
+        self.log(f"카메라 재연결 완료: {session.camera_id} {elapsed:.2f}초 (시도 {attempts}회, 재동기화 {resynced}개)",
+                 component="camera", camera_id=session.camera_id, recovery_ms=round(elapsed * 1000, 1),
+                 attempts=attempts, resynced=resynced, port=session.port)
+        self._emit("camera", f"재연결됨: {session.camera_id} ({elapsed:.1f}초, 재동기화 {resynced}개)")
+        self._emit("recovered", {"camera_id": session.camera_id, "recovery_sec": elapsed,
+                                 "attempts": attempts, "resynced": resynced})
+
+    def _probe_port(self, session):
+        """재연결할 포트 (USB 리셋 후 포트 번호가 바뀌었으면 같은 모델이 있는 빈 포트)"""
+        ports = [port for model, port in self.backend.autodetect() if model == session.model]
+        if session.port in ports:
+            return session.port
+        taken = {s.port for s in self.sessions if s is not session}
+        for port in ports:
+            if port not in taken:
+                return port
+        return None
+
+    def _reopen(self, session):
+        old, session.camera = session.camera, None
+        if old is not None:
+            try:
+                with session.lock:
+                    old.exit()
+            except Exception:
+                pass
+        port = self._probe_port(session)
+        if port is None:
+            raise RuntimeError(f"{session.model} 카메라를 찾을 수 없음")
+        if port != session.port:
+            self.log(f"{session.camera_id} 포트 변경: {session.port} -> {port}", component="camera",
+                     camera_id=session.camera_id)
+            session.port = port
+        session.open()
+        session.invalidate_listing()
+
+    def _resync(self, session):
+        """연결이 끊긴 동안 못 받은 파일 받기: 받다 만 파일 + 폴더 목록에서 새로 생긴 파일, 받은 수 반환"""
+        camera = session.camera
+        todo = session.pending_files()
+        for folder in list(session.known):
+            with session.lock:
+                listing = session.listing(folder, refresh=True)
+            names = [name for group in listing.values() for name in group]
+            with session._track_lock:
+                known = session.known[folder]
+                todo.extend((folder, name) for name in names if name not in known and (folder, name) not in session.pending)
+        todo.sort(key=lambda item: item[1])
+        exts = exts_for_format(self.save_format)
+        resynced = 0
+        for folder, name in todo:
+            session.file_added(folder, name)
+            save_dir = self.save_dir
+            os.makedirs(save_dir, exist_ok=True)
+            trace_id = self.latency_tracer.start_trace()
+            path = download_file(camera, folder, name, save_dir, self.base_filename_for(session), exts,
+                                 lambda msg: self.log(msg, component="camera", camera_id=session.camera_id),
+                                 camera_lock=session.lock, tracer=self.latency_tracer, trace_id=trace_id,
+                                 backend=self.backend)
+            session.file_done(folder, name)
+            if path:
+                resynced += 1
+                self.notify_saved(path, time.time(), session.camera_id)
+        return resynced
+
+    def read_camera_settings(self, camera_id=None):
+        """ISO/셔터속도/조리개/화이트밸런스/켈빈값 읽기 (연결 안 되어 있으면 모두 N/A)
+
+        카메라 락을 기다리므로 (이벤트 대기/다운로드 중이면 최대 수 초) GUI 는 다른 스레드에서 호출해야 한다.
+        """
+        session = self.session(camera_id)
+        if not (session and session.camera):
+            return {k: "N/A" for k in ("iso", "shutterspeed", "aperture", "whitebalance", "kelvin")}
+        camera = session.camera
+        with session.lock:
+            iso = get_camera_setting(camera, "iso") or "N/A"
+            ss = get_camera_setting(camera, "shutterspeed") or "N/A"
+            ap = get_camera_setting(camera, "aperture")
+            if ap is None:
+                ap = get_camera_setting(camera, "f-number")
+            ap = ap or "N/A"
+            wb = get_camera_setting(camera, "whitebalance")
+            if wb is None:
+                wb = get_camera_setting(camera, "white balance")
+            wb = wb or "N/A"
+            kelvin = "N/A"
+            kelvin_keys = ["colortemperature", "color temperature", "kelvin", "whitebalancekelvin", "whitebalance_kelvin"]
+            for key in kelvin_keys:
+                v = get_camera_setting(camera, key)
+                if v is not None:
+                    kelvin = str(v)
+                    break
+        return {"iso": iso, "shutterspeed": ss, "aperture": ap, "whitebalance": wb, "kelvin": kelvin}
+
+    def set_camera_config(self, option, value, camera_id=None):
+        """카메라 설정 변경, (성공 여부, 메시지) 반환. option 이 "aperture" 면 f-number 도 시도"""
+        session = self.session(camera_id)
+        if not (session and session.camera):
+            return False, "카메라가 연결되어 있지 않습니다!"
+        with session.lock:
+            if option == "aperture":
+                return set_aperture(session.camera, value)
+            return set_camera_config_with_choices(session.camera, option, value)
+
+    def capture(self, camera_id=None):
+        """PC 에서 촬영 후 같은 이름의 파일(RAW+JPEG)을 내려받아 저장 경로 목록 반환 (끝날 때까지 기다림)
+
+        gphoto2 오류는 그대로 올린다 (-53/-110 이면 백그라운드 재연결을 시작하고, 찍혔지만 못 받은 파일은
+        재연결 후 재동기화에서 받는다). GUI 는 capture_async 를 써야 한다.
+        """
+        session = self._capture_session(camera_id)
+        with self._counter_lock:
+            self._capture_pending += 1  # 이벤트 스레드가 락을 짧게 잡도록
+        try:
+            shot = self._trigger_capture(session)
+            return self._download_capture(session, shot)
+        finally:
+            with self._counter_lock:
+                self._capture_pending -= 1
+
+    def _capture_session(self, camera_id):
+        session = self.session(camera_id)
+        if not (session and session.camera and session.state == "connected"):
+            raise RuntimeError("카메라가 연결되어 있지 않습니다!")
+        return session
+
+    def _trigger_capture(self, session):
+        """셔터만 누르고 받을 파일 목록을 정함 (카메라 락은 이 동안만 잡음)"""
+        camera = session.camera
+        gp = self.backend
+        self.log("PC에서 촬영 명령 실행", component="camera", camera_id=session.camera_id)
+        tracer = self.latency_tracer
+        trace_id = tracer.start_trace()
+        file_path = None
+        try:
+            with session.lock:
+                with tracer.span(STAGE_CAPTURE, trace_id):
+                    file_path = camera.capture(gp.GP_CAPTURE_IMAGE)
+                folder = file_path.folder
+                siblings = self._collect_siblings(session, file_path)
+        except gp.GPhoto2Error as e:
+            self._capture_failed(session, e, file_path)
+            raise
+        for name in siblings:
+            # 내려받는 도중 끊겨도 재연결 후 재동기화에서 받도록 (이벤트 스레드가 다시 받지 않도록 known 에도 기록)
+            session.file_added(folder, name)
+        return {"folder": folder, "names": siblings, "trace_id": trace_id, "triggered_at": time.time()}
+
+    def _collect_siblings(self, session, file_path):
+        """촬영 결과와 같은 이름의 짝 파일(RAW+JPEG) 목록 (카메라 락을 잡은 채 호출)
+
+        capture() 는 첫 파일만 돌려주고 나머지는 GP_EVENT_FILE_ADDED 로 오므로, 폴더 전체를 읽지 않고
+        잠깐(최대 SIBLING_WAIT_MS) 이벤트를 받아 모은다. 한 번 촬영에 생기는 파일 수를 알면 다 모이는
+        즉시 끝내고, 다른 파일의 이벤트는 이벤트 스레드로 넘긴다. 알던 수보다 적게 오면 그때만
+        폴더 목록을 다시 읽는다. 카드에 파일이 아무리 많아도 촬영 후 작업량은 같다.
+        """
+        gp = self.backend
+        camera = session.camera
+        folder = file_path.folder
+        stem = os.path.splitext(file_path.name)[0]
+        names = [file_path.name]
+        expected = session.files_per_shot
+        deadline = time.perf_counter() + SIBLING_WAIT_MS / 1000.0
+        complete = False
+        while not (expected and len(names) >= expected):
+            remaining_ms = int((deadline - time.perf_counter()) * 1000)
+            if remaining_ms <= 0:
+                break
+            event_type, event_data = camera.wait_for_event(min(remaining_ms, SIBLING_EVENT_WAIT_MS))
+            if event_type == gp.GP_EVENT_CAPTURE_COMPLETE:
+                complete = True
+                break
+            if event_type != gp.GP_EVENT_FILE_ADDED:
+                continue
+            if event_data.folder == folder and os.path.splitext(event_data.name)[0] == stem:
+                if event_data.name not in names:
+                    names.append(event_data.name)
+            else:
+                session.defer_event(event_data)
+        if expected and len(names) < expected and not complete:
+            found = session.listing(folder, refresh=True).get(stem, ())
+            names.extend(sorted(name for name in found if name not in names))
+        if expected is None or len(names) > expected:
+            session.files_per_shot = len(names)
+        session.last_capture = (folder, stem, set(names))
+        return names
+
+    def _download_capture(self, session, shot):
+        """_trigger_capture 가 정한 파일을 하나씩 내려받아 파이프라인으로 넘김 (파일마다 락을 잡았다 놓음)"""
+        gp = self.backend
+        save_dir = self.save_dir
+        base_filename = self.base_filename_for(session)
+        exts = exts_for_format(self.save_format)
+        os.makedirs(save_dir, exist_ok=True)
+        tracer = self.latency_tracer
+        folder = shot["folder"]
+        saved = []
+        for index, name in enumerate(shot["names"]):
+            if os.path.splitext(name)[1].lower() not in exts:
+                session.file_done(folder, name)
+                continue
+            # RAW+JPEG 이면 두 번째 파일부터는 따로 추적
+            trace_id = shot["trace_id"] if not saved else tracer.start_trace()
+            camera_file = gp.CameraFile()
+            try:
+                with session.lock:
+                    _file_get(gp, session.camera, folder, name, camera_file, tracer, trace_id)
+            except gp.GPhoto2Error as e:
+                self._capture_failed(session, e)
+                raise
+            path = os.path.join(save_dir, get_unique_filename(save_dir, base_filename, os.path.splitext(name)[1].lower()))
+            with tracer.span(STAGE_SAVE, trace_id):
+                camera_file.save(path)
+            tracer.alias(trace_id, path)
+            session.file_done(folder, name)
+            saved.append(path)
+            self.log(f"PC촬영 저장: {path}", component="camera", camera_id=session.camera_id)
+            self.notify_saved(path, shot["triggered_at"], session.camera_id)
+        return saved
+
+    def _capture_failed(self, session, error, file_path=None):
+        self.log(f"PC촬영 오류: {error}", logging.ERROR, component="camera", camera_id=session.camera_id,
+                 code=error.code)
+        if error.code in RECOVERABLE_ERRORS:
+            if file_path is not None:
+                session.file_added(file_path.folder, file_path.name, baseline=False)
+            self.start_recovery(session, error)
+
+    def capture_async(self, camera_id=None, on_done=None):
+        """PC 촬영 요청을 큐에 넣고 바로 반환 (요청 번호, 큐가 가득 차면 None)
+
+        촬영 스레드는 셔터만 누르고 다운로드는 다운로드 스레드로 넘기므로, 연달아 눌러도 앞 사진을
+        다 받을 때까지 기다리지 않는다. 끝나면 on_done({"id", "camera_id", "saved", "error", "elapsed_sec"})
+        을 엔진 스레드에서 호출하고 "captured" 이벤트도 보낸다.
+        """
+        with self._counter_lock:
+            self._capture_seq += 1
+            job = {"id": self._capture_seq, "camera_id": camera_id, "on_done": on_done,
+                   "requested_at": time.perf_counter()}
+            if self._capture_pending >= MAX_QUEUED_CAPTURES:
+                job = dict(job, rejected=True)
+            else:
+                self._capture_pending += 1
+            if self._capture_thread is None:
+                self._capture_thread = threading.Thread(target=self._capture_worker, name="capture", daemon=True)
+                self._capture_thread.start()
+                self._capture_download_thread = threading.Thread(
+                    target=self._capture_download_worker, name="capture-download", daemon=True
+                )
+                self._capture_download_thread.start()
+        if job.get("rejected"):
+            self.log(f"촬영 요청이 밀려 있어 무시함 (대기 {MAX_QUEUED_CAPTURES}개)", logging.WARNING, component="camera")
+            self._finish_capture(job, error="촬영 대기열이 가득 찼습니다", count_pending=False)
+            return None
+        self._capture_queue.put(job)
+        return job["id"]
+
+    def capture_triggered(self, job_id):
+        """job_id 요청의 셔터 처리가 끝났는지 (실패 포함, 요청은 순서대로 처리됨)"""
+        return self._capture_triggered_id >= job_id
+
+    def captures_pending(self):
+        """아직 끝나지 않은 PC 촬영 요청 수 (셔터 대기 + 다운로드 중)"""
+        with self._counter_lock:
+            return self._capture_pending
+
+    def _capture_worker(self):
+        while True:
+            job = self._capture_queue.get()
+            if job is None:
+                self._capture_download_queue.put(None)
+                return
+            try:
+                self._wait_recovered(job["camera_id"])
+                session = self._capture_session(job["camera_id"])
+                job["camera_id"] = session.camera_id
+                shot = self._trigger_capture(session)
+            except Exception as e:
+                self._capture_triggered_id = job["id"]
+                self._finish_capture(job, error=str(e))
+                continue
+            self._capture_triggered_id = job["id"]
+            self._capture_download_queue.put((job, session, shot))
+
+    def _wait_recovered(self, camera_id, timeout=CAPTURE_RECOVERY_WAIT_SEC):
+        """재연결 중이면 잠깐 기다림 (짧은 끊김 때문에 연사/인터벌 요청이 바로 실패하지 않도록)"""
+        deadline = time.perf_counter() + timeout
+        session = self.session(camera_id)
+        while session and session.state == "recovering" and time.perf_counter() < deadline:
+            if session.closing.wait(0.05):
+                return
+
+    def _capture_download_worker(self):
+        while True:
+            item = self._capture_download_queue.get()
+            if item is None:
+                return
+            job, session, shot = item
+            try:
+                saved = self._download_capture(session, shot)
+            except Exception as e:
+                self._finish_capture(job, error=str(e))
+                continue
+            self._finish_capture(job, saved=saved)
+
+    def _finish_capture(self, job, saved=None, error=None, count_pending=True):
+        if count_pending:
+            with self._counter_lock:
+                self._capture_pending -= 1
+        if saved is not None:
+            self._count("captures")
+        else:
+            self._count("capture_failed")
+        result = {"id": job["id"], "camera_id": job["camera_id"], "saved": saved or [], "error": error,
+                  "elapsed_sec": round(time.perf_counter() - job["requested_at"], 3)}
+        if job.get("on_done"):
+            try:
+                job["on_done"](result)
+            except Exception as e:
+                logger.warning(f"촬영 콜백 오류: {e}")
+        self._emit("captured", result)
+
+    def start_interval(self, interval_sec, count=None, camera_id=None, on_done=None):
+        """interval_sec 간격으로 PC 촬영 반복 (count 장, None 이면 stop_interval 까지). 진행 중인 것은 멈추고 새로 시작
+
+        촬영 시각은 시작 시각 기준으로 잡아 밀리지 않게 하고, 이전 요청이 아직 셔터를 누르지 못했으면
+        그 회차는 건너뛴다 (밀린 요청이 한꺼번에 찍히지 않도록). 매 장 on_done(result) 은 capture_async 와 같다.
+        """
+        self.stop_interval()
+        sequence = IntervalCapture(self, interval_sec, count, camera_id, on_done)
+        self.interval_capture = sequence
+        sequence.start()
+        self.log(f"인터벌 촬영 시작: {interval_sec}초 간격, {count or '무제한'}장", component="camera",
+                 interval_sec=interval_sec, count=count)
+        return sequence
+
+    def stop_interval(self):
+        sequence, self.interval_capture = self.interval_capture, None
+        if sequence:
+            sequence.stop()
+            self.log(f"인터벌 촬영 정지 ({sequence.triggered}장, 건너뜀 {sequence.skipped})", component="camera")
+
+    def _interval_finished(self, sequence):
+        """시퀀스 스레드가 끝날 때 (장 수를 채웠거나 정지), 아직 걸려 있으면 내림"""
+        if self.interval_capture is sequence:
+            self.interval_capture = None
+            self.log(f"인터벌 촬영 완료 ({sequence.triggered}장, 건너뜀 {sequence.skipped})", component="camera",
+                     triggered=sequence.triggered, skipped=sequence.skipped)
+
+    # ---------- 카드 가져오기 ----------
+    def start_ingest(self, dest, camera_id=None, save_format=None, writers=None, on_progress=None):
+        """카드에 있는 사진 중 dest 에 없는 것을 모두 내려받기 시작 (CardIngest 반환, 진행 중이던 것은 멈춤)"""
+        from card_ingest import CardIngest, DEFAULT_INGEST_WRITERS
+        self.stop_ingest()
+        self.ingest = CardIngest(self, dest, camera_id, save_format, writers or DEFAULT_INGEST_WRITERS, on_progress)
+        self.ingest.start()
+        return self.ingest
+
+    def stop_ingest(self):
+        if self.ingest and self.ingest.is_running():
+            self.ingest.stop()
+
+    # ---------- 핫폴더 ----------
+    def start_hot_folder(self, folder, **options):
+        """제조사 테더링 프로그램이 사진을 쓰는 폴더를 감시해 새 사진을 파이프라인으로 넘김 (카메라 연결 불필요)
+
+        options 는 HotFolderSource 인자 (stable_sec, batch_sec, poll_sec, use_inotify).
+        """
+        from hot_folder import HotFolderSource
+        self.stop_hot_folder()
+        self.hot_folder = HotFolderSource(
+            folder, self._on_hot_folder_files,
+            log_func=lambda msg: self.log(msg, component="hot_folder"), **options
+        )
+        self.hot_folder.start()
+        self._emit("camera", f"핫폴더 감시 중: {folder}")
+        return self.hot_folder
+
+    def stop_hot_folder(self):
+        hot_folder, self.hot_folder = self.hot_folder, None
+        if hot_folder:
+            hot_folder.stop()
+            self.log(f"핫폴더 감시 정지 ({hot_folder.delivered}장)", component="hot_folder")
+
+    def _on_hot_folder_files(self, files):
+        # 감시 스레드에서 호출, 다 써진 파일만 한 번에 모아서 옴 (촬영 순서 = 수정 시각 순)
+        for path, mtime in files:
+            self.latency_tracer.start_trace(path)
+            self.notify_saved(path, mtime)
+
+    # ---------- 라이브뷰 ----------
+    def start_live_view(self, on_frame, camera_id=None, target_fps=DEFAULT_LIVE_VIEW_FPS, get_min_interval=None):
+        """라이브뷰 시작, on_frame(jpeg_bytes, grabbed_at) 은 라이브뷰 스레드에서 호출됨. 성공 여부 반환"""
+        self.stop_live_view()
+        session = self.session(camera_id)
+        if not (session and session.camera):
+            return False
+        self._live_view_session = session
+        self.live_view = LiveViewStream(
+            lambda: session.camera, session.lock, on_frame, target_fps, get_min_interval,
+            log_func=lambda msg: self.log(msg, logging.WARNING, component="live_view", camera_id=session.camera_id),
+            on_error=lambda e: getattr(e, "code", None) in RECOVERABLE_ERRORS and self.start_recovery(session, e)
+        )
+        self.live_view.start()
+        self.log(f"라이브뷰 시작 ({session.camera_id}, 최대 {self.live_view.target_fps}fps)", component="live_view",
+                 camera_id=session.camera_id)
+        return True
+
+    def stop_live_view(self):
+        live_view, self.live_view = self.live_view, None
+        self._live_view_session = None
+        if live_view:
+            live_view.stop()
+            self.log(f"라이브뷰 정지 ({live_view.frames}프레임)", component="live_view")
+
+    def event_wait_ms(self, session):
+        """라이브뷰/PC 촬영/카드 가져오기 중이면 이벤트 대기를 짧게 해서 락을 자주 양보"""
+        if self.ingest and self.ingest.is_running():
+            return INGEST_EVENT_WAIT_MS
+        sequence = self.interval_capture
+        if session is self._live_view_session or self._capture_pending or (sequence and sequence.is_running()):
+            return LIVE_VIEW_EVENT_WAIT_MS
+        return EVENT_WAIT_MS
+
+    # ---------- 파이프라인 ----------
+    def notify_saved(self, path, detected_at=None, camera_id=None):
+        """파일 저장 후 처리 (카메라 이벤트 스레드에서 호출, 무거운 작업은 모두 다른 스레드로 넘김)"""
+        with self.latency_tracer.span(STAGE_NOTIFY, path):
+            self._add_to_gallery(path, detected_at or time.time(), camera_id)
+            self._process_saved(path, camera_id)
+        self._emit("saved", path)
+
+    def _add_to_gallery(self, path, detected_at, camera_id):
+        with self._counter_lock:
+            # 카메라마다 다운로드 시간이 달라 도착 순서가 뒤바뀔 수 있으므로 감지 시각 순으로 끼워 넣음
+            bisect.insort(self._gallery, (detected_at, path, camera_id or ""))
+            self._gallery_index[path] = (detected_at, camera_id)
+            if len(self._gallery) > MAX_GALLERY:
+                _, old, _ = self._gallery.pop(0)
+                self._gallery_index.pop(old, None)
+
+    def gallery(self, limit=None):
+        """모든 카메라의 저장 파일 (촬영 감지 시각 순, 최신이 마지막)"""
+        with self._counter_lock:
+            entries = self._gallery[-limit:] if limit else list(self._gallery)
+        return [{"path": p, "camera_id": c or None, "detected_at": t} for t, p, c in entries]
+
+    def camera_id_for(self, path):
+        """path 를 찍은 카메라 ID (이번 실행에서 받은 파일이 아니면 None)"""
+        entry = self._gallery_index.get(path)
+        return entry[1] if entry else None
+
+    def captured_at(self, path):
+        """path 의 촬영 감지 시각 (이번 실행에서 받은 파일이 아니면 None)"""
+        entry = self._gallery_index.get(path)
+        return entry[0] if entry else None
+
+    def _process_saved(self, path, camera_id=None):
+        self.log(f"자동 저장: {path}", component="pipeline", path=path, camera_id=camera_id)
+        self._count("saved")
+        try:
+            self._count("saved_bytes", os.path.getsize(path))
+        except OSError:
+            pass
+        self.last_saved = path
+        session = self.session(camera_id) if camera_id else None
+        if session:
+            session.saved += 1
+            session.last_saved = path
+        is_jpeg = os.path.splitext(path)[1].lower() in JPEG_EXTS
+        self._queue_uploads(path)
+        if is_jpeg and self.pose_enabled:
+            try:
+                self._pose_queue.put_nowait(path)
+            except queue.Full:
+                pass  # 이전 사진 분석 중이면 건너뜀
+
+    def _queue_uploads(self, path):
+        """S3 업로드 요청 (워커 풀에 넘기고 바로 복귀), 축소본 생성을 요청했으면 True"""
+        is_jpeg = os.path.splitext(path)[1].lower() in JPEG_EXTS
+        # RAW 는 설정에서 켠 경우에만 업로드 (큰 파일은 멀티파트)
+        settings = self.s3_manager.settings
+        upload_enabled = settings.get('upload_enabled', True)
+        derivatives = False
+        # 웹용 축소본은 별도 프로세스에서 만들어 원본보다 먼저 업로드
+        if is_jpeg and upload_enabled and settings.get('upload_derivatives', False):
+            self.derivative_generator.submit(path, on_done=self._queue_derivative_uploads)
+            derivatives = True
+        if (is_jpeg or settings.get('upload_raw', False)) and upload_enabled:
+            self.s3_manager.queue_upload(path)
+        return derivatives
+
+    def notify_ingested(self, path, camera_id=None):
+        """카드 가져오기로 받은 파일 처리: 축소본 생성과 업로드만 (갤러리/자세 추정/"saved" 이벤트 없음)"""
+        self._count("ingested")
+        try:
+            self._count("ingested_bytes", os.path.getsize(path))
+        except OSError:
+            pass
+        if not self._queue_uploads(path) and os.path.splitext(path)[1].lower() in JPEG_EXTS:
+            self.derivative_generator.submit(path)  # 업로드하지 않아도 썸네일은 만들어 둠
+
+    def _queue_derivative_uploads(self, derivatives):
+        for variant in ("thumb", "web"):
+            if variant in derivatives:
+                self.s3_manager.queue_upload(derivatives[variant], priority=PRIORITY_DERIVATIVE)
+
+    # ---------- 자세 추정 ----------
+    def set_pose_enabled(self, enabled):
+        """자세 추정 켜기/끄기 (처음 켤 때 모델 로드)"""
+        if enabled and self.pose_estimator is None:
+            from pose_estimator import PoseEstimator
+            self.pose_estimator = PoseEstimator()
+        self.pose_enabled = enabled
+        if enabled and not (self._pose_thread and self._pose_thread.is_alive()):
+            self._pose_thread = threading.Thread(target=self._pose_worker, name="pose", daemon=True)
+            self._pose_thread.start()
+
+    def _pose_worker(self):
+        while True:
+            path = self._pose_queue.get()
+            if path is None:
+                return
+            if not (self.pose_enabled and self.pose_estimator):
+                continue
+            self._emit("pose_status", "Estimating pose...")
+            try:
+                results = self.pose_estimator.estimate(path)
+                save_pose_result(path, results)
+                formatted = self.pose_estimator.get_formatted_result(results)
+                self.log(f"[Pose Estimation] {os.path.basename(path)}: {formatted}", component="pose", path=path,
+                         pose=results['pose'], view=results['view'], full_body=results['full_body'])
+                self._count("pose_done")
+                self._emit("pose", (path, results))
+                self._emit("pose_status", "Pose estimation complete")
+            except Exception as e:
+                self._count("pose_failed")
+                self.log(f"Pose estimation failed: {e}", logging.ERROR, component="pose", path=path)
+                self._emit("pose_status", f"Pose estimation failed: {str(e)}")
+
+    # ---------- 상태 ----------
+    def status(self):
+        """상태 요약 dict (HTTP /status 응답)"""
+        with self._counter_lock:
+            counters = dict(self.counters)
+        latency = {
+            stage: {k: (round(s[k], 2) if s[k] is not None else None) for k in ("count", "p50_ms", "p99_ms")}
+            for stage, s in self.latency_tracer.summary().items()
+        }
+        return {
+            "uptime_sec": round(time.time() - self.started_at, 1),
+            "camera": {"connected": self.camera is not None, "name": self.camera_name},
+            "cameras": [session.status() for session in self.sessions],
+            "live_view": self.live_view.stats() if self.live_view else None,
+            "captures_pending": self.captures_pending(),
+            "interval": self.interval_capture.status() if self.interval_capture else None,
+            "ingest": self.ingest.status() if self.ingest else None,
+            "hot_folder": self.hot_folder.status() if self.hot_folder else None,
+            "output": {"save_dir": self.save_dir, "base_filename": self.base_filename, "save_format": self.save_format},
+            "pose_enabled": self.pose_enabled,
+            "counters": counters,
+            "last_saved": self.last_saved,
+            "uploads": self.s3_manager.get_upload_stats(),
+            "latency": latency,
+        }
+
+    def start_status_server(self, port=DEFAULT_STATUS_PORT, host="127.0.0.1"):
+        """로컬 HTTP 상태 엔드포인트 시작 (/status, /latency, /lock, /gallery, /health)"""
+        if self._status_server:
+            return
+        server = ThreadingHTTPServer((host, port), StatusHandler)
+        server.daemon_threads = True
+        server.engine = self
+        threading.Thread(target=server.serve_forever, name="status-http", daemon=True).start()
+        self._status_server = server
+        self.log(f"상태 엔드포인트: http://{host}:{server.server_address[1]}/status", component="status")
+
+    def shutdown(self):
+        """이벤트 감시/업로드/축소본/자세 추정/상태 서버 정리"""
+        profiled = [lock for lock in self.camera_locks() if lock.enabled]
+        self.stop_interval()
+        self.stop_ingest()
+        self.stop_hot_folder()
+        if self._capture_thread:
+            self._capture_queue.put(None)
+        self._close_sessions()
+        if self.s3_manager:
+            self.s3_manager.stop_upload_worker()
+        self.derivative_generator.shutdown()
+        if self._pose_thread and self._pose_thread.is_alive():
+            try:
+                self._pose_queue.put_nowait(None)
+            except queue.Full:
+                pass
+        if self._status_server:
+            self._status_server.shutdown()
+            self._status_server.server_close()
+            self._status_server = None
+        for lock in profiled:
+            # 프로파일링 중이었으면 결과를 남기고 종료
+            lock.write_log()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MUTZIN 헤드리스 테더링 엔진")
+    parser.add_argument("--save-dir", default="./photos")
+    parser.add_argument("--base-filename", default="img")
+    parser.add_argument("--format", dest="save_format", choices=("both", "raw", "jpeg"), default="both")
+    parser.add_argument("--pose", action="store_true", help="자세 추정 활성화")
+    parser.add_argument("--status-port", type=int, default=DEFAULT_STATUS_PORT, help="0 이면 상태 엔드포인트 끔")
+    parser.add_argument("--status-host", default="127.0.0.1")
+    parser.add_argument("--log-format", choices=("json", "text"), default="json")
+    parser.add_argument("--log-file", default=None, help="로그 파일 (10MB 단위로 교체)")
+    parser.add_argument("--profile-lock", action="store_true", help="카메라 락 경합 프로파일링")
+    parser.add_argument("--reconnect-interval", type=float, default=5.0, help="카메라가 없을 때 재검색 간격(초)")
+    parser.add_argument("--backend", choices=(BACKEND_GPHOTO2, BACKEND_SIM), default=BACKEND_GPHOTO2,
+                        help="sim 이면 카메라 없이 시뮬레이션 카메라 사용")
+    parser.add_argument("--sim-cameras", type=int, default=1)
+    parser.add_argument("--sim-fixtures", default=None, help="시뮬레이션 카메라가 내보낼 파일 폴더")
+    parser.add_argument("--hot-folder", default=None,
+                        help="카메라 대신 이 폴더를 감시 (제조사 테더링 프로그램이 사진을 쓰는 폴더)")
+    parser.add_argument("--hot-folder-poll", action="store_true", help="inotify 대신 폴링으로 감시")
+    parser.add_argument("--interval", type=float, default=0, help="이 간격(초)으로 PC 촬영 반복 (타임랩스, 0 이면 끔)")
+    parser.add_argument("--interval-count", type=int, default=None, help="인터벌 촬영 장 수 (생략 시 종료할 때까지)")
+    args = parser.parse_args()
+
+    configure_logging(args.log_format, args.log_file)
+    if args.backend == BACKEND_SIM:
+        from camera_backend import SimFixtures
+        backend = create_backend(BACKEND_SIM, cameras=args.sim_cameras,
+                                 fixtures=SimFixtures(args.sim_fixtures, save_format=args.save_format))
+    elif args.hot_folder:
+        backend = None  # 카메라 연결을 안 하므로 gphoto2 가 없어도 됨
+    else:
+        backend = create_backend(BACKEND_GPHOTO2)
+    engine = TetherEngine(args.save_dir, args.base_filename, args.save_format, pose_enabled=args.pose, backend=backend)
+    engine.camera_lock.enabled = args.profile_lock
+    if args.status_port:
+        engine.start_status_server(args.status_port, args.status_host)
+    if args.hot_folder:
+        engine.start_hot_folder(args.hot_folder, use_inotify=False if args.hot_folder_poll else None)
+    interval_started = False
+    try:
+        while args.hot_folder:
+            time.sleep(1.0)
+        while True:
+            # 연결된 뒤 끊긴 카메라는 엔진이 백그라운드에서 재연결하므로 처음 연결만 반복 시도
+            if not engine.sessions:
+                engine.connect_camera()
+            if args.interval and engine.sessions and not interval_started:
+                # 한 번만 시작 (장 수를 채워 끝나면 다시 시작하지 않음)
+                engine.start_interval(args.interval, args.interval_count)
+                interval_started = True
+            time.sleep(args.reconnect_interval if not engine.sessions else 1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
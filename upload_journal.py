@@ -0,0 +1,288 @@
+import os
+import sqlite3
+import threading
+import time
+
+# 업로드 저널 DB 경로 (AWS 설정 파일과 같은 폴더)
+UPLOAD_JOURNAL_PATH = os.path.join(os.path.expanduser("./"), ".settings/.aws_camera_settings", "upload_journal.db")
+
+# 업로드 상태
+STATE_PENDING = "pending"
+STATE_IN_FLIGHT = "in_flight"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+# 재시도 정책 (지수 백오프, 연결/전송 오류는 횟수 제한 없이 최대 간격으로 계속 재시도)
+RETRY_BASE_DELAY = 5       # 첫 재시도까지 대기(초)
+RETRY_MAX_DELAY = 600      # 최대 대기(초)
+MAX_ATTEMPTS = 3           # S3 가 요청을 거부(4xx)한 업로드는 이 횟수를 넘기면 failed 로 남김
+
+
+def retry_delay(attempts):
+    """attempts 번 실패한 뒤 다음 시도까지의 대기 시간"""
+    return min(RETRY_BASE_DELAY * (2 ** max(0, attempts - 1)), RETRY_MAX_DELAY)
+
+
+class UploadJournal:
+    """SQLite 기반 업로드 저널 (앱 종료/크래시 후에도 대기 중인 업로드 유지)
+
+    상태 흐름: pending -> in_flight -> done
+                                  \\-> pending (백오프 후 재시도) -> ...
+                                  \\-> failed (파일 없음, 요청 거부 반복)
+    done 이 된 행은 바로 지운다 (완료 기록은 uploaded_objects 에 남음). uploads 에는 대기/업로드 중/실패만
+    남으므로 설치 후 업로드한 파일 수와 상관없이 테이블 크기가 일정하다.
+    """
+
+    def __init__(self, db_path=UPLOAD_JOURNAL_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS uploads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        # 이전 버전 저널 마이그레이션
+        columns = [r[1] for r in self._conn.execute("PRAGMA table_info(uploads)")]
+        for name, ddl in (("priority", "INTEGER NOT NULL DEFAULT 0"), ("size", "INTEGER NOT NULL DEFAULT 0")):
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE uploads ADD COLUMN {name} {ddl}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_queue ON uploads(state, priority DESC, id)")
+        # 업로드 완료된 객체의 해시 인덱스 (중복 업로드 건너뛰기용)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS uploaded_objects (
+                object_key TEXT PRIMARY KEY,
+                md5 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                path TEXT NOT NULL,
+                uploaded_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_uploaded_path ON uploaded_objects(path)")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def recover(self):
+        """시작 시 호출: 이전 실행에서 업로드 중이던 항목과 실패로 남은 항목을 다시 대기 상태로
+
+        반환값은 업로드 중이던 항목 수
+        """
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE uploads SET state=?, next_attempt_at=0, updated_at=? WHERE state=?",
+                (STATE_PENDING, now, STATE_IN_FLIGHT)
+            )
+            recovered = cur.rowcount
+            self._conn.execute(
+                "UPDATE uploads SET state=?, attempts=0, next_attempt_at=0, updated_at=? WHERE state=?",
+                (STATE_PENDING, now, STATE_FAILED)
+            )
+            self._conn.commit()
+            return recovered
+
+    def add(self, path, priority=0):
+        """업로드 대기열에 추가 (이미 대기/업로드 중인 경로면 기존 id 반환, 우선순위는 높은 쪽 유지)"""
+        now = time.time()
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM uploads WHERE path=? AND state IN (?, ?)",
+                (path, STATE_PENDING, STATE_IN_FLIGHT)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE uploads SET priority=MAX(priority, ?) WHERE id=?", (priority, row[0])
+                )
+                self._conn.commit()
+                return row[0]
+            cur = self._conn.execute(
+                "INSERT INTO uploads (path, state, priority, size, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, STATE_PENDING, priority, size, now, now)
+            )
+            self._conn.commit()
+            return cur.lastrowid
+
+    def claim_next(self, min_priority=None):
+        """재시도 시각이 된 대기 항목 중 우선순위가 높고 오래된 것을 in_flight 로 바꾸고 (id, path, attempts, priority) 반환
+
+        min_priority: 이 우선순위 이상인 항목만 가져옴
+        """
+        now = time.time()
+        sql = "SELECT id, path, attempts, priority FROM uploads WHERE state=? AND next_attempt_at<=?"
+        params = (STATE_PENDING, now)
+        if min_priority is not None:
+            sql += " AND priority>=?"
+            params += (min_priority,)
+        sql += " ORDER BY priority DESC, id LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE uploads SET state=?, updated_at=? WHERE id=?",
+                (STATE_IN_FLIGHT, now, row[0])
+            )
+            self._conn.commit()
+            return row
+
+    def mark_done(self, upload_id):
+        """완료된 항목은 지움 (중복 확인은 uploaded_objects 로 하므로 남길 필요 없음)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM uploads WHERE id=?", (upload_id,))
+            self._conn.commit()
+
+    def mark_failed(self, upload_id, error=None):
+        """재시도 없이 실패 처리 (파일이 없어진 경우 등)"""
+        self._set_state(upload_id, STATE_FAILED, error)
+
+    def mark_retry(self, upload_id, error=None, rejected=False):
+        """실패 기록 후 백오프 뒤 재시도 예약. 다음 상태 반환
+
+        rejected: 요청이 거부된 경우(4xx)만 MAX_ATTEMPTS 를 넘기면 failed,
+        연결/전송 오류는 failed 로 만들지 않고 RETRY_MAX_DELAY 간격으로 계속 재시도
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM uploads WHERE id=?", (upload_id,)).fetchone()
+            if row is None:
+                return None
+            attempts = row[0] + 1
+            if rejected and attempts >= MAX_ATTEMPTS:
+                state, next_at = STATE_FAILED, 0
+            else:
+                state, next_at = STATE_PENDING, now + retry_delay(attempts)
+            self._conn.execute(
+                "UPDATE uploads SET state=?, attempts=?, next_attempt_at=?, last_error=?, updated_at=? WHERE id=?",
+                (state, attempts, next_at, error, now, upload_id)
+            )
+            self._conn.commit()
+            return state
+
+    def requeue(self, upload_id):
+        """업로드 중이던 항목을 시도 횟수 변경 없이 바로 대기 상태로 (워커를 멈춰 중단된 경우)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE uploads SET state=?, next_attempt_at=0, updated_at=? WHERE id=? AND state=?",
+                (STATE_PENDING, time.time(), upload_id, STATE_IN_FLIGHT)
+            )
+            self._conn.commit()
+
+    def set_priority(self, path, priority):
+        """대기/업로드 중인 항목의 우선순위 변경 (A컷 지정 등). 변경된 항목 수 반환"""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE uploads SET priority=?, updated_at=? WHERE path=? AND state IN (?, ?)",
+                (priority, time.time(), path, STATE_PENDING, STATE_IN_FLIGHT)
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def retry_failed(self):
+        """failed 항목을 모두 다시 대기 상태로 (설정 변경 후 등)"""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE uploads SET state=?, attempts=0, next_attempt_at=0, updated_at=? WHERE state=?",
+                (STATE_PENDING, time.time(), STATE_FAILED)
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def retry_now(self):
+        """백오프 대기 중인 항목을 즉시 시도 가능하게 (연결 복구 감지 시)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE uploads SET next_attempt_at=0 WHERE state=?", (STATE_PENDING,)
+            )
+            self._conn.commit()
+
+    def pending_paths(self, limit=None):
+        """대기/업로드 중인 경로 목록 (업로드될 순서대로)"""
+        sql = "SELECT path FROM uploads WHERE state IN (?, ?) ORDER BY priority DESC, id"
+        params = (STATE_PENDING, STATE_IN_FLIGHT)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            return [r[0] for r in self._conn.execute(sql, params).fetchall()]
+
+    def count(self, *states):
+        """상태별 항목 수 (states 생략 시 대기 + 업로드 중)"""
+        states = states or (STATE_PENDING, STATE_IN_FLIGHT)
+        placeholders = ",".join("?" * len(states))
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM uploads WHERE state IN ({placeholders})", states
+            ).fetchone()[0]
+
+    def pending_bytes(self):
+        """대기 + 업로드 중인 파일 크기 합계"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM uploads WHERE state IN (?, ?)",
+                (STATE_PENDING, STATE_IN_FLIGHT)
+            ).fetchone()[0]
+
+    def next_attempt_delay(self):
+        """가장 빨리 재시도 가능한 대기 항목까지 남은 시간(초), 대기 항목이 없으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM uploads WHERE state=?", (STATE_PENDING,)
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def find_uploaded_by_path(self, path, size, mtime):
+        """같은 경로/크기/수정시각으로 이미 업로드된 객체 키 (해시 계산 없이 빠르게 확인)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT object_key FROM uploaded_objects WHERE path=? AND size=? AND mtime=?",
+                (path, size, mtime)
+            ).fetchone()
+        return row[0] if row else None
+
+    def uploaded_md5(self, object_key):
+        """해당 키로 업로드된 객체의 MD5 (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT md5 FROM uploaded_objects WHERE object_key=?", (object_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def record_uploaded(self, object_key, md5, size, mtime, path):
+        """업로드 완료 기록 (같은 키면 덮어씀)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploaded_objects (object_key, md5, size, mtime, path, uploaded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (object_key, md5, size, mtime, path, time.time())
+            )
+            self._conn.commit()
+
+    def _set_state(self, upload_id, state, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE uploads SET state=?, last_error=COALESCE(?, last_error), updated_at=? WHERE id=?",
+                (state, error, time.time(), upload_id)
+            )
+            self._conn.commit()
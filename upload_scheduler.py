@@ -0,0 +1,172 @@
+import os
+import contextlib
+import threading
+import time
+from collections import deque
+
+# 업로드 우선순위 클래스 (클수록 먼저)
+PRIORITY_RAW = 0            # RAW 등 대용량 원본 (백필)
+PRIORITY_JPEG = 10          # JPEG 원본
+PRIORITY_DERIVATIVE = 20    # 웹용 축소본 (클라이언트가 바로 봐야 하는 파일)
+PRIORITY_SELECTED = 30      # A컷으로 지정된 파일
+
+# 이 우선순위 이상만 처리하는 전용 워커를 하나 둬서 RAW 백필이 모든 워커를 잡고 있어도 밀리지 않게 함
+EXPRESS_MIN_PRIORITY = PRIORITY_JPEG
+
+JPEG_EXTS = (".jpg", ".jpeg")
+
+READ_CHUNK_SIZE = 64 * 1024
+THROUGHPUT_WINDOW = 10.0    # 전송 속도 계산 구간(초)
+
+
+def priority_for_path(path):
+    """확장자로 기본 우선순위 결정 (JPEG > RAW)"""
+    ext = os.path.splitext(path)[1].lower()
+    return PRIORITY_JPEG if ext in JPEG_EXTS else PRIORITY_RAW
+
+
+class TokenBucket:
+    """업로드 대역폭 제한용 토큰 버킷 (우선순위가 높은 전송이 기다리면 낮은 전송은 양보)
+
+    rate: 초당 바이트, 0 이면 무제한
+    """
+
+    def __init__(self, rate=0):
+        self._cond = threading.Condition()
+        self._waiting = {}  # priority -> 대기 중인 전송 수
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        """속도 제한 변경 (전송 중에도 바로 반영)"""
+        with self._cond:
+            self.rate = max(0, int(rate or 0))
+            # 1초 분량까지 모아둘 수 있음 (너무 작으면 청크 하나도 못 보내므로 최소 청크 크기)
+            self.capacity = max(self.rate, READ_CHUNK_SIZE)
+            self.tokens = self.capacity
+            self._last = time.monotonic()
+            self._cond.notify_all()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def _higher_waiting(self, priority):
+        return any(p > priority and n > 0 for p, n in self._waiting.items())
+
+    def consume(self, amount, priority=PRIORITY_RAW):
+        """amount 바이트를 보낼 수 있을 때까지 대기"""
+        with self._cond:
+            if self.rate == 0:
+                return
+            amount = min(amount, self.capacity)
+            self._waiting[priority] = self._waiting.get(priority, 0) + 1
+            try:
+                while True:
+                    if self.rate == 0:
+                        return
+                    self._refill()
+                    if self.tokens >= amount and not self._higher_waiting(priority):
+                        self.tokens -= amount
+                        return
+                    need = max(0.0, amount - self.tokens)
+                    self._cond.wait(timeout=min(0.5, max(0.005, need / self.rate)))
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+    def try_consume(self, amount, priority=PRIORITY_RAW):
+        """기다리지 않는 consume: 보낼 수 있으면 토큰을 빼고 0, 아니면 다시 시도할 때까지 기다릴 시간(초)
+
+        스레드를 막으면 안 되는 asyncio 쪽에서 waiting() 안에서 sleep 과 번갈아 호출한다.
+        """
+        with self._cond:
+            if self.rate == 0:
+                return 0
+            amount = min(amount, self.capacity)
+            self._refill()
+            if self.tokens >= amount and not self._higher_waiting(priority):
+                self.tokens -= amount
+                return 0
+            need = max(0.0, amount - self.tokens)
+            return min(0.5, max(0.005, need / self.rate))
+
+    @contextlib.contextmanager
+    def waiting(self, priority):
+        """try_consume 로 기다리는 동안 대기 중으로 표시 (낮은 우선순위 전송이 양보하도록)"""
+        with self._cond:
+            self._waiting[priority] = self._waiting.get(priority, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+
+class ThroughputMeter:
+    """최근 THROUGHPUT_WINDOW 초 동안의 전송 속도 측정"""
+
+    def __init__(self, window=THROUGHPUT_WINDOW):
+        self.window = window
+        self._samples = deque()  # (time, bytes)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+
+    def add(self, nbytes):
+        now = time.monotonic()
+        with self._lock:
+            self._samples.append((now, nbytes))
+            self.total_bytes += nbytes
+            self._trim(now)
+
+    def _trim(self, now):
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+    def rate(self):
+        """초당 바이트"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            if not self._samples:
+                return 0.0
+            total = sum(n for _, n in self._samples)
+        return total / self.window
+
+
+class ThrottledReader:
+    """파일/바이트를 읽을 때마다 토큰 버킷을 거치고 전송량을 기록하는 래퍼 (requests 의 data 로 전달)"""
+
+    def __init__(self, fileobj, length, bucket, meter, priority=PRIORITY_RAW):
+        self._f = fileobj
+        self._remaining = length
+        self.bucket = bucket
+        self.meter = meter
+        self.priority = priority
+
+    def __len__(self):
+        # requests 가 Content-Length 를 정할 수 있도록 남은 길이 반환
+        return self._remaining
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > READ_CHUNK_SIZE:
+            size = READ_CHUNK_SIZE
+        size = min(size, self._remaining)
+        self.bucket.consume(size, self.priority)
+        chunk = self._f.read(size)
+        self._remaining -= len(chunk)
+        self.meter.add(len(chunk))
+        return chunk
+
+
+def format_eta(seconds):
+    """남은 시간을 H:MM:SS / M:SS 문자열로"""
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"